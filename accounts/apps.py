@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        from django.core import checks
+        from . import signals  # noqa: F401
+        from .authentication import check_token_cache
+        from .throttling import check_throttle_cache
+        checks.register(check_token_cache)
+        checks.register(check_throttle_cache)
@@ -0,0 +1,86 @@
+import hashlib
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+TOKEN_KEY_PREFIX = 'accounts:token:'
+# the user fields that the views and the permissions read, the others are loaded by a query when they are read.
+CACHED_USER_FIELDS = ['id', 'username', 'slug', 'is_staff', 'is_superuser', 'is_active']
+
+
+def get_token_cache_settings():
+    token_cache_settings = {'ENABLED': True, 'CACHE_ALIAS': 'default', 'TIMEOUT': 60}
+    token_cache_settings.update(getattr(settings, 'ACCOUNTS_TOKEN_CACHE', {}))
+    return token_cache_settings
+
+
+def get_token_cache():
+    return caches[get_token_cache_settings()['CACHE_ALIAS']]
+
+
+def check_token_cache(app_configs, **kwargs):
+    """
+        The tokens revoked by a worker process must not be authenticated by the others, so the token cache can not be
+        the local memory of a process.
+    """
+    token_cache_settings = get_token_cache_settings()
+    if token_cache_settings['ENABLED'] and isinstance(get_token_cache(), LocMemCache):
+        return [checks.Error(
+            f"The '{token_cache_settings['CACHE_ALIAS']}' cache of ACCOUNTS_TOKEN_CACHE is a local memory cache.",
+            hint='Use a cache shared by the worker processes, like redis or memcached, or disable the token cache.',
+            id='accounts.E001',
+        )]
+    return []
+
+
+def get_token_cache_key(key):
+    # the hash of the token, so the cache does not have the tokens.
+    return TOKEN_KEY_PREFIX + hashlib.sha256(key.encode()).hexdigest()
+
+
+def get_cached_user(values):
+    """
+        Returns the user of the cached field values, its other fields are deferred.
+    """
+    user_model = get_user_model()
+    # the values of the deferred models are in the order of their fields.
+    field_names = [field.attname for field in user_model._meta.concrete_fields if field.attname in values]
+    return user_model.from_db(DEFAULT_DB_ALIAS, field_names, [values[name] for name in field_names])
+
+
+def invalidate_tokens(keys):
+    get_token_cache().delete_many([get_token_cache_key(key) for key in keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+        Caches the user of every token for the `ACCOUNTS_TOKEN_CACHE['TIMEOUT']` seconds, so the authenticated
+        requests do not query the token and its user. the cached users are removed when their tokens are deleted or
+        they are saved, the `TIMEOUT` is the longest time that a change without the signals, like a queryset update,
+        takes to revoke a token.
+    """
+    def authenticate_credentials(self, key):
+        token_cache_settings = get_token_cache_settings()
+        if not token_cache_settings['ENABLED']:
+            return super().authenticate_credentials(key)
+        cache = get_token_cache()
+        cache_key = get_token_cache_key(key)
+        values = cache.get(cache_key)
+        if values is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(cache_key, {field: getattr(user, field) for field in CACHED_USER_FIELDS},
+                      token_cache_settings['TIMEOUT'])
+            return user, token
+
+        user = get_cached_user(values)
+        if not user.is_active:
+            raise AuthenticationFailed('User inactive or deleted.')
+        token = Token.from_db(DEFAULT_DB_ALIAS, ['key', 'user_id'], [key, user.pk])
+        token.user = user
+        return user, token
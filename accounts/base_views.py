@@ -1,6 +1,6 @@
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
-from posts.base_views import ReverseRelationListCreateView
+from posts.base_views import ReverseRelationListCreateView, memoize_for_request
 
 
 class UserReverseRelationListCreateView(ReverseRelationListCreateView):
@@ -21,4 +21,10 @@ def get_user(view_obj, or_from_request=False):
     elif or_from_request and view_obj.request.user.is_authenticated:
         user_slug = view_obj.request.user.slug
 
-    return get_object_or_404(get_user_model(), slug=user_slug)
+    request_user = view_obj.request.user
+    if request_user.is_authenticated and user_slug == request_user.slug:
+        # no need to fetch the requesting user again.
+        return request_user
+    return memoize_for_request(
+        view_obj.request, ('get_user', user_slug), lambda: get_object_or_404(get_user_model(), slug=user_slug)
+    )
@@ -0,0 +1,126 @@
+import os
+import pickle
+import random
+import sqlite3
+import threading
+import time
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+class SQLiteCache(BaseCache):
+    """
+        A cache in a SQLite file at the `LOCATION` path, shared by the processes of a machine. every change runs in
+        an immediate transaction, so the `add` and the `incr` are atomic across the processes, like the throttle
+        counters need.
+    """
+    def __init__(self, location, params):
+        super().__init__(params)
+        self.path = location
+        self.local = threading.local()
+
+    def get_connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None or getattr(self.local, 'pid', None) != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            # the expiry times of the keys, null for the never expiring ones.
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)'
+            )
+            self.local.connection, self.local.pid = connection, os.getpid()
+        return connection
+
+    def write(self, func):
+        connection = self.get_connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            result = func(connection, time.time())
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        return result
+
+    def read_row(self, connection, key, now):
+        row = connection.execute('SELECT value, expires FROM cache WHERE key = ?', (key,)).fetchone()
+        if row is None or (row[1] is not None and row[1] <= now):
+            return None
+        return row
+
+    def cull(self, connection, now):
+        # now and then, the expired keys are deleted.
+        if random.random() < 1 / self._cull_frequency:
+            connection.execute('DELETE FROM cache WHERE expires IS NOT NULL AND expires <= ?', (now,))
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+
+        def add_value(connection, now):
+            if self.read_row(connection, key, now) is not None:
+                return False
+            self.cull(connection, now)
+            connection.execute(
+                'INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)',
+                (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), self.get_backend_timeout(timeout)),
+            )
+            return True
+        return self.write(add_value)
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self.read_row(self.get_connection(), key, time.time())
+        return default if row is None else pickle.loads(row[0])
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+
+        def set_value(connection, now):
+            self.cull(connection, now)
+            connection.execute(
+                'INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)',
+                (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), self.get_backend_timeout(timeout)),
+            )
+        self.write(set_value)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+
+        def touch_key(connection, now):
+            if self.read_row(connection, key, now) is None:
+                return False
+            connection.execute('UPDATE cache SET expires = ? WHERE key = ?', (self.get_backend_timeout(timeout), key))
+            return True
+        return self.write(touch_key)
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self.write(
+            lambda connection, now: connection.execute('DELETE FROM cache WHERE key = ?', (key,)).rowcount > 0
+        )
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+
+        def increase_value(connection, now):
+            row = self.read_row(connection, key, now)
+            if row is None:
+                raise ValueError(f"Key '{key}' not found")
+            value = pickle.loads(row[0]) + delta
+            connection.execute(
+                'UPDATE cache SET value = ? WHERE key = ?', (pickle.dumps(value, pickle.HIGHEST_PROTOCOL), key)
+            )
+            return value
+        return self.write(increase_value)
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self.read_row(self.get_connection(), key, time.time()) is not None
+
+    def clear(self):
+        self.write(lambda connection, now: connection.execute('DELETE FROM cache'))
+
+    def close(self, **kwargs):
+        # the connections are kept for the next requests of their threads.
+        pass
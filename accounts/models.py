@@ -6,6 +6,8 @@ from django.contrib.auth.models import AbstractUser
 class CustomUser(AbstractUser):
     slug = models.SlugField(max_length=150, unique=True, blank=True)
     phone_number = models.CharField(max_length=20, blank=True)
+    posts_count = models.PositiveIntegerField(default=0, editable=False)
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return self.username
@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from posts.hyperlinks import TemplateHyperlinkedIdentityField
 
 
 class CustomUserNestedSerializer(serializers.Serializer):
-    profile = serializers.HyperlinkedIdentityField(view_name='user-detail', lookup_field='slug')
+    profile = TemplateHyperlinkedIdentityField(view_name='user-detail', lookup_field='slug')
     username = serializers.CharField(read_only=True)
 
     def create(self, validated_data):
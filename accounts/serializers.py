@@ -1,15 +1,13 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from posts.models import Tag, Post, Comment, Reply
-from posts.nested_serializers import PostNestedSerializer, CommentNestedSerializer, AddsignNestedSerializer, \
-    PostsCountMixin, CommentsCountMixin, RepliesCountMixin, AddsCountMixin
+from posts.hyperlinks import TemplateHyperlinkedIdentityField, TemplateHyperlinkedModelSerializer
+from posts.nested_serializers import PostNestedSerializer, CommentNestedSerializer, AddsignNestedSerializer
 
 
-class CustomUserListSerializer(serializers.ModelSerializer, PostsCountMixin, CommentsCountMixin):
-    profile = serializers.HyperlinkedIdentityField(view_name='user-detail', lookup_field='slug')
+class CustomUserListSerializer(serializers.ModelSerializer):
+    profile = TemplateHyperlinkedIdentityField(view_name='user-detail', lookup_field='slug')
     password_confirm = serializers.CharField(write_only=True, help_text='Required. should be same as password')
-    posts_count = serializers.SerializerMethodField()
-    comments_count = serializers.SerializerMethodField()
 
     class Meta:
         model = get_user_model()
@@ -34,11 +32,10 @@ class CustomUserListSerializer(serializers.ModelSerializer, PostsCountMixin, Com
         return instance
 
 
-class CustomUserDetailSerializerVersion1(serializers.ModelSerializer, CommentsCountMixin):
-    profile = serializers.HyperlinkedIdentityField(view_name='user-detail', lookup_field='slug')
+class CustomUserDetailSerializerVersion1(serializers.ModelSerializer):
+    profile = TemplateHyperlinkedIdentityField(view_name='user-detail', lookup_field='slug')
     password = serializers.CharField(read_only=True, source='get_safe_password')
     posts = PostNestedSerializer(read_only=True, many=True)
-    comments_count = serializers.SerializerMethodField()
 
     class Meta:
         model = get_user_model()
@@ -49,11 +46,10 @@ class CustomUserDetailSerializerVersion1(serializers.ModelSerializer, CommentsCo
         }
 
 
-class CustomUserDetailSerializer(serializers.ModelSerializer, CommentsCountMixin):
-    profile = serializers.HyperlinkedIdentityField(view_name='user-detail', lookup_field='slug')
+class CustomUserDetailSerializer(serializers.ModelSerializer):
+    profile = TemplateHyperlinkedIdentityField(view_name='user-detail', lookup_field='slug')
     password = serializers.CharField(read_only=True, source='get_safe_password')
     posts = PostNestedSerializer(read_only=True, many=True)
-    comments_count = serializers.SerializerMethodField()
 
     class Meta:
         model = get_user_model()
@@ -64,9 +60,7 @@ class CustomUserDetailSerializer(serializers.ModelSerializer, CommentsCountMixin
         }
 
 
-class UserPostListSerializer(serializers.HyperlinkedModelSerializer, CommentsCountMixin):
-    short_description = serializers.CharField(read_only=True, source='make_short_description')
-    comments_count = serializers.SerializerMethodField()
+class UserPostListSerializer(TemplateHyperlinkedModelSerializer):
     tags = serializers.SlugRelatedField(slug_field='tag', queryset=Tag.objects.all(), many=True, required=False)
 
     class Meta:
@@ -81,9 +75,8 @@ class UserPostListSerializer(serializers.HyperlinkedModelSerializer, CommentsCou
         }
 
 
-class UserCommentListSerializer(serializers.HyperlinkedModelSerializer, RepliesCountMixin):
+class UserCommentListSerializer(TemplateHyperlinkedModelSerializer):
     post_detail = PostNestedSerializer(read_only=True, source='post')
-    replies_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Comment
@@ -95,10 +88,9 @@ class UserCommentListSerializer(serializers.HyperlinkedModelSerializer, RepliesC
         }
 
 
-class UserReplyListSerializer(serializers.HyperlinkedModelSerializer, AddsCountMixin):
+class UserReplyListSerializer(TemplateHyperlinkedModelSerializer):
     comment_detail = CommentNestedSerializer(read_only=True, source='comment')
     addsign_detail = AddsignNestedSerializer(read_only=True, source='addsign')
-    adds_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Reply
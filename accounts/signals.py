@@ -0,0 +1,17 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from .authentication import invalidate_tokens
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    invalidate_tokens([instance.key])
+
+
+# the deactivated users and the changed permissions are not authenticated by their cached tokens.
+@receiver(post_save, sender=get_user_model())
+def invalidate_user_tokens(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        invalidate_tokens(Token.objects.filter(user=instance).values_list('key', flat=True))
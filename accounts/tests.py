@@ -1,11 +1,23 @@
+import multiprocessing
+import os
+import tempfile
+import time
+from unittest import mock
 from django.urls import reverse
-from django.core.cache import cache
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
-from rest_framework.test import APITestCase
+from rest_framework.request import Request
+from rest_framework.test import APITestCase, APIRequestFactory
 from rest_framework import status
+from rest_framework.authtoken.models import Token
 from posts.models import Post, Comment, Reply
-from posts.tests import NOT_CONTAINS_TEXT
+from posts.tests import NOT_CONTAINS_TEXT, QueryBudgetTestMixin
+from .authentication import CachedTokenAuthentication, check_token_cache
 from .models import CustomUser
+from .throttling import CustomUserRateThrottle, check_throttle_cache
 # Create your tests here.
 
 
@@ -389,3 +401,210 @@ class CustomUserRateThrottleTests(APITestCase):
         # will-be-restricted request.
         self.assertEqual(self.client.get(self.path).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
         self.client.logout()
+
+    def test_throttled_response_has_the_retry_after_header(self):
+        self.client.force_login(self.user)
+        for i in range(50):
+            self.client.get(self.path)
+        response = self.client.get(self.path)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertTrue(0 < int(response['Retry-After']) <= 120)
+        self.client.logout()
+
+
+class QueryBudgetTests(QueryBudgetTestMixin, APITestCase):
+
+    # so that the throttling history does not affect other tests.
+    def tearDown(self):
+        super().tearDown()
+        cache.clear()
+
+    budget_routes = (
+        ('user-list', {}),
+        ('user-detail', {'slug': 'user.slug'}),
+        ('user-post-list', {'slug': 'user.slug'}),
+        ('user-comment-list', {'slug': 'user.slug'}),
+        ('user-reply-list', {'slug': 'user.slug'}),
+    )
+
+
+def increase_shared_counter(key, count):
+    for i in range(count):
+        caches['throttle'].incr(key)
+
+
+class SlidingWindowThrottleTests(APITestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(
+            CACHES={
+                'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+                'throttle': {
+                    'BACKEND': 'accounts.caches.SQLiteCache',
+                    'LOCATION': os.path.join(self.directory.name, 'throttle.db'),
+                },
+            },
+            ACCOUNTS_THROTTLE={'CACHE_ALIAS': 'throttle'},
+        )
+        self.settings_override.enable()
+        self.request = Request(APIRequestFactory().get('/'))
+        self.request.user = get_user_model().objects.create_user(username='testuser', password='testpass123')
+        self.now = 0
+
+    def tearDown(self):
+        caches['throttle'].clear()
+        self.settings_override.disable()
+        self.directory.cleanup()
+        super().tearDown()
+
+    def get_throttle(self, rate='10/min'):
+        throttle = CustomUserRateThrottle()
+        throttle.rate = rate
+        throttle.num_requests, throttle.duration = throttle.parse_rate(rate)
+        throttle.timer = lambda: self.now
+        return throttle
+
+    def allowed_requests(self, count):
+        return sum(1 for i in range(count) if self.get_throttle().allow_request(self.request, None))
+
+    def test_local_memory_throttle_cache_is_a_warning(self):
+        self.assertEqual(check_throttle_cache(None), [])
+        with override_settings(ACCOUNTS_THROTTLE={'CACHE_ALIAS': 'default'}):
+            self.assertEqual([warning.id for warning in check_throttle_cache(None)], ['accounts.W001'])
+
+    def test_sqlite_cache_add_incr_and_expiry(self):
+        throttle_cache = caches['throttle']
+        self.assertTrue(throttle_cache.add('counter', 0, 60))
+        self.assertFalse(throttle_cache.add('counter', 5, 60))
+        self.assertEqual(throttle_cache.incr('counter', 3), 3)
+        self.assertEqual(throttle_cache.decr('counter'), 2)
+        self.assertEqual(throttle_cache.get('counter'), 2)
+        with self.assertRaises(ValueError):
+            throttle_cache.incr('missing')
+        throttle_cache.set('expired', 1, -1)
+        self.assertIsNone(throttle_cache.get('expired'))
+        self.assertTrue(throttle_cache.add('expired', 2, 60))
+        self.assertTrue(throttle_cache.delete('expired'))
+        self.assertFalse(throttle_cache.has_key('expired'))
+
+    def test_sqlite_cache_incr_is_atomic_across_processes(self):
+        caches['throttle'].set('shared', 0)
+        context = multiprocessing.get_context('fork')
+        processes = [context.Process(target=increase_shared_counter, args=('shared', 50)) for i in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        self.assertEqual(caches['throttle'].get('shared'), 200)
+
+    def test_throttle_weights_the_previous_window_by_its_overlap(self):
+        self.now = 30
+        self.assertEqual(self.allowed_requests(15), 10)
+        # the half of the previous window is in the sliding window.
+        self.now = 90
+        self.assertEqual(self.allowed_requests(10), 5)
+        # the previous window has the 5 requests only, and a quarter of it is in the sliding window.
+        self.now = 165
+        self.assertEqual(self.allowed_requests(10), 8)
+        # after two windows, nothing is in the sliding window.
+        self.now = 300
+        self.assertEqual(self.allowed_requests(15), 10)
+
+    def test_throttle_wait_is_the_time_until_a_request_is_allowed(self):
+        self.now = 30
+        self.allowed_requests(10)
+        throttle = self.get_throttle()
+        self.assertFalse(throttle.allow_request(self.request, None))
+        wait = throttle.wait()
+        self.assertEqual(wait, 36)
+        self.now += wait - 1
+        self.assertEqual(self.allowed_requests(1), 0)
+        self.now += 1
+        self.assertEqual(self.allowed_requests(1), 1)
+
+    def test_throttle_keeps_a_counter_for_each_window_of_a_client(self):
+        self.now = 30
+        self.allowed_requests(20)
+        self.now = 90
+        self.allowed_requests(20)
+        rows = caches['throttle'].get_connection().execute('SELECT expires FROM cache').fetchall()
+        self.assertEqual(len(rows), 2)
+        # a counter lives for its window and the next one, as the previous window counter.
+        for expires, in rows:
+            self.assertLessEqual(expires - time.time(), 120)
+
+
+# the tests run in one process, so its local memory cache is shared.
+@override_settings(ACCOUNTS_TOKEN_CACHE={'ENABLED': True})
+class CachedTokenAuthenticationTests(APITestCase):
+
+    # so that the cached tokens and the throttling history do not affect other tests.
+    def tearDown(self):
+        super().tearDown()
+        cache.clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='testuser', email='testuser@email.com', password='testpass123'
+        )
+        cls.token = Token.objects.create(user=cls.user)
+        cls.path = reverse('user-post-list')
+
+    def setUp(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def get_token_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.path)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [query['sql'] for query in context.captured_queries if 'authtoken_token' in query['sql']]
+
+    def test_cached_token_is_authenticated_without_queries(self):
+        self.assertEqual(len(self.get_token_queries()), 1)
+        self.assertEqual(self.get_token_queries(), [])
+
+    def test_cached_user_has_its_fields(self):
+        authentication = CachedTokenAuthentication()
+        authentication.authenticate_credentials(self.token.key)
+        user, token = authentication.authenticate_credentials(self.token.key)
+        self.assertEqual((user.pk, user.slug, user.is_staff, user.is_active), (self.user.pk, 'testuser', False, True))
+        self.assertEqual(token.key, self.token.key)
+        # the not cached fields are loaded.
+        self.assertEqual(user.email, 'testuser@email.com')
+
+    # the session authentication is the first one, so the failed authentications are forbidden.
+    def test_deleted_token_is_revoked_immediately(self):
+        self.get_token_queries()
+        Token.objects.get(pk=self.token.pk).delete()
+        self.assertEqual(self.client.get(self.path).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_deactivated_user_is_revoked_immediately(self):
+        self.get_token_queries()
+        user = get_user_model().objects.get(pk=self.user.pk)
+        user.is_active = False
+        user.save()
+        self.assertEqual(self.client.get(self.path).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_updated_user_is_revoked_after_the_timeout(self):
+        self.get_token_queries()
+        # the queryset updates do not send the signals.
+        get_user_model().objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.client.get(self.path).status_code, status.HTTP_200_OK)
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=time.time() + 61):
+            self.assertEqual(self.client.get(self.path).status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(ACCOUNTS_TOKEN_CACHE={'ENABLED': False})
+    def test_disabled_cache_queries_the_token_every_request(self):
+        self.assertEqual(len(self.get_token_queries()), 1)
+        self.assertEqual(len(self.get_token_queries()), 1)
+
+    def test_local_memory_token_cache_is_an_error(self):
+        self.assertEqual([error.id for error in check_token_cache(None)], ['accounts.E001'])
+        with override_settings(ACCOUNTS_TOKEN_CACHE={'ENABLED': False}):
+            self.assertEqual(check_token_cache(None), [])
+        with tempfile.TemporaryDirectory() as cache_dir:
+            file_based_cache = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': cache_dir}
+            with override_settings(CACHES={'default': file_based_cache}):
+                self.assertEqual(check_token_cache(None), [])
@@ -1,5 +1,119 @@
-from rest_framework.throttling import UserRateThrottle
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
+from posts.metrics import record_throttle_rejection
 
 
-class CustomUserRateThrottle(UserRateThrottle):
+def get_throttle_settings():
+    throttle_settings = {'CACHE_ALIAS': 'default'}
+    throttle_settings.update(getattr(settings, 'ACCOUNTS_THROTTLE', {}))
+    return throttle_settings
+
+
+def check_throttle_cache(app_configs, **kwargs):
+    """
+        The throttle counters in the local memory of a process are counted by each worker process on its own, so the
+        clients get the rate of every worker.
+    """
+    cache_alias = get_throttle_settings()['CACHE_ALIAS']
+    if isinstance(caches[cache_alias], LocMemCache):
+        return [checks.Warning(
+            f"The '{cache_alias}' cache of ACCOUNTS_THROTTLE is a local memory cache.",
+            hint='Use a cache shared by the worker processes, like redis, memcached or the THROTTLE_SQLITE_PATH file.',
+            id='accounts.W001',
+        )]
+    return []
+
+
+class RecordedRejectionsMixin:
+    # the rejected requests are counted by the metrics.
+    def allow_request(self, request, view):
+        self.request = request
+        return super().allow_request(request, view)
+
+    def throttle_failure(self):
+        record_throttle_rejection(self.request, self.scope)
+        return super().throttle_failure()
+
+
+class SlidingWindowRateThrottleMixin:
+    """
+        Counts the requests of a client in the fixed windows of the rate duration, and estimates the requests of the
+        sliding window as the current window count plus the previous one weighted by its overlap. so only two
+        counters are kept for each client, whatever the rate is, and they are changed by the atomic `add` and `incr`
+        of the `ACCOUNTS_THROTTLE['CACHE_ALIAS']` cache, that the worker processes share if it is a shared cache.
+    """
+    @property
+    def cache(self):
+        return caches[get_throttle_settings()['CACHE_ALIAS']]
+
+    def get_cost(self, request, view):
+        return 1
+
+    def increase_counter(self, key, delta):
+        # the counter of the current window lives for the next window too, as its previous one.
+        self.cache.add(key, 0, self.duration * 2)
+        try:
+            return self.cache.incr(key, delta)
+        except ValueError:
+            # expired between the add and the incr.
+            self.cache.add(key, delta, self.duration * 2)
+            return delta
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.cost = self.get_cost(request, view)
+        self.now = self.timer()
+        window = int(self.now // self.duration)
+        self.elapsed = self.now - window * self.duration
+        current_key = f'{self.key}:{window}'
+        self.previous_count = self.cache.get(f'{self.key}:{window - 1}', 0)
+        # counted before the check, so the concurrent requests of the other workers see each other.
+        self.current_count = self.increase_counter(current_key, self.cost)
+        weight = 1 - self.elapsed / self.duration
+        if self.previous_count * weight + self.current_count > self.num_requests:
+            # the rejected requests are not counted.
+            self.current_count = self.cache.decr(current_key, self.cost) if self.cache.has_key(current_key) else 0
+            return self.throttle_failure()
+        return True
+
+    def wait(self):
+        """
+            Returns the seconds until the estimated count of the sliding window leaves room for the request cost.
+        """
+        room = self.num_requests - self.cost
+        elapsed_fraction = self.elapsed / self.duration
+        if self.current_count > room:
+            # the current window becomes the previous one, and its weight must drop enough in the next window.
+            return (1 - elapsed_fraction + 1 - room / self.current_count) * self.duration
+        if not self.previous_count:
+            return None
+        return max(1 - (room - self.current_count) / self.previous_count - elapsed_fraction, 0) * self.duration
+
+
+class CostRateThrottleMixin:
+
+    def get_cost(self, request, view):
+        """
+            The bulk views cost their items count, at most the whole rate so a full bulk request is still possible.
+        """
+        get_throttle_cost = getattr(view, 'get_throttle_cost', None)
+        cost = get_throttle_cost(request) if get_throttle_cost else 1
+        return max(1, min(cost, self.num_requests))
+
+
+class CustomAnonRateThrottle(RecordedRejectionsMixin, SlidingWindowRateThrottleMixin, AnonRateThrottle):
+    pass
+
+
+class CustomUserRateThrottle(RecordedRejectionsMixin, CostRateThrottleMixin, SlidingWindowRateThrottleMixin,
+                             UserRateThrottle):
     rate = '50/min'
@@ -4,6 +4,8 @@ from rest_framework.permissions import IsAdminUser
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from posts.models import Post, Comment, Reply
+from posts.base_views import CompiledReadMixin, EagerLoadingMixin, MemoizedObjectMixin
+from posts.filters import PostSearchFilter
 from .permissions import IsSelfOrAdmin, IsSelfOrReadOnly, IsSelfOrAdminReadOnly
 from .base_views import UserReverseRelationListCreateView
 from .throttling import CustomUserRateThrottle
@@ -11,7 +13,7 @@ from . import serializers, filters
 # Create your views here.
 
 
-class UserViewSet(ModelViewSet):
+class UserViewSet(MemoizedObjectMixin, EagerLoadingMixin, ModelViewSet):
     lookup_field = 'slug'
     queryset = get_user_model().objects.all().order_by('date_joined')
     throttle_classes = [CustomUserRateThrottle, ]
@@ -37,15 +39,18 @@ class UserViewSet(ModelViewSet):
         return permissions
 
 
-class UserPostListView(UserReverseRelationListCreateView):
+class UserPostListView(CompiledReadMixin, UserReverseRelationListCreateView):
     reverse_model_class = Post
     serializer_class = serializers.UserPostListSerializer
     permission_classes = [IsSelfOrReadOnly, ]
-    filter_backends = [SearchFilter, OrderingFilter, DjangoFilterBackend]
+    filter_backends = [PostSearchFilter, OrderingFilter, DjangoFilterBackend]
     search_fields = ['title', 'description', 'tags__tag']
     ordering_fields = ['created_at', 'updated_at', 'status']
     filterset_class = filters.UserPostFilterSet
 
+    def get_queryset(self):
+        return super().get_queryset().visible_to(self.request.user)
+
     def order_queryset(self, queryset):
         return queryset.order_by('-created_at')
 
@@ -10,7 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.0/ref/settings/
 """
 
+from importlib.util import find_spec
 from pathlib import Path
+from tempfile import gettempdir
 from environs import Env
 
 env = Env()
@@ -63,10 +65,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # first, so its times cover the other middlewares.
+    'posts.middleware.MetricsMiddleware',
+    'posts.middleware.ServerTimingMiddleware',
+    'posts.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'posts.middleware.AsyncWhiteNoiseMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -103,6 +109,35 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.0/ref/settings/#caches
+
+CACHES = {
+    'default': env.dj_cache_url('CACHE_URL', default='locmem://'),
+}
+
+# the throttle counters are shared by the worker processes only in a shared cache, like the redis or the memcached of
+# the `CACHE_URL`, or the SQLite file of the `THROTTLE_SQLITE_PATH` for the servers of a single machine.
+THROTTLE_SQLITE_PATH = env.str('THROTTLE_SQLITE_PATH', default=None)
+if THROTTLE_SQLITE_PATH:
+    CACHES['throttle'] = {'BACKEND': 'accounts.caches.SQLiteCache', 'LOCATION': THROTTLE_SQLITE_PATH}
+
+ACCOUNTS_THROTTLE = {
+    'CACHE_ALIAS': 'throttle' if 'throttle' in CACHES else 'default',
+}
+
+# the users of the tokens are cached for the `TIMEOUT` seconds, the signals remove them on the token and user changes.
+# so the cache must be shared by the worker processes, the local memory cache of a process is not used by default.
+ACCOUNTS_TOKEN_CACHE = {
+    'ENABLED': env.bool(
+        'ACCOUNTS_TOKEN_CACHE_ENABLED',
+        default=CACHES['default']['BACKEND'] != 'django.core.cache.backends.locmem.LocMemCache',
+    ),
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': env.int('ACCOUNTS_TOKEN_CACHE_TIMEOUT', default=60),
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
 
@@ -167,17 +202,29 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
+        'accounts.throttling.CustomAnonRateThrottle',
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '20/min',
     },
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
+        'accounts.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_PAGINATION_CLASS': 'posts.pagination.CustomPageNumberPagination',
+    # the faster orjson and the MessagePack renderers and parsers are used if their packages are installed.
+    'DEFAULT_RENDERER_CLASSES': [
+        'posts.renderers.ORJSONRenderer' if find_spec('orjson') else 'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        *(['posts.renderers.MessagePackRenderer'] if find_spec('msgpack') else []),
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'posts.renderers.ORJSONParser' if find_spec('orjson') else 'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+        *(['posts.renderers.MessagePackParser'] if find_spec('msgpack') else []),
+    ],
     'DEFAULT_VERSIONING_CLASS': 'rest_framework.versioning.AcceptHeaderVersioning',
     'DEFAULT_VERSION': '2.0',
     'ALLOWED_VERSIONS': ['1.0', '2.0'],
@@ -210,3 +257,97 @@ SESSION_COOKIE_SECURE = env.bool('DJANGO_SESSION_COOKIE_SECURE', default=True)
 
 # Additional
 CRISPY_TEMPLATE_PACK = 'bootstrap4'
+
+# posts search, the backend is chosen by the database vendor if not set.
+POSTS_SEARCH = {
+    'BACKEND': env.str('POSTS_SEARCH_BACKEND', default=None),
+    'ROUTE_FILTERSET': env.bool('POSTS_SEARCH_ROUTE_FILTERSET', default=False),
+}
+
+# the response cache of the anonymous read endpoints.
+POSTS_RESPONSE_CACHE = {
+    'ENABLED': env.bool('POSTS_RESPONSE_CACHE_ENABLED', default=True),
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': env.int('POSTS_RESPONSE_CACHE_TIMEOUT', default=300),
+}
+
+# the compiled read path of the list endpoints, that lists the objects from the `.values()` rows.
+POSTS_COMPILED_READ = {
+    'ENABLED': env.bool('POSTS_COMPILED_READ_ENABLED', default=True),
+}
+
+# the reply threads, that return the adds trees of the replies down to the `depth` query parameter levels.
+POSTS_THREAD = {
+    'DEFAULT_DEPTH': env.int('POSTS_THREAD_DEFAULT_DEPTH', default=5),
+    'MAX_DEPTH': env.int('POSTS_THREAD_MAX_DEPTH', default=20),
+}
+
+# the coroutine views of the hot read endpoints, for the ASGI deployments.
+POSTS_ASYNC_READ = {
+    'ENABLED': env.bool('POSTS_ASYNC_READ_ENABLED', default=False),
+    'MAX_CONCURRENCY': env.int('POSTS_ASYNC_READ_MAX_CONCURRENCY', default=32),
+}
+
+# the queries count, the database, serialization and render times of the requests, in the `Server-Timing` header and
+# the `posts.middleware` log.
+POSTS_SERVER_TIMING = {
+    'ENABLED': env.bool('POSTS_SERVER_TIMING_ENABLED', default=False),
+    'HEADER': env.bool('POSTS_SERVER_TIMING_HEADER', default=True),
+    'LOG': env.bool('POSTS_SERVER_TIMING_LOG', default=True),
+}
+
+# the most queries of a request of each url name by a token authenticated user, the tests check them on the seeded
+# data of different volumes and the server timing logs the requests over them as warnings.
+POSTS_QUERY_BUDGETS = {
+    'post-list': 4,
+    'post-detail': 5,
+    'tag-detail': 4,
+    'tag-post-list': 5,
+    'post-comment-list': 5,
+    'post-tag-list': 4,
+    'comment-detail': 4,
+    'comment-reply-list': 5,
+    'comment-thread': 5,
+    'reply-detail': 4,
+    'reply-adds-list': 5,
+    'reply-thread': 5,
+    'user-list': 3,
+    'user-detail': 3,
+    'user-post-list': 4,
+    'user-comment-list': 3,
+    'user-reply-list': 3,
+}
+
+# the cProfile profiles of a sample of the requests and of the ones slower than the threshold, for the
+# `aggregate_profiles` command.
+POSTS_PROFILING = {
+    'ENABLED': env.bool('POSTS_PROFILING_ENABLED', default=False),
+    'SAMPLE_RATE': env.float('POSTS_PROFILING_SAMPLE_RATE', default=0.01),
+    'THRESHOLD_MS': env.int('POSTS_PROFILING_THRESHOLD_MS', default=None),
+    'DIRECTORY': env.str('POSTS_PROFILING_DIRECTORY', default=str(BASE_DIR / 'profiles')),
+    'MAX_FILES': env.int('POSTS_PROFILING_MAX_FILES', default=500),
+}
+
+# the latencies, queries, response sizes, response cache lookups and throttle rejections of the url names, recorded in
+# a metrics file of each process in the directory and served to the admins at /api/metrics/ in the Prometheus format.
+# the directory should be emptied when the server starts.
+POSTS_METRICS = {
+    'ENABLED': env.bool('POSTS_METRICS_ENABLED', default=False),
+    'DIRECTORY': env.str('POSTS_METRICS_DIRECTORY', default=str(Path(gettempdir()) / 'blogapi-metrics')),
+    'MAX_KEYS': env.int('POSTS_METRICS_MAX_KEYS', default=512),
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'posts.middleware': {
+            'handlers': ['console'],
+            'level': env.str('POSTS_SERVER_TIMING_LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+    },
+}
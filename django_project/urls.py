@@ -20,6 +20,7 @@ from django.conf.urls.static import static
 from django.views.generic import RedirectView
 from dj_rest_auth.views import PasswordResetConfirmView
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
+from posts.views import MetricsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -35,6 +36,7 @@ urlpatterns = [
     # Local
     path('api/users/', include('accounts.urls')),
     path('api/posts/', include('posts.urls')),
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
     path('', RedirectView.as_view(pattern_name='post-list'), name='home'),
 
 ]
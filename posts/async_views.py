@@ -0,0 +1,47 @@
+import asyncio
+import functools
+import weakref
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+
+
+def get_async_read_settings():
+    async_read_settings = {'ENABLED': False, 'MAX_CONCURRENCY': 32}
+    async_read_settings.update(getattr(settings, 'POSTS_ASYNC_READ', {}))
+    return async_read_settings
+
+
+# the read semaphores of the event loops, an ASGI worker process runs one loop.
+read_semaphores = weakref.WeakKeyDictionary()
+
+
+def get_read_semaphore():
+    loop = asyncio.get_running_loop()
+    if loop not in read_semaphores:
+        read_semaphores[loop] = asyncio.Semaphore(get_async_read_settings()['MAX_CONCURRENCY'])
+    return read_semaphores[loop]
+
+
+class AsyncReadMixin:
+    """
+        Makes the view a coroutine view when the async reads are enabled, for the ASGI servers. the DRF views and
+        the ORM of the Django 4.0 are synchronous, so the safe requests are read in a thread by sync_to_async, the
+        same as the async queryset methods of the Django 4.1 do, and the event loop serves the other requests while
+        they wait on the database. at most `MAX_CONCURRENCY` reads of a worker run at a time, so the threads and the
+        database connections are bounded, the others wait on the loop. the writes are handled as the sync views.
+    """
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        if not get_async_read_settings()['ENABLED']:
+            return view
+        sync_view = sync_to_async(view)
+
+        @functools.wraps(view)
+        async def async_view(request, *args, **kwargs):
+            if request.method not in SAFE_METHODS:
+                return await sync_view(request, *args, **kwargs)
+            async with get_read_semaphore():
+                return await sync_view(request, *args, **kwargs)
+        return async_view
@@ -1,9 +1,212 @@
+import hashlib
+import logging
+from django.db.models import Aggregate, CharField, Count, Max, Sum
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.mixins import RetrieveModelMixin
 from rest_framework.generics import ListCreateAPIView
+from rest_framework.response import Response
 from posts.models import Post
+from posts.caching import (
+    ALL_SCOPE, get_cache, get_response_cache_settings, get_response_key, response_cache_stats
+)
+from posts.compiled_serializers import get_compiled_plan, get_compiled_read_settings
+from posts.eager_loading import get_serializer_plan
+from posts.metrics import record_response_cache
 
+logger = logging.getLogger(__name__)
 
-class ReverseRelationListCreateView(ListCreateAPIView):
+
+class EagerLoadingMixin:
+    """
+        Eager loads the relations that the view serializer fields tree needs, using select_related and
+        prefetch_related.
+    """
+    def get_eager_loading_serializer_class(self):
+        return self.get_serializer_class()
+
+    def get_eager_loading_plan(self):
+        return get_serializer_plan(self.get_eager_loading_serializer_class())
+
+    def get_prefetch_queryset(self, lookup, model):
+        if model is Post:
+            # the nested posts should not leak the drafts.
+            return Post.objects.visible_to(self.request.user)
+        return model._default_manager.all()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        plan = self.get_eager_loading_plan()
+        logger.debug('%s eager loading plan: %s', type(self).__name__, plan.describe())
+        return plan.apply(queryset, self.get_prefetch_queryset)
+
+
+class CompiledReadMixin:
+    """
+        Lists the objects of the safe requests from the `.values()` rows by the compiled plan of the serializer, without
+        the model instances and the per field serializer machinery. the writes and the schema still use the serializer.
+    """
+    def get_compiled_plan(self, request):
+        # the browsable API pages need the serializer for their forms.
+        if (
+            not get_compiled_read_settings()['ENABLED'] or request.method not in SAFE_METHODS
+            or request.accepted_renderer.format == 'api'
+        ):
+            return None
+        return get_compiled_plan(self.get_serializer_class())
+
+    def list(self, request, *args, **kwargs):
+        plan = self.get_compiled_plan(request)
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        # the keyset pagination reads the cursor position from the rows.
+        cursor_keys = [field.lstrip('-') for field in getattr(self, 'cursor_ordering', None) or ()]
+        queryset = plan.values(self.filter_queryset(self.get_queryset()), cursor_keys)
+        page = self.paginate_queryset(queryset)
+        fields = self.get_serializer(many=True).child.fields
+        get_prefetch_queryset = getattr(self, 'get_prefetch_queryset', None)
+        data = plan.represent(page if page is not None else queryset, fields, get_prefetch_queryset)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+
+class MemoizedObjectMixin:
+    """
+        Fetches the view object once per request, as the permissions and the serializer choosing need it too.
+    """
+    def get_object(self):
+        return memoize_for_request(self.request, ('get_object', type(self)), super().get_object)
+
+
+class ResponseCacheMixin:
+    """
+        Caches the rendered responses of the anonymous GET requests. the cache keys contain the generations of the
+        `response_cache_scopes`, formatted by the view kwargs, that are bumped by the signals when the data changes.
+    """
+    response_cache_scopes = ()
+
+    def get_response_cache_scopes(self):
+        return [ALL_SCOPE] + [scope.format(**self.kwargs) for scope in self.response_cache_scopes]
+
+    def is_response_cacheable(self, request):
+        # the browsable API pages are rendered by the user forms, so they are not cached.
+        return (
+            get_response_cache_settings()['ENABLED'] and not request.user.is_authenticated
+            and request.accepted_renderer.format != 'api'
+        )
+
+    def get(self, request, *args, **kwargs):
+        if not self.is_response_cacheable(request):
+            return super().get(request, *args, **kwargs)
+        cache = get_cache()
+        key = get_response_key(request, self.get_response_cache_scopes())
+        cached = cache.get(key)
+        response_cache_stats.record(hit=cached is not None)
+        record_response_cache(request, hit=cached is not None)
+        if cached is not None:
+            response = get_conditional_response(
+                request, etag=cached['headers'].get('ETag'), last_modified=cached['last_modified']
+            )
+            if response is None:
+                response = HttpResponse(cached['content'], content_type=cached['content_type'])
+            for header, value in cached['headers'].items():
+                response[header] = value
+            response['X-Cache'] = 'HIT'
+            return response
+
+        response = super().get(request, *args, **kwargs)
+        response['X-Cache'] = 'MISS'
+        if response.status_code == status.HTTP_200_OK:
+            timeout = get_response_cache_settings()['TIMEOUT']
+            response.add_post_render_callback(lambda rendered: cache.set(key, {
+                'content': rendered.content, 'content_type': rendered['Content-Type'],
+                # the conditional GET validators, if the view has set them.
+                'headers': {header: rendered[header] for header in ('ETag', 'Last-Modified') if header in rendered},
+                'last_modified': getattr(rendered, 'last_modified_timestamp', None),
+            }, timeout))
+        return response
+
+
+class TextValues(Aggregate):
+    # the distinct values joined by commas, in any order.
+    function = 'GROUP_CONCAT'
+    allow_distinct = True
+    output_field = CharField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection, function='STRING_AGG', template="%(function)s(%(distinct)s%(expressions)s, ',')",
+            **extra_context
+        )
+
+
+class ConditionalGetMixin:
+    """
+        Answers the GET requests by 304 Not Modified when their validators match the current ones, that are computed
+        from the response rows by one aggregate query before the serialization: the latest updated dates of the
+        `validator_updated_fields`, the distinct counts of the `validator_counted_fields`, the sums of the
+        `validator_summed_fields` (the stored counters) and the distinct values of the `validator_text_fields` (the
+        related fields without updated dates, like the usernames). the deletions do not change the Last-Modified, so
+        the clients should prefer the ETag.
+    """
+    validator_updated_fields = ('updated_at', )
+    validator_counted_fields = ('pk', )
+    validator_summed_fields = ()
+    validator_text_fields = ()
+
+    def get_validator_queryset(self):
+        if isinstance(self, RetrieveModelMixin):
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            return self.get_queryset().filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return self.filter_queryset(self.get_queryset())
+
+    def get_validators(self, request):
+        aggregates = {}
+        for index, field in enumerate(self.validator_updated_fields):
+            aggregates[f'updated_{index}'] = Max(field)
+        for index, field in enumerate(self.validator_counted_fields):
+            aggregates[f'count_{index}'] = Count(field, distinct=True)
+        for index, field in enumerate(self.validator_summed_fields):
+            aggregates[f'sum_{index}'] = Sum(field)
+        for index, field in enumerate(self.validator_text_fields):
+            aggregates[f'text_{index}'] = TextValues(field, distinct=True)
+        values = self.get_validator_queryset().order_by().aggregate(**aggregates)
+        for index in range(len(self.validator_text_fields)):
+            values[f'text_{index}'] = sorted((values[f'text_{index}'] or '').split(','))
+        updated_dates = [values[f'updated_{index}'] for index in range(len(self.validator_updated_fields))]
+        updated_dates = [date for date in updated_dates if date is not None]
+        if not updated_dates and isinstance(self, RetrieveModelMixin):
+            # the object is not found.
+            return None, None
+        # the representation depends on the version and the media type too.
+        validator = repr([sorted(values.items()), request.version, request.accepted_media_type])
+        etag = f'W/"{hashlib.md5(validator.encode()).hexdigest()}"'
+        # the empty lists have no Last-Modified.
+        last_modified = int(max(updated_dates).timestamp()) if updated_dates else None
+        return etag, last_modified
+
+    def get(self, request, *args, **kwargs):
+        if request.accepted_renderer.format == 'api':
+            return super().get(request, *args, **kwargs)
+        etag, last_modified = self.get_validators(request)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        if etag and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+                response.last_modified_timestamp = last_modified
+        return response
+
+
+class ReverseRelationListCreateView(EagerLoadingMixin, ListCreateAPIView):
     parent_klass = None
     reverse_model_class = None
     reverse_field_related_name = None
@@ -15,7 +218,7 @@ class ReverseRelationListCreateView(ListCreateAPIView):
         return f'{lower_model_class_name}s'
 
     def get_object(self):
-        return get_from_kwargs(self.kwargs, self.parent_klass)
+        return get_from_kwargs(self.kwargs, self.parent_klass, self.request)
 
     def get_queryset(self):
         obj = self.get_object()
@@ -36,17 +239,30 @@ class ReverseRelationListCreateView(ListCreateAPIView):
 
 
 def make_post_queryset_for_user(request):
-    if request.user.is_staff:
-        return Post.objects.all()
-    else:
-        published_queryset = Post.objects.published()
-        if request.user.is_authenticated:
-            draft_queryset = Post.objects.user_draft(request.user)
-            return published_queryset | draft_queryset
-
-        return published_queryset
+    return Post.objects.visible_to(request.user)
 
 
-def get_from_kwargs(lookup_dict, get_klass):
+def get_from_kwargs(lookup_dict, get_klass, request=None):
     pk = lookup_dict.get('pk')
-    return get_object_or_404(get_klass, pk=pk)
+    if request is None:
+        return get_object_or_404(get_klass, pk=pk)
+    return memoize_for_request(request, ('get_from_kwargs', get_klass, pk), lambda: get_object_or_404(get_klass, pk=pk))
+
+
+def get_request_cache(request):
+    # keeping the cache on the django request, so the DRF request wrappers of it share the same cache.
+    http_request = getattr(request, '_request', request)
+    if not hasattr(http_request, '_object_cache'):
+        http_request._object_cache = {}
+    return http_request._object_cache
+
+
+def memoize_for_request(request, key, fetch):
+    """
+        Returns the cached result of the `key` in the request, or the result of calling `fetch` and caches it.
+        the exceptions are not cached.
+    """
+    request_cache = get_request_cache(request)
+    if key not in request_cache:
+        request_cache[key] = fetch()
+    return request_cache[key]
@@ -0,0 +1,77 @@
+import statistics
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from .models import Post
+
+
+class Timing(namedtuple('Timing', ['best', 'median'])):
+
+    def __str__(self):
+        return f'best {self.best:.2f} ms, median {self.median:.2f} ms'
+
+
+@contextmanager
+def benchmark_database(verbosity=0):
+    """
+        Runs the block on a throwaway test database, so the benchmark data never touches the real one.
+    """
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+
+
+def measure(func, repeat=5):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return Timing(min(durations), statistics.median(durations))
+
+
+class LoadStats(namedtuple('LoadStats', ['count', 'seconds', 'p50', 'p95', 'p99'])):
+
+    def __str__(self):
+        rate = self.count / self.seconds if self.seconds else 0
+        return (
+            f'{self.count} requests in {self.seconds:.2f}s ({rate:.0f} requests/s), '
+            f'p50 {self.p50:.2f} ms, p95 {self.p95:.2f} ms, p99 {self.p99:.2f} ms'
+        )
+
+
+def get_load_stats(durations, seconds):
+    # the latencies are in milliseconds.
+    percentiles = statistics.quantiles(durations, n=100, method='inclusive') if len(durations) > 1 else durations * 99
+    return LoadStats(len(durations), seconds, percentiles[49], percentiles[94], percentiles[98])
+
+
+def create_users(count, prefix='benchuser'):
+    password = make_password(None)
+    users = [get_user_model()(username=f'{prefix}{i}', slug=f'{prefix}{i}', password=password) for i in range(count)]
+    return get_user_model().objects.bulk_create(users)
+
+
+def create_posts(count, authors, draft_ratio=0.1, batch_size=10000, **post_kwargs):
+    """
+        Bulk creates `count` posts of the authors, every `1 / draft_ratio`th post is a draft. the signals are not
+        sent, so the counters and the search index are not updated, but the stored excerpts are computed.
+    """
+    draft_every = round(1 / draft_ratio) if draft_ratio else 0
+    for batch_start in range(0, count, batch_size):
+        posts = []
+        for i in range(batch_start, min(batch_start + batch_size, count)):
+            post = Post(
+                title=f'Benchmark post{i}', author=authors[i % len(authors)],
+                status='d' if draft_every and i % draft_every == 0 else 'p', **post_kwargs
+            )
+            post.update_excerpts()
+            posts.append(post)
+        Post.objects.bulk_create(posts)
+    return count
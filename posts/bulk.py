@@ -0,0 +1,192 @@
+from urllib.parse import unquote, urlparse
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.urls import Resolver404, get_script_prefix, resolve
+from django.utils.encoding import uri_to_iri
+from rest_framework import serializers, status
+from rest_framework.relations import ManyRelatedField
+from rest_framework.response import Response
+from accounts.throttling import CostRateThrottleMixin, CustomUserRateThrottle
+from .hyperlinks import TemplateHyperlinkedRelatedField
+from .signals import bulk_created
+
+
+class PreloadedRelatedFieldMixin:
+    """
+        Takes the related objects from the `preloaded_objects` of the field, by the `lookup_name` values of their
+        inputs, if they are preloaded, so the bulk serializers resolve the related objects of all the items by one
+        query.
+    """
+    preloaded_objects = None
+
+    def get_lookup_name(self):
+        raise NotImplementedError
+
+    def get_lookup_value(self, data):
+        # the lookup of the input, or None if the input is invalid.
+        raise NotImplementedError
+
+    def preload(self, inputs):
+        lookup_name = self.get_lookup_name()
+        lookup_values = {self.get_lookup_value(data) for data in inputs} - {None}
+        related_queryset = self.get_queryset().filter(**{f'{lookup_name}__in': lookup_values})
+        self.preloaded_objects = {str(getattr(obj, lookup_name)): obj for obj in related_queryset}
+
+
+class PreloadedSlugRelatedField(PreloadedRelatedFieldMixin, serializers.SlugRelatedField):
+
+    def get_lookup_name(self):
+        return self.slug_field
+
+    def get_lookup_value(self, data):
+        return str(data) if isinstance(data, (str, int)) else None
+
+    def to_internal_value(self, data):
+        if self.preloaded_objects is None:
+            return super().to_internal_value(data)
+        try:
+            return self.preloaded_objects[str(data)]
+        except KeyError:
+            self.fail('does_not_exist', slug_name=self.slug_field, value=str(data))
+
+
+class PreloadedHyperlinkedRelatedField(PreloadedRelatedFieldMixin, TemplateHyperlinkedRelatedField):
+
+    def get_lookup_name(self):
+        return self.lookup_field
+
+    def get_lookup_value(self, data):
+        # the url is resolved like the `to_internal_value` does.
+        if not isinstance(data, str):
+            return None
+        if data.startswith(('http:', 'https:')):
+            data = urlparse(data).path
+            prefix = get_script_prefix()
+            if data.startswith(prefix):
+                data = '/' + data[len(prefix):]
+        try:
+            match = resolve(uri_to_iri(unquote(data)))
+        except Resolver404:
+            return None
+        lookup_value = match.kwargs.get(self.lookup_url_kwarg) if match.view_name == self.view_name else None
+        return None if lookup_value is None else str(lookup_value)
+
+    def get_object(self, view_name, view_args, view_kwargs):
+        if self.preloaded_objects is None:
+            return super().get_object(view_name, view_args, view_kwargs)
+        try:
+            return self.preloaded_objects[str(view_kwargs[self.lookup_url_kwarg])]
+        except KeyError:
+            raise ObjectDoesNotExist
+
+
+class BulkCreateListSerializer(serializers.ListSerializer):
+    """
+        Creates the items by bulk_create, and the relations of their many to many fields by one bulk_create of
+        each through model, then sends the `bulk_created` signal for the side effects of the save signals.
+    """
+    batch_size = 500
+
+    def get_preloaded_fields(self):
+        # the field name, the preloaded relation and whether the field has a list of the related objects.
+        for field in self.child.fields.values():
+            if isinstance(field, ManyRelatedField) and isinstance(field.child_relation, PreloadedRelatedFieldMixin):
+                yield field.field_name, field.child_relation, True
+            elif isinstance(field, PreloadedRelatedFieldMixin) and not field.read_only:
+                yield field.field_name, field, False
+
+    def preload_related_objects(self, data):
+        for field_name, relation, many in self.get_preloaded_fields():
+            inputs = []
+            for item in data:
+                if hasattr(item, 'getlist'):
+                    inputs += item.getlist(field_name)
+                elif isinstance(item, dict):
+                    values = item.get(field_name)
+                    if not many:
+                        inputs.append(values)
+                    elif isinstance(values, (list, tuple)):
+                        inputs += values
+            relation.preload(inputs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.preload_related_objects(data)
+        return super().to_internal_value(data)
+
+    def get_many_fields(self):
+        model = self.child.Meta.model
+        return [
+            model._meta.get_field(field.source) for field in self.child.fields.values()
+            if isinstance(field, ManyRelatedField) and not field.read_only
+        ]
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        many_fields = self.get_many_fields()
+        objs = []
+        relations = {model_field.name: [] for model_field in many_fields}
+        for attrs in validated_data:
+            attrs = dict(attrs)
+            related_objects = {model_field.name: attrs.pop(model_field.name, []) for model_field in many_fields}
+            obj = model(**attrs)
+            if hasattr(obj, 'update_excerpts'):
+                obj.update_excerpts()
+            objs.append(obj)
+            for field_name, field_related_objects in related_objects.items():
+                relations[field_name] += [(obj, related_obj) for related_obj in field_related_objects]
+
+        with transaction.atomic():
+            model._default_manager.bulk_create(objs, batch_size=self.batch_size)
+            for model_field in many_fields:
+                through = model_field.remote_field.through
+                source_name = through._meta.get_field(model_field.m2m_field_name()).attname
+                target_name = through._meta.get_field(model_field.m2m_reverse_field_name()).attname
+                pairs = dict.fromkeys((obj.pk, related_obj.pk) for obj, related_obj in relations[model_field.name])
+                through._default_manager.bulk_create([
+                    through(**{source_name: obj_pk, target_name: related_pk}) for obj_pk, related_pk in pairs
+                ], batch_size=self.batch_size)
+            bulk_created.send(sender=model, objs=objs)
+        return objs
+
+
+class BulkCreateMixin:
+    """
+        Creates a list of items in one transaction, the items are validated all together and the response of an
+        invalid request has the errors of each item in its index. the items count is the throttling cost.
+    """
+    bulk_max_items = 100
+    throttle_classes = [CustomUserRateThrottle, ]
+
+    def get_throttle_cost(self, request):
+        return len(request.data) if isinstance(request.data, list) else 1
+
+    def get_bulk_max_items(self):
+        # at most the rates of the cost throttles, so every item of an accepted request is charged.
+        rates = [
+            throttle.num_requests for throttle in self.get_throttles()
+            if isinstance(throttle, CostRateThrottleMixin) and throttle.rate is not None
+        ]
+        return min([self.bulk_max_items, *rates])
+
+    def get_bulk_serializer(self, data):
+        context = self.get_serializer_context()
+        child = self.get_serializer_class()(context=context)
+        return BulkCreateListSerializer(
+            child=child, data=data, context=context, allow_empty=False, max_length=self.get_bulk_max_items()
+        )
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_bulk_serializer(request.data)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        objs = self.get_created_objects(serializer.instance)
+        return Response(self.get_serializer(objs, many=True).data, status=status.HTTP_201_CREATED)
+
+    def get_created_objects(self, objs):
+        # fetching again by the eager loading plan of the view, so the representation does not query per object.
+        queryset = type(objs[0])._default_manager.filter(pk__in=[obj.pk for obj in objs])
+        if hasattr(self, 'get_eager_loading_plan'):
+            queryset = self.get_eager_loading_plan().apply(queryset, self.get_prefetch_queryset)
+        objs_by_pk = {obj.pk: obj for obj in queryset}
+        return [objs_by_pk[obj.pk] for obj in objs]
@@ -0,0 +1,78 @@
+import hashlib
+import threading
+import time
+from django.conf import settings
+from django.core.cache import caches
+
+# the generation of the `ALL_SCOPE` is part of every cached response key, so bumping it invalidates them all.
+ALL_SCOPE = 'all'
+GENERATION_KEY_PREFIX = 'posts:generation:'
+RESPONSE_KEY_PREFIX = 'posts:response:'
+
+
+def get_response_cache_settings():
+    cache_settings = {'ENABLED': True, 'CACHE_ALIAS': 'default', 'TIMEOUT': 300}
+    cache_settings.update(getattr(settings, 'POSTS_RESPONSE_CACHE', {}))
+    return cache_settings
+
+
+def get_cache():
+    return caches[get_response_cache_settings()['CACHE_ALIAS']]
+
+
+def get_generations(scopes):
+    """
+        Returns the current generations of the scopes, the missing ones are initialized by the current time,
+        so an evicted generation never comes back to an old value.
+    """
+    cache = get_cache()
+    keys = [GENERATION_KEY_PREFIX + scope for scope in scopes]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            generation = time.time_ns()
+            generations[key] = generation if cache.add(key, generation, timeout=None) else cache.get(key, generation)
+    return [generations[key] for key in keys]
+
+
+def bump_generations(scopes):
+    generation = time.time_ns()
+    get_cache().set_many({GENERATION_KEY_PREFIX + scope: generation for scope in scopes}, timeout=None)
+
+
+def get_response_key(request, scopes):
+    query = sorted(request.query_params.lists())
+    # the responses have the absolute urls of the requested host.
+    parts = [
+        request.scheme, request.get_host(), request.path, repr(query), str(request.version), request.accepted_media_type,
+        repr(list(zip(scopes, get_generations(scopes)))),
+    ]
+    return RESPONSE_KEY_PREFIX + hashlib.md5('\n'.join(parts).encode()).hexdigest()
+
+
+class ResponseCacheStats:
+    """
+        The in-process hit and miss counters of the response cache.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def reset(self):
+        with self.lock:
+            self.hits = self.misses = 0
+
+    def as_dict(self):
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+
+response_cache_stats = ResponseCacheStats()
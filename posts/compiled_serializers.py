@@ -0,0 +1,190 @@
+from collections import namedtuple
+from functools import lru_cache
+from types import SimpleNamespace
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models.fields.files import FieldFile
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField, SlugRelatedField, StringRelatedField
+
+# the fields that the `__str__` of the models returns, so their StringRelatedFields are read from the rows.
+STRING_FIELDS = {
+    'accounts.CustomUser': 'username',
+    'posts.Tag': 'tag',
+}
+# the representations that return the database values of their fields as they are.
+IDENTITY_REPRESENTATIONS = {serializers.CharField.to_representation, serializers.IntegerField.to_representation}
+
+
+def get_compiled_read_settings():
+    compiled_read_settings = {'ENABLED': True}
+    compiled_read_settings.update(getattr(settings, 'POSTS_COMPILED_READ', {}))
+    return compiled_read_settings
+
+
+class NotCompilable(Exception):
+    pass
+
+
+class FieldPlan(namedtuple('FieldPlan', ['field_name', 'kind', 'keys', 'model_field', 'nested', 'value_name'],
+                           defaults=[None, None, None])):
+    """
+        How a readable field is represented from the `.values()` rows: its kind, the row keys that it reads, the
+        nested plans of the nested serializers and the related model value of the many relations.
+    """
+    def bind(self, field):
+        """
+            Returns the converter of the rows to the field representation, using the field bound to the serializer
+            of the request, so the hyperlinks and the file urls are the same.
+        """
+        if self.kind == 'value':
+            key, = self.keys
+            if field.to_representation.__func__ in IDENTITY_REPRESENTATIONS:
+                return lambda row: row[key]
+            to_representation = field.to_representation
+            return lambda row: None if row[key] is None else to_representation(row[key])
+
+        elif self.kind == 'file':
+            key, = self.keys
+            to_representation, model_field = field.to_representation, self.model_field
+            return lambda row: to_representation(FieldFile(None, model_field, row[key]))
+
+        elif self.kind == 'identity':
+            pk_key, lookup_key = self.keys
+            to_representation, lookup_field = field.to_representation, field.lookup_field
+
+            def convert_identity(row):
+                return to_representation(SimpleNamespace(**{'pk': row[pk_key], lookup_field: row[lookup_key]}))
+            return convert_identity
+
+        elif self.kind in ('string', 'many'):
+            key, = self.keys
+            return lambda row: row[key]
+
+        null_key, = self.keys
+        converters = [(plan.field_name, plan.bind(field.fields[plan.field_name])) for plan in self.nested]
+
+        def convert_nested(row):
+            if row[null_key] is None:
+                return None
+            return {field_name: convert(row) for field_name, convert in converters}
+        return convert_nested
+
+
+class CompiledPlan(namedtuple('CompiledPlan', ['model', 'fields'])):
+
+    def get_value_keys(self, fields=None):
+        keys = []
+        for plan in fields if fields is not None else self.fields:
+            if plan.kind == 'nested':
+                keys += plan.keys + self.get_value_keys(plan.nested)
+            elif plan.kind == 'many':
+                keys.append(self.model._meta.pk.name)
+            else:
+                keys += plan.keys
+        return list(dict.fromkeys(keys))
+
+    def values(self, queryset, extra_keys=()):
+        """
+            Returns the `.values()` queryset of the rows, the extra selects and the annotations are kept, as the
+            ordering may use them.
+        """
+        query = queryset.query
+        keys = [*self.get_value_keys(), *extra_keys, *query.extra_select, *query.annotation_select]
+        return queryset.prefetch_related(None).values(*dict.fromkeys(keys))
+
+    def fetch_many(self, rows, get_prefetch_queryset=None):
+        pk_name = self.model._meta.pk.name
+        pks = [row[pk_name] for row in rows]
+        for plan in self.fields:
+            if plan.kind != 'many':
+                continue
+            key, = plan.keys
+            related_model = plan.model_field.related_model
+            if get_prefetch_queryset:
+                queryset = get_prefetch_queryset(plan.model_field.name, related_model)
+            else:
+                queryset = related_model._default_manager.all()
+            query_name = plan.model_field.related_query_name()
+            related_values = {pk: [] for pk in pks}
+            # the default ordering of the related model is kept, the same as the prefetched relations.
+            for pk, value in queryset.filter(**{f'{query_name}__in': pks}).values_list(query_name, plan.value_name):
+                related_values[pk].append(value)
+            for row in rows:
+                row[key] = related_values[row[pk_name]]
+
+    def represent(self, rows, fields, get_prefetch_queryset=None):
+        """
+            Represents the rows by the serializer `fields` that are bound to the request.
+        """
+        rows = list(rows)
+        self.fetch_many(rows, get_prefetch_queryset)
+        converters = [(plan.field_name, plan.bind(fields[plan.field_name])) for plan in self.fields]
+        return [{field_name: convert(row) for field_name, convert in converters} for row in rows]
+
+
+def get_model_field(model, name):
+    try:
+        return model._meta.get_field(name)
+    except FieldDoesNotExist:
+        raise NotCompilable(f'{model.__name__}.{name} is not a model field.')
+
+
+def compile_field(field, model, prefix=''):
+    if isinstance(field, serializers.HyperlinkedIdentityField):
+        lookup_field = model._meta.pk.name if field.lookup_field == 'pk' else field.lookup_field
+        get_model_field(model, lookup_field)
+        keys = [prefix + model._meta.pk.name, prefix + lookup_field]
+        return FieldPlan(field.field_name, 'identity', keys)
+
+    if field.source == '*' or '.' in field.source:
+        raise NotCompilable(f'The source of the {field.field_name} field is not a model field.')
+    model_field = get_model_field(model, field.source)
+
+    if isinstance(field, ManyRelatedField):
+        child = field.child_relation
+        if prefix or not (model_field.many_to_many and model_field.concrete):
+            raise NotCompilable(f'The {field.field_name} field is not a many to many field of the model.')
+        if isinstance(child, SlugRelatedField):
+            value_name = child.slug_field
+        elif type(child) is PrimaryKeyRelatedField and child.pk_field is None:
+            value_name = 'pk'
+        else:
+            raise NotCompilable(f'The {field.field_name} field relation is not supported.')
+        return FieldPlan(field.field_name, 'many', [f'_many_{field.field_name}'], model_field, value_name=value_name)
+
+    if model_field.is_relation:
+        if not (model_field.many_to_one or model_field.one_to_one) or not model_field.concrete:
+            raise NotCompilable(f'The {field.field_name} field is not a forward relation.')
+        related_model = model_field.related_model
+        if isinstance(field, serializers.Serializer):
+            nested = [
+                compile_field(nested_field, related_model, prefix + field.source + '__')
+                for nested_field in field.fields.values() if not nested_field.write_only
+            ]
+            return FieldPlan(field.field_name, 'nested', [prefix + field.source], model_field, nested)
+        if isinstance(field, StringRelatedField) and related_model._meta.label in STRING_FIELDS:
+            key = f'{prefix}{field.source}__{STRING_FIELDS[related_model._meta.label]}'
+            return FieldPlan(field.field_name, 'string', [key], model_field)
+        raise NotCompilable(f'The {field.field_name} field relation is not supported.')
+
+    if isinstance(field, serializers.FileField):
+        return FieldPlan(field.field_name, 'file', [prefix + field.source], model_field)
+    if isinstance(field, (serializers.Serializer, serializers.SerializerMethodField, serializers.HiddenField)):
+        raise NotCompilable(f'The {field.field_name} field is not a model field representation.')
+    return FieldPlan(field.field_name, 'value', [prefix + field.source], model_field)
+
+
+@lru_cache(maxsize=None)
+def get_compiled_plan(serializer_class):
+    """
+        Compiles the readable fields of the serializer class once per process, or returns None if a field can not be
+        read from the `.values()` rows.
+    """
+    serializer = serializer_class()
+    model = serializer_class.Meta.model
+    try:
+        fields = [compile_field(field, model) for field in serializer.fields.values() if not field.write_only]
+    except NotCompilable:
+        return None
+    return CompiledPlan(model, fields)
@@ -0,0 +1,209 @@
+import datetime
+import json
+import tempfile
+import time
+import uuid
+from collections import namedtuple
+from contextlib import contextmanager
+from decimal import Decimal
+from itertools import islice
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from .caching import ALL_SCOPE, bump_generations
+from .models import Tag, Post, Comment, Reply
+from .search import get_search_backend
+
+
+def get_content_models():
+    # the dependency order, every model only refers to itself and the models before it.
+    return [get_user_model(), Tag, Post, Comment, Reply]
+
+
+def get_ordering(model):
+    # the replies are exported in the order of their creation, so the addsigns are usually before their adds.
+    if model is Reply:
+        return ['replied_at', 'pk']
+    return ['pk']
+
+
+class TransferStats(namedtuple('TransferStats', ['label', 'count', 'seconds'])):
+
+    def __str__(self):
+        rate = self.count / self.seconds if self.seconds else 0
+        return f'{self.label}: {self.count} object(s) in {self.seconds:.2f}s ({rate:.0f} objects/s).'
+
+
+def encode_value(value):
+    # unlike the DjangoJSONEncoder, the microseconds of the times are kept.
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable.')
+
+
+def dump_record(label, fields):
+    return json.dumps({'model': label, 'fields': fields}, default=encode_value, ensure_ascii=False)
+
+
+def get_tag_pks(post_pks):
+    tag_pks = {pk: [] for pk in post_pks}
+    through = Post.tags.through.objects.filter(post__in=post_pks).order_by('tag_id')
+    for post_pk, tag_pk in through.values_list('post_id', 'tag_id'):
+        tag_pks[post_pk].append(tag_pk)
+    return tag_pks
+
+
+def export_model(model, write, chunk_size=2000):
+    """
+        Writes the NDJSON records of the `model` objects by the `write(line)` callable, the rows are read by the
+        database cursor in chunks of `chunk_size` and only a chunk is in memory at a time.
+    """
+    label = model._meta.label_lower
+    attnames = [field.attname for field in model._meta.concrete_fields]
+    rows = model._default_manager.order_by(*get_ordering(model)).values_list(*attnames)
+    rows = rows.iterator(chunk_size=chunk_size)
+    count = 0
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return count
+        tag_pks = get_tag_pks([row[0] for row in chunk]) if model is Post else None
+        for row in chunk:
+            fields = dict(zip(attnames, row))
+            if tag_pks is not None:
+                fields['tags'] = tag_pks[row[0]]
+            write(dump_record(label, fields))
+        count += len(chunk)
+
+
+def export_content(write, chunk_size=2000):
+    """
+        Exports the users, tags, posts, comments and replies in their dependency order and returns the stats of
+        each model.
+    """
+    stats = []
+    for model in get_content_models():
+        start = time.perf_counter()
+        count = export_model(model, write, chunk_size)
+        stats.append(TransferStats(model._meta.label_lower, count, time.perf_counter() - start))
+    return stats
+
+
+class ContentImportError(Exception):
+    pass
+
+
+@contextmanager
+def preserved_timestamps(model):
+    """
+        Turns off the `auto_now` and the `auto_now_add` of the model date fields in the block, so the bulk created
+        objects keep the imported dates.
+    """
+    fields = [field for field in model._meta.concrete_fields if getattr(field, 'auto_now', False) or
+              getattr(field, 'auto_now_add', False)]
+    flags = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, flags):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class ContentImporter:
+    """
+        Imports the NDJSON records by batched bulk_creates, the records of a model are kept in memory only until
+        their batch is created. the addsigns of the replies are written to a temporary file and set after all the
+        replies exist, so the adds may be imported before their addsigns.
+    """
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        self.models = {model._meta.label_lower: model for model in get_content_models()}
+        self.model_indexes = {label: index for index, label in enumerate(self.models)}
+        self.stats = {}
+        self.addsigns_file = None
+
+    def parse_line(self, line_number, line):
+        try:
+            record = json.loads(line)
+            label, fields = record['model'], record['fields']
+        except (ValueError, TypeError, KeyError) as exc:
+            raise ContentImportError(f'Line {line_number} is not a content record: {exc}')
+        if label not in self.models:
+            raise ContentImportError(f'Line {line_number} has the unknown model "{label}".')
+        return label, fields
+
+    def make_object(self, model, fields):
+        fields = dict(fields)
+        tag_pks = fields.pop('tags', [])
+        values = {}
+        for field in model._meta.concrete_fields:
+            if field.attname in fields:
+                values[field.attname] = field.to_python(fields[field.attname])
+        if model is Reply and values.get('addsign_id') is not None:
+            self.addsigns_file.write(json.dumps([str(values['id']), str(values['addsign_id'])]) + '\n')
+            values['addsign_id'] = None
+        return model(**values), tag_pks
+
+    def create_batch(self, model, batch):
+        objs_and_tags = [self.make_object(model, fields) for fields in batch]
+        objs = [obj for obj, _ in objs_and_tags]
+        with preserved_timestamps(model):
+            model._default_manager.bulk_create(objs, batch_size=self.batch_size)
+        if model is Post:
+            through = Post.tags.through
+            through.objects.bulk_create([
+                through(post_id=obj.pk, tag_id=tag_pk) for obj, tag_pks in objs_and_tags for tag_pk in tag_pks
+            ], batch_size=self.batch_size)
+            # the bulk created posts do not send the save signals that index them.
+            get_search_backend().index_posts([obj.pk for obj in objs])
+
+    def set_addsigns(self):
+        self.addsigns_file.seek(0)
+        lines = iter(self.addsigns_file)
+        while True:
+            pairs = [json.loads(line) for line in islice(lines, self.batch_size)]
+            if not pairs:
+                return
+            Reply.objects.bulk_update(
+                [Reply(pk=uuid.UUID(pk), addsign_id=uuid.UUID(addsign_pk)) for pk, addsign_pk in pairs], ['addsign']
+            )
+
+    def add_stats(self, label, count, seconds):
+        previous = self.stats.get(label, TransferStats(label, 0, 0))
+        self.stats[label] = TransferStats(label, previous.count + count, previous.seconds + seconds)
+
+    def import_lines(self, lines):
+        """
+            Imports the records of the `lines` iterable in one transaction and returns the stats of each model.
+        """
+        with tempfile.TemporaryFile('w+', encoding='utf-8') as self.addsigns_file, transaction.atomic():
+            label, batch, last_index = None, [], 0
+            start = time.perf_counter()
+            for line_number, line in enumerate(lines, 1):
+                if not line.strip():
+                    continue
+                record_label, fields = self.parse_line(line_number, line)
+                if self.model_indexes[record_label] < last_index:
+                    raise ContentImportError(
+                        f'Line {line_number} has a {record_label} record after the {label} records, the records '
+                        f'must be in the dependency order of the export.'
+                    )
+                if batch and (record_label != label or len(batch) >= self.batch_size):
+                    self.create_batch(self.models[label], batch)
+                    self.add_stats(label, len(batch), time.perf_counter() - start)
+                    batch, start = [], time.perf_counter()
+                label, last_index = record_label, self.model_indexes[record_label]
+                batch.append(fields)
+            if batch:
+                self.create_batch(self.models[label], batch)
+                self.add_stats(label, len(batch), time.perf_counter() - start)
+            start = time.perf_counter()
+            self.set_addsigns()
+            if Reply._meta.label_lower in self.stats:
+                self.add_stats(Reply._meta.label_lower, 0, time.perf_counter() - start)
+        # the objects are created without the signals, so invalidating all the cached responses.
+        bump_generations([ALL_SCOPE])
+        return list(self.stats.values())
@@ -0,0 +1,76 @@
+from collections import namedtuple
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from .models import Post, Comment, Reply
+
+
+class RelatedCounter(namedtuple('RelatedCounter', ['model', 'field_name', 'counter_name', 'conditions'],
+                                defaults=[None])):
+    """
+        A stored counter column on the related model of `model.field_name` that counts the `model` objects, that
+        match the `conditions` if given.
+    """
+    @property
+    def counter_model(self):
+        return self.model._meta.get_field(self.field_name).related_model
+
+    def update(self, pk, delta):
+        if pk is None:
+            return 0
+        return self.update_many([pk], delta)
+
+    def update_many(self, pks, delta):
+        if not pks or not delta:
+            return 0
+        queryset = self.counter_model._default_manager.filter(pk__in=pks)
+        if delta < 0:
+            # never going below zero even if the counter has drifted.
+            queryset = queryset.filter(**{f'{self.counter_name}__gte': -delta})
+        return queryset.update(**{self.counter_name: F(self.counter_name) + delta})
+
+    def actual_count_subquery(self):
+        counted_queryset = self.model._default_manager.filter(**{self.field_name: OuterRef('pk')})
+        if self.conditions:
+            counted_queryset = counted_queryset.filter(**self.conditions)
+        counted_queryset = counted_queryset.order_by().values(self.field_name).annotate(count=Count('pk'))
+        return Coalesce(Subquery(counted_queryset.values('count')), 0)
+
+    def reconcile(self, batch_size=1000):
+        """
+            Fixes the drifted counters in batches of `batch_size` counter objects and returns the fixed ones count.
+        """
+        counter_queryset = self.counter_model._default_manager.order_by('pk')
+        fixed_count = 0
+        last_pk = None
+        while True:
+            batch_queryset = counter_queryset if last_pk is None else counter_queryset.filter(pk__gt=last_pk)
+            batch = list(
+                batch_queryset.annotate(actual_count=self.actual_count_subquery())
+                .only('pk', self.counter_name)[:batch_size]
+            )
+            if not batch:
+                return fixed_count
+            last_pk = batch[-1].pk
+            drifted = [obj for obj in batch if getattr(obj, self.counter_name) != obj.actual_count]
+            for obj in drifted:
+                setattr(obj, self.counter_name, obj.actual_count)
+            self.counter_model._default_manager.bulk_update(drifted, [self.counter_name])
+            fixed_count += len(drifted)
+
+
+COUNTERS = [
+    RelatedCounter(Post, 'author', 'posts_count'),
+    RelatedCounter(Comment, 'post', 'comments_count'),
+    RelatedCounter(Comment, 'author', 'comments_count'),
+    RelatedCounter(Reply, 'comment', 'replies_count'),
+    RelatedCounter(Reply, 'addsign', 'adds_count'),
+]
+
+# the counters through the many to many fields, that are updated by the m2m_changed receivers.
+M2M_COUNTERS = [
+    RelatedCounter(Post, 'tags', 'posts_count', {'status': 'p'}),
+]
+
+
+def get_model_counters(model):
+    return [counter for counter in COUNTERS if counter.model is model]
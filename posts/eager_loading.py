@@ -0,0 +1,170 @@
+from collections import namedtuple
+from functools import lru_cache
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.relations import RelatedField, ManyRelatedField
+
+
+class PrefetchPlan(namedtuple('PrefetchPlan', ['lookup', 'model', 'plan'])):
+    """
+        A prefetch lookup of the plan that its queryset will be eager loaded by the nested plan too.
+    """
+    def to_prefetch(self, get_prefetch_queryset=None, prefix=''):
+        lookup = prefix + self.lookup
+        if get_prefetch_queryset:
+            queryset = get_prefetch_queryset(lookup, self.model)
+        else:
+            queryset = self.model._default_manager.all()
+        return Prefetch(self.lookup, queryset=self.plan.apply(queryset, get_prefetch_queryset, lookup + '__'))
+
+
+class EagerLoadingPlan(namedtuple('EagerLoadingPlan', ['select_related', 'prefetch_related', 'deferred'],
+                                  defaults=[()])):
+
+    def apply(self, queryset, get_prefetch_queryset=None, prefix=''):
+        """
+            Applies the plan to the queryset. the `get_prefetch_queryset(lookup, model)` callable can be given to
+            provide the base queryset of each prefetch lookup.
+        """
+        if self.deferred:
+            queryset = queryset.defer(*self.deferred)
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(
+                *[prefetch.to_prefetch(get_prefetch_queryset, prefix) for prefetch in self.prefetch_related]
+            )
+        return queryset
+
+    def describe(self, prefix=''):
+        description = {
+            'select_related': [prefix + lookup for lookup in self.select_related],
+            'prefetch_related': [],
+            'deferred': [prefix + field_name for field_name in self.deferred],
+        }
+        for prefetch in self.prefetch_related:
+            lookup = prefix + prefetch.lookup
+            description['prefetch_related'].append(lookup)
+            nested_description = prefetch.plan.describe(lookup + '__')
+            description['select_related'] += nested_description['select_related']
+            description['prefetch_related'] += nested_description['prefetch_related']
+            description['deferred'] += nested_description['deferred']
+        return description
+
+
+def get_model_relation(model, name):
+    try:
+        model_field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    return model_field if model_field.is_relation else None
+
+
+def is_many_relation(model_field):
+    return model_field.one_to_many or model_field.many_to_many
+
+
+def needs_related_object(field):
+    # the related fields that only need the primary key are read from the foreign key column.
+    if isinstance(field, RelatedField) and field.use_pk_only_optimization():
+        return False
+    return True
+
+
+def plan_fields(fields, model, select_related, prefetch_related, prefix=''):
+    for field in fields.values():
+        if field.write_only:
+            continue
+
+        if field.source == '*':
+            if isinstance(field, serializers.Serializer):
+                plan_fields(field.fields, model, select_related, prefetch_related, prefix)
+            continue
+
+        source_attrs = field.source.split('.')
+        current_model = model
+        path = prefix
+        for depth, attr in enumerate(source_attrs):
+            model_field = get_model_relation(current_model, attr)
+            if model_field is None:
+                break
+            is_last_attr = depth == len(source_attrs) - 1
+            lookup = path + attr
+
+            if is_many_relation(model_field):
+                if isinstance(field, serializers.ListSerializer) and is_last_attr:
+                    child_plan = build_plan(field.child, model_field.related_model)
+                elif isinstance(field, ManyRelatedField) and is_last_attr:
+                    child_plan = EagerLoadingPlan([], [])
+                else:
+                    break
+                prefetch_related.append(PrefetchPlan(lookup, model_field.related_model, child_plan))
+                break
+
+            if is_last_attr:
+                if isinstance(field, serializers.Serializer):
+                    select_related.append(lookup)
+                    plan_fields(field.fields, model_field.related_model, select_related, prefetch_related,
+                                lookup + '__')
+                elif isinstance(field, RelatedField) and needs_related_object(field):
+                    select_related.append(lookup)
+                break
+
+            select_related.append(lookup)
+            current_model = model_field.related_model
+            path = lookup + '__'
+
+
+def get_read_sources(fields):
+    """
+        Returns the first source attributes of the readable fields, or None if a field may read any attribute.
+    """
+    sources = set()
+    for field in fields.values():
+        if field.write_only:
+            continue
+        if field.source == '*':
+            if isinstance(field, serializers.Serializer):
+                nested_sources = get_read_sources(field.fields)
+                if nested_sources is None:
+                    return None
+                sources |= nested_sources
+            elif not isinstance(field, serializers.HyperlinkedIdentityField):
+                return None
+            continue
+        sources.add(field.source.split('.')[0])
+    return sources
+
+
+def get_deferred_fields(fields, model):
+    # the large text columns that the serializer does not read, like the descriptions of the list pages.
+    sources = get_read_sources(fields)
+    if sources is None:
+        return []
+    model_field_names = {model_field.name for model_field in model._meta.get_fields()}
+    model_field_names |= {model_field.attname for model_field in model._meta.concrete_fields}
+    if not sources <= model_field_names:
+        # the methods and properties may read any field.
+        return []
+    return [
+        model_field.name for model_field in model._meta.concrete_fields
+        if isinstance(model_field, models.TextField) and model_field.name not in sources
+    ]
+
+
+def build_plan(serializer, model):
+    select_related = []
+    prefetch_related = []
+    plan_fields(serializer.fields, model, select_related, prefetch_related)
+    deferred = get_deferred_fields(serializer.fields, model)
+    return EagerLoadingPlan(list(dict.fromkeys(select_related)), prefetch_related, deferred)
+
+
+@lru_cache(maxsize=None)
+def get_serializer_plan(serializer_class):
+    """
+        Builds the eager loading plan of the serializer class fields tree once per process.
+    """
+    return build_plan(serializer_class(), serializer_class.Meta.model)
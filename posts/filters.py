@@ -1,18 +1,47 @@
 from django_filters import rest_framework as filters
+from django_filters.constants import EMPTY_VALUES
+from rest_framework.filters import SearchFilter
 from .models import Post, Comment, Reply
+from .search import DOCUMENT_FIELDS, get_search_backend, get_search_settings
+
+
+class PostSearchFilter(SearchFilter):
+    """
+        The `?search=` filter of the posts that runs on the search backend and orders the results by rank.
+    """
+    def get_document_fields(self, view):
+        lookup_fields = {lookup: field for field, lookup in DOCUMENT_FIELDS.items()}
+        return [lookup_fields[search_field] for search_field in self.get_search_fields(view, self.request)]
+
+    def filter_queryset(self, request, queryset, view):
+        self.request = request
+        search_terms = self.get_search_terms(request)
+        if not search_terms:
+            return queryset
+        return get_search_backend().search(queryset, search_terms, self.get_document_fields(view))
+
+
+class PostSearchCharFilter(filters.CharFilter):
+    """
+        An icontains filter that routes through the search backend if `POSTS_SEARCH['ROUTE_FILTERSET']` is set.
+    """
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES or not get_search_settings()['ROUTE_FILTERSET']:
+            return super().filter(qs, value)
+        return get_search_backend().search(qs, [value], [self.field_name], ranked=False)
 
 
 class PostFilterSet(filters.FilterSet):
     author = filters.CharFilter(field_name='author__username', lookup_expr='exact', label='Author')
     topic_icontains = filters.CharFilter(field_name='tags__tag', lookup_expr='icontains',
                                          label='Topic contains')
+    title__icontains = PostSearchCharFilter(field_name='title', lookup_expr='icontains', label='Title contains')
+    description__icontains = PostSearchCharFilter(field_name='description', lookup_expr='icontains',
+                                                  label='Description contains')
 
     class Meta:
         model = Post
-        icontains_list = ['icontains', ]
         fields = {
-            'title': icontains_list,
-            'description': icontains_list,
             'status': ['exact', ]
         }
 
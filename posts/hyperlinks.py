@@ -0,0 +1,113 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+from urllib.parse import quote
+from django.urls import get_resolver, get_script_prefix, get_urlconf
+from django.utils.http import RFC3986_SUBDELIMS, escape_leading_slashes
+from rest_framework import serializers
+from rest_framework.relations import PKOnlyObject
+from rest_framework.settings import api_settings
+from rest_framework.versioning import BaseVersioning
+from posts.base_views import memoize_for_request
+
+# the safe characters of the django's reverse, from the `pchar` definition of RFC 3986.
+URL_SAFE_CHARACTERS = RFC3986_SUBDELIMS + '/~:@'
+PARAM_PATTERN = re.compile(r'%\((\w+)\)s')
+
+
+class URLTemplate(namedtuple('URLTemplate', ['parts', 'params', 'converters'])):
+    """
+        The url pattern of a view name that is formatted by the kwargs, the same as the django's reverse but
+        without searching the url patterns. `parts` are the quoted static parts between the `params`.
+    """
+    def format(self, kwargs, script_prefix='/'):
+        url = [script_prefix, self.parts[0]]
+        for param, part in zip(self.params, self.parts[1:]):
+            value = kwargs[param]
+            text = self.converters[param].to_url(value) if param in self.converters else str(value)
+            url += [quote(text, safe=URL_SAFE_CHARACTERS), part]
+        return escape_leading_slashes(''.join(url))
+
+
+@lru_cache(maxsize=None)
+def get_url_template(view_name, kwarg_names, urlconf=None):
+    """
+        Returns the template of the first url pattern of the view name that has exactly the `kwarg_names`, the same
+        as the pattern that the reverse chooses, or None if there is not such a pattern.
+    """
+    for possibility, pattern, defaults, converters in get_resolver(urlconf).reverse_dict.getlist(view_name):
+        for result, params in possibility:
+            if defaults or set(params) != set(kwarg_names):
+                continue
+            pieces = PARAM_PATTERN.split(result)
+            # the literal percent signs of the patterns are escaped as '%%'.
+            parts = [quote(piece.replace('%%', '%'), safe=URL_SAFE_CHARACTERS) for piece in pieces[::2]]
+            return URLTemplate(parts, pieces[1::2], converters)
+    return None
+
+
+class URLTemplateContext(namedtuple('URLTemplateContext', ['usable', 'urlconf', 'script_prefix', 'host_prefix'])):
+    pass
+
+
+def get_url_template_context(request):
+    """
+        Returns what the url templates need from the request, once per request.
+    """
+    def make_context():
+        # the `format` query parameter and the versioning reverses need the DRF's reverse.
+        versioning_scheme = getattr(request, 'versioning_scheme', None)
+        usable = api_settings.URL_FORMAT_OVERRIDE not in request.GET and (
+            versioning_scheme is None or type(versioning_scheme).reverse is BaseVersioning.reverse
+        )
+        return URLTemplateContext(
+            usable, get_urlconf(), quote(get_script_prefix(), safe=URL_SAFE_CHARACTERS),
+            request.build_absolute_uri('/')[:-1]
+        )
+    return memoize_for_request(request, 'url_template_context', make_context)
+
+
+class URLTemplateMixin:
+    """
+        Formats the hyperlinks by the url templates of the view names, that are resolved once per process, instead of
+        reversing and building the absolute url of every object.
+    """
+    def get_url(self, obj, view_name, request, format):
+        if format or request is None:
+            return super().get_url(obj, view_name, request, format)
+        context = get_url_template_context(request)
+        template = get_url_template(view_name, (self.lookup_url_kwarg, ), context.urlconf) if context.usable else None
+        if template is None:
+            return super().get_url(obj, view_name, request, format)
+
+        # unsaved objects will not yet have a valid url.
+        if hasattr(obj, 'pk') and obj.pk in (None, ''):
+            return None
+        path = template.format({self.lookup_url_kwarg: getattr(obj, self.lookup_field)}, context.script_prefix)
+        return context.host_prefix + path
+
+
+class TemplateHyperlinkedRelatedField(URLTemplateMixin, serializers.HyperlinkedRelatedField):
+    pass
+
+
+class TemplateHyperlinkedPKField(TemplateHyperlinkedRelatedField):
+    """
+        The hyperlinks of the pks that the source returns, like the ancestors of the reply paths, without fetching
+        their objects.
+    """
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return super().to_representation(PKOnlyObject(pk=value))
+
+
+class TemplateHyperlinkedIdentityField(URLTemplateMixin, serializers.HyperlinkedIdentityField):
+    pass
+
+
+class TemplateHyperlinkedModelSerializer(serializers.HyperlinkedModelSerializer):
+    serializer_related_field = TemplateHyperlinkedRelatedField
+    serializer_url_field = TemplateHyperlinkedIdentityField
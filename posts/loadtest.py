@@ -0,0 +1,300 @@
+import http.client
+import json
+import random
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from urllib.parse import urlencode
+from django.contrib.auth import get_user_model
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from rest_framework.authtoken.models import Token
+from .benchmarking import create_users, create_posts, get_load_stats
+from .caching import ALL_SCOPE, bump_generations
+from .counters import COUNTERS, M2M_COUNTERS
+from .models import Tag, Post, Comment, Reply
+from .search import get_search_backend
+
+ENDPOINT_HEADER = 'X-Load-Test-Endpoint'
+
+
+class SeedVolumes(namedtuple('SeedVolumes', [
+    'users', 'tags', 'posts', 'tags_per_post', 'comments_per_post', 'reply_chains_per_comment', 'reply_depth'
+], defaults=[50, 20, 1000, 2, 5, 1, 5])):
+    """
+        The seeded objects counts, the posts tags, comments and reply chains are counted for each post or comment.
+    """
+
+
+def create_reply_chains(comments, authors, chains_per_comment, depth, rng, batch_size):
+    """
+        Bulk creates `chains_per_comment` chains of `depth` replies under each of the comments, every reply is the
+        add of the previous one. the paths and the descendants counts are computed here, as the chains are known.
+    """
+    level = [None] * (len(comments) * chains_per_comment)
+    count = 0
+    for level_index in range(depth):
+        replies = []
+        for i, addsign in enumerate(level):
+            comment = comments[i // chains_per_comment]
+            reply = Reply(
+                comment=comment, author=rng.choice(authors), addsign=addsign,
+                reply=f'Load test reply{level_index} of the chain{i % chains_per_comment}',
+                descendants_count=depth - level_index - 1,
+            )
+            reply.update_excerpts()
+            reply.update_tree_path(addsign.path if addsign else '')
+            replies.append(reply)
+        Reply.objects.bulk_create(replies, batch_size=batch_size)
+        count += len(replies)
+        level = replies
+    return count
+
+
+def seed_content(volumes=SeedVolumes(), batch_size=2000, seed=0):
+    """
+        Bulk creates the users, tags, posts with their tags, comments and reply chains of the `volumes`, a batch of
+        `batch_size` posts and their children at a time, then reconciles the counters and indexes the posts. the
+        signals are not sent, so it is only for the throwaway databases. returns the created objects counts.
+    """
+    rng = random.Random(seed)
+    create_users(volumes.users, prefix='loaduser')
+    # the bulk created users may not have their primary keys.
+    authors = list(get_user_model().objects.filter(username__startswith='loaduser'))
+    tags = Tag.objects.bulk_create([Tag(tag=f'loadtag{i}') for i in range(volumes.tags)])
+    create_posts(volumes.posts, authors, batch_size=batch_size, description='A load test post description.')
+    counts = {'users': len(authors), 'tags': len(tags), 'posts': volumes.posts, 'comments': 0, 'replies': 0}
+
+    through = Post.tags.through
+    search_backend = get_search_backend()
+    posts = Post.objects.order_by('pk').values_list('pk', 'status').iterator(chunk_size=batch_size)
+    while True:
+        batch = list(islice(posts, batch_size))
+        if not batch:
+            break
+        through.objects.bulk_create([
+            through(post_id=pk, tag_id=tag.pk)
+            for pk, _ in batch for tag in rng.sample(tags, min(volumes.tags_per_post, len(tags)))
+        ], batch_size=batch_size)
+        # only the published posts are commented.
+        comments = []
+        for pk, post_status in batch:
+            for i in range(volumes.comments_per_post if post_status == 'p' else 0):
+                comment = Comment(post_id=pk, author=rng.choice(authors), comment=f'Load test comment{i}')
+                comment.update_excerpts()
+                comments.append(comment)
+        Comment.objects.bulk_create(comments, batch_size=batch_size)
+        counts['comments'] += len(comments)
+        counts['replies'] += create_reply_chains(
+            comments, authors, volumes.reply_chains_per_comment, volumes.reply_depth, rng, batch_size
+        )
+        search_backend.index_posts([pk for pk, _ in batch])
+
+    for counter in COUNTERS + M2M_COUNTERS:
+        counter.reconcile(batch_size=batch_size)
+    bump_generations([ALL_SCOPE])
+    return counts
+
+
+class Endpoint(namedtuple('Endpoint', ['name', 'method', 'weight', 'make_request'])):
+    """
+        A route of the load test, `make_request(sample, rng)` returns the path and the JSON body of a request.
+    """
+
+
+def get_sample(size=100, seed=0):
+    # the objects that the requests are made for.
+    rng = random.Random(seed)
+    post_pks = list(Post.objects.published().values_list('pk', flat=True)[:size * 10])
+    comment_pks = list(Comment.objects.filter(post__in=rng.sample(post_pks, min(size, len(post_pks))))
+                       .values_list('pk', flat=True)[:size])
+    return {
+        'posts': rng.sample(post_pks, min(size, len(post_pks))),
+        'comments': comment_pks,
+        'tags': list(Tag.objects.values_list('tag', flat=True)[:size]),
+        'users': list(get_user_model().objects.values_list('slug', flat=True)[:size]),
+    }
+
+
+def get_endpoints():
+    return [
+        Endpoint('post-list', 'GET', 10, lambda sample, rng: ('/api/posts/', None)),
+        Endpoint('post-detail', 'GET', 10, lambda sample, rng: (f'/api/posts/{rng.choice(sample["posts"])}/', None)),
+        Endpoint('post-search', 'GET', 3, lambda sample, rng: (
+            '/api/posts/?' + urlencode({'search': f'post{rng.randrange(100)}'}), None
+        )),
+        Endpoint('post-filter', 'GET', 3, lambda sample, rng: (
+            '/api/posts/?' + urlencode({'topic_icontains': rng.choice(sample['tags']), 'ordering': '-created_at'}),
+            None
+        )),
+        Endpoint('tag-post-list', 'GET', 3, lambda sample, rng: (
+            f'/api/posts/tags/{rng.choice(sample["tags"])}/posts/', None
+        )),
+        Endpoint('post-comment-list', 'GET', 8, lambda sample, rng: (
+            f'/api/posts/{rng.choice(sample["posts"])}/comments/', None
+        )),
+        Endpoint('comment-reply-list', 'GET', 4, lambda sample, rng: (
+            f'/api/posts/comments/{rng.choice(sample["comments"])}/replies/', None
+        )),
+        Endpoint('comment-thread', 'GET', 2, lambda sample, rng: (
+            f'/api/posts/comments/{rng.choice(sample["comments"])}/thread/', None
+        )),
+        Endpoint('user-post-list', 'GET', 2, lambda sample, rng: (
+            f'/api/users/{rng.choice(sample["users"])}/posts/', None
+        )),
+        Endpoint('post-create', 'POST', 1, lambda sample, rng: (
+            '/api/posts/', {'title': 'A load test post', 'description': 'Created by the load test.', 'status': 'p'}
+        )),
+        Endpoint('post-comment-create', 'POST', 1, lambda sample, rng: (
+            f'/api/posts/{rng.choice(sample["posts"])}/comments/', {'comment': 'A load test comment'}
+        )),
+    ]
+
+
+class LoadTestServer(ThreadedWSGIServer):
+    # the default backlog of 5 connections makes the other clients retry their connections after a second.
+    request_queue_size = 128
+
+
+class QuietWSGIRequestHandler(WSGIRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+
+class QueryCountingApplication:
+    """
+        Wraps the WSGI application and records the queries count of every request by the endpoint name of its
+        `X-Load-Test-Endpoint` header.
+    """
+    def __init__(self, application):
+        self.application = application
+        self.query_counts = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        count = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal count
+            count += 1
+            return execute(sql, params, many, context)
+
+        # the responses of the API views are rendered before they are returned.
+        with connection.execute_wrapper(count_query):
+            response = self.application(environ, start_response)
+        name = environ.get('HTTP_' + ENDPOINT_HEADER.upper().replace('-', '_'))
+        with self.lock:
+            self.query_counts.setdefault(name, []).append(count)
+        return response
+
+
+@contextmanager
+def local_server():
+    """
+        Serves the project by a threaded WSGI server on a free local port in the block, and yields its address and
+        the query counting application.
+    """
+    application = QueryCountingApplication(get_wsgi_application())
+    server = LoadTestServer(('127.0.0.1', 0), QuietWSGIRequestHandler, allow_reuse_address=False)
+    server.set_app(application)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.server_address, application
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def send_request(address, method, path, body, headers):
+    http_connection = http.client.HTTPConnection(*address, timeout=60)
+    try:
+        http_connection.request(method, path, json.dumps(body) if body is not None else None, headers)
+        response = http_connection.getresponse()
+        response.read()
+        return response.status
+    finally:
+        http_connection.close()
+
+
+def run_load(address, endpoints, sample, tokens, requests=1000, concurrency=16, seed=0):
+    """
+        Sends `requests` requests of the weighted endpoints to the server by `concurrency` clients, each client has
+        its own user token. returns the `(endpoint name, milliseconds, status)` records and the wall seconds.
+    """
+    records = []
+    lock = threading.Lock()
+
+    def client(client_index):
+        rng = random.Random(seed + client_index)
+        headers = {
+            'Authorization': f'Token {tokens[client_index % len(tokens)]}', 'Content-Type': 'application/json',
+        }
+        for _ in range(client_index, requests, concurrency):
+            endpoint = rng.choices(endpoints, weights=[endpoint.weight for endpoint in endpoints])[0]
+            path, body = endpoint.make_request(sample, rng)
+            start = time.perf_counter()
+            response_status = send_request(
+                address, endpoint.method, path, body, {**headers, ENDPOINT_HEADER: endpoint.name}
+            )
+            with lock:
+                records.append((endpoint.name, (time.perf_counter() - start) * 1000, response_status))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        list(executor.map(client, range(concurrency)))
+    return records, time.perf_counter() - start
+
+
+def create_tokens(count):
+    return [Token.objects.get_or_create(user=user)[0].key for user in get_user_model().objects.order_by('pk')[:count]]
+
+
+def summarize(records, seconds, query_counts):
+    """
+        Returns the throughput, the latency percentiles, the errors and the mean queries of each endpoint and of
+        all of them, as a JSON serializable dict.
+    """
+    def summarize_records(endpoint_records, endpoint_query_counts):
+        stats = get_load_stats([duration for _, duration, _ in endpoint_records], seconds)
+        return {
+            'requests': stats.count,
+            'errors': sum(1 for _, _, response_status in endpoint_records if response_status >= 400),
+            'requests_per_second': round(stats.count / seconds, 2) if seconds else 0,
+            'p50_ms': round(stats.p50, 2), 'p95_ms': round(stats.p95, 2), 'p99_ms': round(stats.p99, 2),
+            'mean_queries': round(sum(endpoint_query_counts) / len(endpoint_query_counts), 2)
+            if endpoint_query_counts else None,
+        }
+
+    endpoints = {}
+    for name in sorted({name for name, _, _ in records}):
+        endpoints[name] = summarize_records(
+            [record for record in records if record[0] == name], query_counts.get(name, [])
+        )
+    all_query_counts = [count for counts in query_counts.values() for count in counts]
+    return {'endpoints': endpoints, 'total': summarize_records(records, all_query_counts) if records else None}
+
+
+def compare_results(previous, current):
+    """
+        Yields the changes of the throughput and the p95 and p99 latencies of the endpoints from a previous result.
+    """
+    def change(old, new):
+        if not old or new is None:
+            return 'n/a'
+        return f'{(new - old) / old * 100:+.1f}%'
+
+    for name, stats in [*current['endpoints'].items(), ('total', current['total'])]:
+        old_stats = previous['total'] if name == 'total' else previous['endpoints'].get(name)
+        if not old_stats or not stats:
+            continue
+        yield (
+            f'{name}: requests/s {change(old_stats["requests_per_second"], stats["requests_per_second"])}, '
+            f'p95 {change(old_stats["p95_ms"], stats["p95_ms"])}, p99 {change(old_stats["p99_ms"], stats["p99_ms"])}'
+        )
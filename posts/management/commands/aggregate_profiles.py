@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from posts.profiling import get_profiling_settings, list_profiles, aggregate_profiles
+
+
+class Command(BaseCommand):
+    help = 'Aggregates the request profiles into the top hot functions across the samples.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--directory', help='Directory of the profiles, the POSTS_PROFILING one by default.')
+        parser.add_argument('--url-name', help='Only the profiles of this url name.')
+        parser.add_argument('--method', help='Only the profiles of this HTTP method.')
+        parser.add_argument('--api-version', help='Only the profiles of this API version.')
+        parser.add_argument('--top', type=int, default=20, help='Number of the reported functions.')
+        parser.add_argument('--sort', choices=['tottime', 'cumtime'], default='tottime',
+                            help='Order of the functions, by their own or cumulative time.')
+
+    def handle(self, *args, **options):
+        directory = options['directory'] or get_profiling_settings()['DIRECTORY']
+        profiles = [
+            profile for profile in list_profiles(directory)
+            if options['url_name'] in (None, profile.url_name)
+            and (options['method'] or profile.method).upper() == profile.method
+            and options['api_version'] in (None, profile.version)
+        ]
+        if not profiles:
+            raise CommandError(f'No profiles in {directory} match the filters.')
+        mean_ms = sum(profile.ms for profile in profiles) / len(profiles)
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{len(profiles)} profile(s), {mean_ms:.0f} ms per request on average, top {options["top"]} functions by '
+            f'{options["sort"]}:'
+        ))
+        for function in aggregate_profiles(profiles, options['sort'], options['top']):
+            self.stdout.write(
+                f'  {function.total_seconds * 1000 / len(profiles):8.2f} ms own, '
+                f'{function.cumulative_seconds * 1000 / len(profiles):8.2f} ms cumulative, '
+                f'{function.calls / len(profiles):8.1f} calls per request  {function.function}'
+            )
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from posts.caching import ALL_SCOPE, bump_generations
+from posts.models import Post, Comment, Reply, formatted_text
+
+
+def backfill_excerpts(model, batch_size=1000, excerpt_fields=None):
+    """
+        Computes the stored excerpts of the `model` objects in batches of `batch_size` and returns the updated ones
+        count. the `excerpt_fields` of the historical models in the migrations are given, as they have no methods
+        and attributes of the current models.
+    """
+    if excerpt_fields is None:
+        excerpt_fields = model.excerpt_fields
+    excerpt_names = [excerpt_name for excerpt_name, _, _ in excerpt_fields]
+    source_names = [source_name for _, source_name, _ in excerpt_fields]
+    queryset = model._default_manager.order_by('pk').only('pk', *excerpt_names, *source_names)
+    updated_count = 0
+    last_pk = None
+    while True:
+        batch_queryset = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        batch = list(batch_queryset[:batch_size])
+        if not batch:
+            return updated_count
+        last_pk = batch[-1].pk
+        outdated = []
+        for obj in batch:
+            excerpts = [getattr(obj, excerpt_name) for excerpt_name in excerpt_names]
+            for excerpt_name, source_name, maximum_spaces in excerpt_fields:
+                setattr(obj, excerpt_name, formatted_text(getattr(obj, source_name), maximum_spaces))
+            if excerpts != [getattr(obj, excerpt_name) for excerpt_name in excerpt_names]:
+                outdated.append(obj)
+        model._default_manager.bulk_update(outdated, excerpt_names)
+        updated_count += len(outdated)
+
+
+class Command(BaseCommand):
+    help = 'Computes the stored excerpts of the existing posts, comments and replies.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of objects that are updated in each batch.')
+
+    def handle(self, *args, **options):
+        for model in [Post, Comment, Reply]:
+            updated_count = backfill_excerpts(model, batch_size=options['batch_size'])
+            self.stdout.write(f'{model._meta.label}: {updated_count} excerpt(s) updated.')
+        # the excerpts are updated without the signals, so invalidating all the cached responses.
+        bump_generations([ALL_SCOPE])
+        self.stdout.write(self.style.SUCCESS('Excerpts backfilled.'))
@@ -0,0 +1,187 @@
+import asyncio
+import importlib
+import io
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import override_settings
+from django.urls import clear_url_caches
+from posts.async_views import get_async_read_settings
+from posts.benchmarking import benchmark_database, create_users, get_load_stats
+from posts.models import Tag, Post, Comment
+
+
+@contextmanager
+def simulated_db_latency(seconds):
+    """
+        Sleeps `seconds` before every query of the block, as a remote database would. the connections of the request
+        threads are created in the block, so the wrapper is added to them by the `connection_created` signal.
+    """
+    def delay_query(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def add_wrapper(sender, connection, **kwargs):
+        if delay_query not in connection.execute_wrappers:
+            connection.execute_wrappers.append(delay_query)
+
+    connection_created.connect(add_wrapper, weak=False)
+    try:
+        yield delay_query
+    finally:
+        connection_created.disconnect(add_wrapper)
+        for connection in connections.all():
+            if delay_query in connection.execute_wrappers:
+                connection.execute_wrappers.remove(delay_query)
+
+
+@contextmanager
+def async_reads(enabled):
+    # the views are made on the import of the url confs, so they are imported again with the settings.
+    def reload_url_confs():
+        for name in ['posts.urls', settings.ROOT_URLCONF]:
+            importlib.reload(importlib.import_module(name))
+        clear_url_caches()
+
+    try:
+        with override_settings(POSTS_ASYNC_READ={**get_async_read_settings(), 'ENABLED': enabled}):
+            reload_url_confs()
+            yield
+    finally:
+        reload_url_confs()
+
+
+def split_path(path):
+    path, _, query_string = path.partition('?')
+    return path, query_string
+
+
+def wsgi_request(application, path):
+    path, query_string = split_path(path)
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query_string, 'SCRIPT_NAME': '',
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '443', 'HTTP_HOST': 'localhost',
+        'wsgi.url_scheme': 'https', 'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr, 'wsgi.version': (1, 0),
+        'wsgi.multithread': True, 'wsgi.multiprocess': False, 'wsgi.run_once': False,
+    }
+    statuses = []
+    response = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    try:
+        b''.join(response)
+    finally:
+        # sends the request_finished signal, as the WSGI servers do.
+        response.close()
+    return int(statuses[0].split()[0])
+
+
+async def asgi_request(application, path):
+    path, query_string = split_path(path)
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'https',
+        'path': path, 'raw_path': path.encode(), 'query_string': query_string.encode(), 'root_path': '',
+        'headers': [(b'host', b'localhost')], 'client': ('127.0.0.1', 0), 'server': ('localhost', 443),
+    }
+    statuses = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+
+    await application(scope, receive, send)
+    return statuses[0]
+
+
+class Command(BaseCommand):
+    help = 'Load tests the hot read endpoints by the sync WSGI workers against the async ASGI reads.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Number of the requests of each server.')
+        parser.add_argument('--concurrency', type=int, default=32, help='Number of the concurrent clients.')
+        parser.add_argument('--workers', type=int, default=4, help='Number of the sync WSGI workers.')
+        parser.add_argument('--db-latency', type=float, default=20, help='Milliseconds added to every query.')
+
+    def create_content(self):
+        create_users(1)
+        # the bulk created users may not have their primary keys.
+        author = get_user_model().objects.get()
+        tag = Tag.objects.create(tag='benchmark')
+        posts = [Post.objects.create(title=f'Benchmark post{i}', author=author, status='p') for i in range(10)]
+        for post in posts:
+            post.tags.add(tag)
+            for i in range(5):
+                Comment.objects.create(post=post, author=author, comment=f'Benchmark comment{i}')
+        post = posts[0]
+        return [
+            '/api/posts/', f'/api/posts/{post.pk}/', f'/api/posts/{post.pk}/comments/', f'/api/posts/tags/{tag.tag}/',
+        ]
+
+    def check_status(self, path, status):
+        if status != 200:
+            raise AssertionError(f'{path} responded {status}.')
+
+    def run_wsgi(self, paths, options):
+        application = get_wsgi_application()
+        durations = []
+
+        def client(client_paths):
+            for path in client_paths:
+                start = time.perf_counter()
+                # a sync worker serves one request at a time, the others wait for a free worker.
+                self.check_status(path, workers.submit(wsgi_request, application, path).result())
+                durations.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(options['workers']) as workers, ThreadPoolExecutor(options['concurrency']) as clients:
+            list(clients.map(client, self.split_paths(paths, options)))
+        return get_load_stats(durations, time.perf_counter() - start)
+
+    def run_asgi(self, paths, options):
+        application = get_asgi_application()
+        durations = []
+
+        async def client(client_paths):
+            for path in client_paths:
+                start = time.perf_counter()
+                self.check_status(path, await asgi_request(application, path))
+                durations.append((time.perf_counter() - start) * 1000)
+
+        async def run_clients():
+            await asyncio.gather(*[client(client_paths) for client_paths in self.split_paths(paths, options)])
+
+        start = time.perf_counter()
+        asyncio.run(run_clients())
+        return get_load_stats(durations, time.perf_counter() - start)
+
+    def split_paths(self, paths, options):
+        # the requests of the paths in turn, dealt to the clients.
+        requests = [paths[i % len(paths)] for i in range(options['requests'])]
+        return [requests[i::options['concurrency']] for i in range(options['concurrency'])]
+
+    def handle(self, *args, **options):
+        # without the cache, the responses are not cached and the clients are not throttled.
+        with benchmark_database(), override_settings(
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        ):
+            paths = self.create_content()
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{options["concurrency"]} concurrent clients, {options["db_latency"]} ms per query:'
+            ))
+            with simulated_db_latency(options['db_latency'] / 1000):
+                with async_reads(False):
+                    stats = self.run_wsgi(paths, options)
+                self.stdout.write(f'  WSGI, {options["workers"]} sync workers: {stats}')
+                with async_reads(True):
+                    stats = self.run_asgi(paths, options)
+                max_concurrency = get_async_read_settings()['MAX_CONCURRENCY']
+                self.stdout.write(f'  ASGI, async reads of at most {max_concurrency} at a time: {stats}')
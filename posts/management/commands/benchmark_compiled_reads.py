@@ -0,0 +1,61 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+from accounts.views import UserPostListView
+from posts.benchmarking import benchmark_database, measure, create_users, create_posts
+from posts.models import Post, Tag, Comment, Reply
+from posts.views import PostListCreateView, PostCommentListView, CommentReplyListView
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the throughput of the list endpoints with and without the compiled read path.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000, help='Number of the benchmark posts.')
+        parser.add_argument('--tags', type=int, default=3, help='Number of the tags of each post.')
+        parser.add_argument('--repeat', type=int, default=20, help='Number of the measured requests of each list.')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            create_users(1)
+            # the bulk created users may not have their primary keys.
+            author = get_user_model().objects.get()
+            create_posts(options['posts'], [author], draft_ratio=0, description='A benchmark post description')
+            tags = Tag.objects.bulk_create([Tag(tag=f'benchmark-tag{i}') for i in range(options['tags'])])
+            Post.tags.through.objects.bulk_create([
+                Post.tags.through(post_id=post_pk, tag_id=tag.pk)
+                for post_pk in Post.objects.values_list('pk', flat=True) for tag in tags
+            ])
+            post = Post.objects.first()
+            comments = Comment.objects.bulk_create([
+                Comment(post=post, author=author, comment=f'Benchmark comment{i}') for i in range(100)
+            ])
+            addsign = Reply.objects.create(comment=comments[0], author=author, reply='Benchmark addsign')
+            Reply.objects.bulk_create([
+                Reply(comment=comments[0], author=author, addsign=None if i % 2 else addsign,
+                      reply=f'Benchmark reply{i}')
+                for i in range(100)
+            ])
+
+            # the authenticated requests, so the responses are not served by the response cache.
+            lists = [
+                ('post list', PostListCreateView, '/api/posts/', {}),
+                ('user post list', UserPostListView, f'/api/users/{author.slug}/posts/', {'slug': author.slug}),
+                ('post comment list', PostCommentListView, f'/api/posts/{post.pk}/comments/', {'pk': post.pk}),
+                ('comment reply list', CommentReplyListView, f'/api/posts/comments/{comments[0].pk}/replies/',
+                 {'pk': comments[0].pk}),
+            ]
+            factory = APIRequestFactory(SERVER_NAME='localhost')
+            for list_label, view_class, path, kwargs in lists:
+                view = view_class.as_view()
+                self.stdout.write(self.style.MIGRATE_HEADING(f'{list_label}:'))
+                for label, enabled in [('serializer', False), ('compiled', True)]:
+                    def list_request():
+                        request = factory.get(path, {'page_size': 'max'})
+                        force_authenticate(request, author)
+                        return view(request, **kwargs).render()
+
+                    with override_settings(POSTS_COMPILED_READ={'ENABLED': enabled}):
+                        timing = measure(list_request, options['repeat'])
+                    self.stdout.write(f'  {label}: {timing}, {1000 / timing.median:.0f} requests/s')
@@ -0,0 +1,79 @@
+import random
+import string
+from django.core.management.base import BaseCommand
+from posts.benchmarking import benchmark_database, measure, create_users, create_posts
+from posts.models import Post, formatted_text
+
+
+def legacy_formatted_text(text, maximum_spaces=5):
+    # the previous char by char implementation of the formatted_text, kept for the comparison.
+    iterable_text = iter(text)
+    count = 0
+    new_text = ''
+
+    while count < maximum_spaces:
+        try:
+            text_char = next(iterable_text)
+        except StopIteration:
+            break
+        else:
+            new_text += text_char
+
+        if text_char == ' ':
+            count += 1
+
+    if len(text) > len(new_text):
+        etc_text = new_text + ' ...'
+        return etc_text
+
+    return text
+
+
+def make_text(size, word_size):
+    # the `word_size` of 0 makes a text without spaces, like a long link.
+    characters = random.choices(string.ascii_lowercase, k=size)
+    if word_size:
+        for index in range(word_size, size, word_size + 1):
+            characters[index] = ' '
+    return ''.join(characters)
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the excerpts of the multi-kilobyte descriptions and the list pages that defer them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1024, 4096, 16384, 65536],
+                            help='The description sizes in characters.')
+        parser.add_argument('--texts', type=int, default=200, help='Number of the texts of each size.')
+        parser.add_argument('--posts', type=int, default=2000, help='Number of the posts of the list benchmark.')
+        parser.add_argument('--repeat', type=int, default=5, help='Number of the measured runs.')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.MIGRATE_HEADING('formatted_text:'))
+        for size in options['sizes']:
+            for text_kind, word_size in [('words', 6), ('no spaces', 0)]:
+                texts = [make_text(size, word_size) for _ in range(options['texts'])]
+                assert [formatted_text(text, 10) for text in texts] == [
+                    legacy_formatted_text(text, 10) for text in texts
+                ]
+                for label, function in [('legacy', legacy_formatted_text), ('linear', formatted_text)]:
+                    timing = measure(lambda: [function(text, 10) for text in texts], options['repeat'])
+                    self.stdout.write(f'  {size} chars, {text_kind}, {label}: {timing}')
+
+        with benchmark_database():
+            authors = create_users(10)
+            description = make_text(max(options['sizes']), 6)
+            create_posts(options['posts'], authors, description=description)
+            self.stdout.write(self.style.MIGRATE_HEADING(f'a list page of {max(options["sizes"])} chars descriptions:'))
+            queryset = Post.objects.order_by('-created_at', '-id')
+            for label, page_queryset in [
+                ('computed excerpts', queryset),
+                ('stored excerpts', queryset.defer('description')),
+            ]:
+                if label == 'computed excerpts':
+                    def list_page():
+                        return [post.make_short_description() for post in page_queryset[:100]]
+                else:
+                    def list_page():
+                        return [post.short_description for post in page_queryset[:100]]
+                self.stdout.write(f'  {label}: {measure(list_page, options["repeat"])}')
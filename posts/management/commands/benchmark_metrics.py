@@ -0,0 +1,56 @@
+import tempfile
+import time
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import resolve
+from posts.metrics import MetricsFile, ROUTE, collect_metrics, get_metrics_settings, record_request, render_prometheus
+from posts.middleware import MetricsMiddleware
+
+
+def measure_microseconds(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1000000
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the recording overhead of the metrics per request and the collection of the metrics endpoint.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=100000, help='Number of the recorded requests.')
+        parser.add_argument('--workers', type=int, default=8, help='Number of the metrics files of the collection.')
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        with tempfile.TemporaryDirectory() as directory:
+            metrics_settings = {**get_metrics_settings(), 'ENABLED': True, 'DIRECTORY': directory}
+            record_microseconds = measure_microseconds(
+                lambda: record_request(metrics_settings, 'post-list', 0.012, 4, 2048), iterations
+            )
+
+            request = RequestFactory().get('/api/posts/')
+            request.resolver_match = resolve('/api/posts/')
+            response = HttpResponse(b'x' * 2048)
+            bare_microseconds = measure_microseconds(lambda: response, iterations)
+            middleware = MetricsMiddleware(lambda request: response)
+            with override_settings(POSTS_METRICS=metrics_settings):
+                middleware_microseconds = measure_microseconds(lambda: middleware(request), iterations)
+
+            # the files of the other workers, with a slot of every url name.
+            for worker in range(options['workers'] - 1):
+                metrics_file = MetricsFile(f'{directory}/metrics-benchmark{worker}.db', metrics_settings['MAX_KEYS'])
+                for i in range(40):
+                    metrics_file.add((ROUTE, f'route-{i}'), [(0, 1)])
+            collect_microseconds = measure_microseconds(lambda: render_prometheus(collect_metrics(directory)), 100)
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f'{iterations} recorded requests:'))
+        self.stdout.write(f'  record_request: {record_microseconds:.2f} us per request')
+        self.stdout.write(
+            f'  metrics middleware: {middleware_microseconds - bare_microseconds:.2f} us per request, with the '
+            f'settings lookup and the query counting wrapper'
+        )
+        self.stdout.write(
+            f'  collecting and rendering {options["workers"]} worker files: {collect_microseconds:.0f} us'
+        )
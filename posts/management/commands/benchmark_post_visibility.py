@@ -0,0 +1,56 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db import connection
+from posts.benchmarking import benchmark_database, measure, create_users, create_posts
+from posts.models import Post
+
+
+def legacy_post_queryset_for_user(user):
+    # the previous implementation of the make_post_queryset_for_user, kept for the comparison.
+    if user.is_staff:
+        return Post.objects.all()
+    published_queryset = Post.objects.published()
+    if user.is_authenticated:
+        return published_queryset | Post.objects.user_draft(user)
+    return published_queryset
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the post list queries of the visibility predicate on a throwaway database.'
+    partial_index_names = ['post_published_index', 'post_draft_author_index']
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000000, help='Number of the benchmark posts.')
+        parser.add_argument('--authors', type=int, default=1000, help='Number of the benchmark post authors.')
+        parser.add_argument('--draft-ratio', type=float, default=0.1, help='Ratio of the draft posts.')
+        parser.add_argument('--repeat', type=int, default=5, help='Number of the measured runs of each query.')
+        parser.add_argument('--explain', action='store_true', help='Prints the query plans too.')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            self.stdout.write(f'Creating {options["posts"]} posts...')
+            authors = create_users(options['authors'])
+            create_posts(options['posts'], authors, options['draft_ratio'])
+            users = {'anonymous': AnonymousUser(), 'author': authors[0]}
+
+            self.run_benchmarks('with partial indexes', users, options)
+            partial_indexes = [index for index in Post._meta.indexes if index.name in self.partial_index_names]
+            with connection.schema_editor() as schema_editor:
+                for index in partial_indexes:
+                    schema_editor.remove_index(Post, index)
+            self.run_benchmarks('without partial indexes', users, options)
+
+    def run_benchmarks(self, title, users, options):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'{title}:'))
+        for user_label, user in users.items():
+            for queryset_label, get_queryset in [
+                ('legacy', legacy_post_queryset_for_user), ('visible_to', Post.objects.visible_to)
+            ]:
+                queryset = get_queryset(user).order_by('-created_at', '-id')
+                # the queries of the first page of the list.
+                for query_label, query in [('count', queryset.count), ('page', lambda: list(queryset[:20]))]:
+                    timing = measure(query, options['repeat'])
+                    self.stdout.write(f'  {user_label} {queryset_label} {query_label}: {timing}')
+                if options['explain']:
+                    self.stdout.write(f'    count: {queryset.order_by().explain()}')
+                    self.stdout.write(f'    page: {queryset[:20].explain()}')
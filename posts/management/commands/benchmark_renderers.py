@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.reverse import reverse
+from accounts.views import UserViewSet
+from posts.benchmarking import benchmark_database, measure, create_users, create_posts
+from posts.models import Post, Tag
+from posts.renderers import ORJSONRenderer, MessagePackRenderer, orjson, msgpack
+from posts.views import PostListCreateView
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the render time and the payload size of the renderers on the post list and the user detail.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000, help='Number of the benchmark posts.')
+        parser.add_argument('--tags', type=int, default=3, help='Number of the tags of each post.')
+        parser.add_argument('--repeat', type=int, default=20, help='Number of the measured runs of each render.')
+
+    def handle(self, *args, **options):
+        renderers = {'json': JSONRenderer()}
+        if orjson is not None:
+            renderers['orjson'] = ORJSONRenderer()
+        if msgpack is not None:
+            renderers['msgpack'] = MessagePackRenderer()
+
+        with benchmark_database():
+            create_users(1)
+            # the bulk created users may not have their primary keys.
+            author = get_user_model().objects.get()
+            create_posts(options['posts'], [author], draft_ratio=0, description='A benchmark post description')
+            tags = Tag.objects.bulk_create([Tag(tag=f'benchmark-tag{i}') for i in range(options['tags'])])
+            Post.tags.through.objects.bulk_create([
+                Post.tags.through(post_id=post_pk, tag_id=tag.pk)
+                for post_pk in Post.objects.values_list('pk', flat=True) for tag in tags
+            ])
+
+            # the authenticated requests, so the responses are not served by the response cache.
+            factory = APIRequestFactory(SERVER_NAME='localhost')
+            post_list_request = factory.get(reverse('post-list'), {'page_size': 'max'})
+            force_authenticate(post_list_request, author)
+            user_detail_request = factory.get(reverse('user-detail', kwargs={'slug': author.slug}))
+            force_authenticate(user_detail_request, author)
+            user_detail_view = UserViewSet.as_view({'get': 'retrieve'}, detail=True)
+            responses = {
+                'post list': PostListCreateView.as_view()(post_list_request),
+                'user detail': user_detail_view(user_detail_request, slug=author.slug),
+            }
+
+            for response_label, response in responses.items():
+                self.stdout.write(self.style.MIGRATE_HEADING(f'{response_label}:'))
+                for renderer_label, renderer in renderers.items():
+                    def render():
+                        return renderer.render(response.data, renderer.media_type, response.renderer_context)
+                    timing = measure(render, options['repeat'])
+                    self.stdout.write(f'  {renderer_label}: {timing}, {len(render())} bytes')
@@ -0,0 +1,98 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+from posts.benchmarking import benchmark_database, measure, create_users
+from posts.models import Post, Comment, Reply
+from posts.views import CommentThreadView, ReplyAddsListView
+
+
+def create_thread(comment, author, width, depth):
+    """
+        Bulk creates a thread of `width` roots, each reply having `width` adds down to `depth` levels, and returns
+        the adds pks of each reply pk.
+    """
+    adds = {}
+    level = [None]
+    for level_index in range(depth + 1):
+        replies = [
+            Reply(comment=comment, author=author, addsign_id=addsign_pk, reply=f'Benchmark reply{level_index}-{i}')
+            for addsign_pk in level for i in range(width)
+        ]
+        Reply.objects.bulk_create(replies, batch_size=1000)
+        for reply in replies:
+            adds.setdefault(reply.addsign_id, []).append(reply.pk)
+        level = [reply.pk for reply in replies]
+    return adds
+
+
+def count_queries(func):
+    # not by the queries log, that keeps only the last 9000 queries.
+    count = 0
+
+    def count_query(execute, sql, params, many, context):
+        nonlocal count
+        count += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count_query):
+        func()
+    return count
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the comment thread endpoint against walking the adds lists level by level.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--deep', type=int, default=50, help='Number of the levels of the deep thread.')
+        parser.add_argument('--wide', type=int, default=6, help='Number of the adds of each reply of the wide thread.')
+        parser.add_argument('--wide-depth', type=int, default=3, help='Number of the levels of the wide thread.')
+        parser.add_argument('--repeat', type=int, default=5, help='Number of the measured runs.')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            create_users(1)
+            # the bulk created users may not have their primary keys.
+            author = get_user_model().objects.get()
+            post = Post.objects.create(title='Benchmark post', author=author, status='p')
+            factory = APIRequestFactory(SERVER_NAME='localhost')
+            thread_view = CommentThreadView.as_view()
+            adds_view = ReplyAddsListView.as_view()
+
+            def get(view, path, **kwargs):
+                # the authenticated requests, so the responses are not served by the response cache.
+                request = factory.get(path, {'page_size': 'max', 'depth': max_depth})
+                force_authenticate(request, author)
+                response = view(request, **kwargs).render()
+                assert response.status_code == 200, response.status_code
+                return response
+
+            def walk_levels():
+                # a request for the adds of every reply, as the clients walk the tree without the thread.
+                level = adds[None]
+                while level:
+                    next_level = []
+                    for pk in level:
+                        get(adds_view, f'/api/posts/comments/replies/{pk}/adds/', pk=pk)
+                        next_level += adds.get(pk, [])
+                    level = next_level
+
+            def get_thread():
+                get(thread_view, f'/api/posts/comments/{comment.pk}/thread/', pk=comment.pk)
+
+            for label, width, depth in [
+                ('deep', 1, options['deep']), ('wide', options['wide'], options['wide_depth'])
+            ]:
+                comment = Comment.objects.create(post=post, author=author, comment=f'Benchmark {label} comment')
+                adds = create_thread(comment, author, width, depth)
+                max_depth = depth
+                replies_count = sum(len(pks) for pks in adds.values())
+                self.stdout.write(self.style.MIGRATE_HEADING(
+                    f'{label} thread, {replies_count} replies in {depth + 1} levels:'
+                ))
+                with override_settings(POSTS_THREAD={'MAX_DEPTH': max_depth}):
+                    for method_label, method in [('level by level', walk_levels), ('thread', get_thread)]:
+                        queries_count = count_queries(method)
+                        timing = measure(method, options['repeat'])
+                        self.stdout.write(f'  {method_label}: {timing}, {queries_count} queries')
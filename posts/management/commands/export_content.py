@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from posts.content_transfer import export_content
+
+
+class Command(BaseCommand):
+    help = 'Streams the users, tags, posts, comments and replies as NDJSON records, in their dependency order.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', '-o', default='-',
+                            help='The NDJSON file path, or "-" for the standard output.')
+        parser.add_argument('--chunk-size', type=int, default=2000,
+                            help='Number of rows that are read from the database cursor at a time.')
+
+    def handle(self, *args, **options):
+        if options['output'] == '-':
+            stats = export_content(self.stdout.write, options['chunk_size'])
+        else:
+            with open(options['output'], 'w', encoding='utf-8', newline='\n') as output:
+                stats = export_content(lambda line: output.write(line + '\n'), options['chunk_size'])
+        # the report is not written to the standard output, as it may be the exported records.
+        for model_stats in stats:
+            self.stderr.write(str(model_stats))
+        self.stderr.write(self.style.SUCCESS(f'{sum(model_stats.count for model_stats in stats)} object(s) exported.'))
@@ -0,0 +1,30 @@
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+from posts.content_transfer import ContentImporter, ContentImportError
+
+
+class Command(BaseCommand):
+    help = 'Imports the NDJSON records of the export_content command by batched bulk creates, in one transaction.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', nargs='?', default='-',
+                            help='The NDJSON file path, or "-" for the standard input.')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of objects that are created in each batch.')
+
+    def handle(self, *args, **options):
+        importer = ContentImporter(batch_size=options['batch_size'])
+        try:
+            if options['input'] == '-':
+                stats = importer.import_lines(sys.stdin)
+            else:
+                with open(options['input'], encoding='utf-8') as lines:
+                    stats = importer.import_lines(lines)
+        except (ContentImportError, IntegrityError) as exc:
+            raise CommandError(f'Nothing imported: {exc}')
+        for model_stats in stats:
+            self.stdout.write(str(model_stats))
+        total_count = sum(model_stats.count for model_stats in stats)
+        total_seconds = sum(model_stats.seconds for model_stats in stats)
+        self.stdout.write(self.style.SUCCESS(f'{total_count} object(s) imported in {total_seconds:.2f}s.'))
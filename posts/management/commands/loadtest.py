@@ -0,0 +1,107 @@
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+from posts.benchmarking import benchmark_database
+from posts.loadtest import (
+    SeedVolumes, seed_content, get_sample, get_endpoints, create_tokens, local_server, run_load, summarize,
+    compare_results,
+)
+
+
+@contextmanager
+def load_test_database():
+    # the in-memory SQLite test database locks its tables on the concurrent writes of the server threads.
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    if connection.vendor != 'sqlite' or test_settings.get('NAME'):
+        with benchmark_database():
+            yield
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        test_settings['NAME'] = os.path.join(directory, 'loadtest.sqlite3')
+        try:
+            with benchmark_database():
+                yield
+        finally:
+            test_settings['NAME'] = None
+
+
+class Command(BaseCommand):
+    help = 'Seeds a throwaway database and load tests the API routes by concurrent clients against a local server.'
+
+    def add_arguments(self, parser):
+        defaults = SeedVolumes()
+        parser.add_argument('--users', type=int, default=defaults.users, help='Number of the seeded users.')
+        parser.add_argument('--tags', type=int, default=defaults.tags, help='Number of the seeded tags.')
+        parser.add_argument('--posts', type=int, default=defaults.posts, help='Number of the seeded posts.')
+        parser.add_argument('--tags-per-post', type=int, default=defaults.tags_per_post)
+        parser.add_argument('--comments-per-post', type=int, default=defaults.comments_per_post)
+        parser.add_argument('--reply-chains', type=int, default=defaults.reply_chains_per_comment,
+                            help='Number of the reply chains of each comment.')
+        parser.add_argument('--reply-depth', type=int, default=defaults.reply_depth,
+                            help='Number of the replies of each chain.')
+        parser.add_argument('--requests', type=int, default=1000, help='Number of the sent requests.')
+        parser.add_argument('--concurrency', type=int, default=16, help='Number of the concurrent clients.')
+        parser.add_argument('--endpoints', help='Comma separated names of the load tested endpoints, all by default.')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the generated data and requests.')
+        parser.add_argument('-o', '--output', help='Path of the JSON results file.')
+        parser.add_argument('--compare', help='Path of the JSON results of a previous run to compare with.')
+
+    def get_endpoints(self, names):
+        endpoints = get_endpoints()
+        if not names:
+            return endpoints
+        names = set(names.split(','))
+        unknown_names = names - {endpoint.name for endpoint in endpoints}
+        if unknown_names:
+            raise CommandError(f'Unknown endpoints: {", ".join(sorted(unknown_names))}.')
+        return [endpoint for endpoint in endpoints if endpoint.name in names]
+
+    def handle(self, *args, **options):
+        endpoints = self.get_endpoints(options['endpoints'])
+        previous = None
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as previous_file:
+                previous = json.load(previous_file)
+        volumes = SeedVolumes(
+            options['users'], options['tags'], options['posts'], options['tags_per_post'],
+            options['comments_per_post'], options['reply_chains'], options['reply_depth'],
+        )
+        # the local server is plain HTTP.
+        with load_test_database(), override_settings(SECURE_SSL_REDIRECT=False):
+            counts = seed_content(volumes, seed=options['seed'])
+            self.stdout.write(f'Seeded {", ".join(f"{count} {label}" for label, count in counts.items())}.')
+            sample = get_sample(seed=options['seed'])
+            # every client is a user, so its reads are not served by the response cache of the anonymous ones.
+            tokens = create_tokens(options['concurrency'])
+            with local_server() as (address, application):
+                records, seconds = run_load(
+                    address, endpoints, sample, tokens, options['requests'], options['concurrency'], options['seed']
+                )
+            results = {
+                'created_at': timezone.now().isoformat(), 'database': connection.vendor, 'seeded': counts,
+                'requests': options['requests'], 'concurrency': options['concurrency'], 'seconds': round(seconds, 2),
+                **summarize(records, seconds, application.query_counts),
+            }
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{len(records)} requests by {options["concurrency"]} clients in {seconds:.2f}s:'
+        ))
+        for name, stats in [*results['endpoints'].items(), ('total', results['total'])]:
+            self.stdout.write(
+                f'  {name}: {stats["requests"]} requests ({stats["errors"]} errors), '
+                f'{stats["requests_per_second"]} requests/s, p50 {stats["p50_ms"]} ms, p95 {stats["p95_ms"]} ms, '
+                f'p99 {stats["p99_ms"]} ms, {stats["mean_queries"]} queries'
+            )
+        if previous is not None:
+            self.stdout.write(self.style.MIGRATE_HEADING(f'Changes from {options["compare"]}:'))
+            for line in compare_results(previous, results):
+                self.stdout.write(f'  {line}')
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(results, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}.'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from posts.caching import ALL_SCOPE, bump_generations
+from posts.trees import rebuild_tree
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the materialized paths, the depths and the descendants counts of the replies from their addsigns.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of replies that are updated in each batch.')
+
+    def handle(self, *args, **options):
+        rebuilt_count, unreachable_count = rebuild_tree(batch_size=options['batch_size'])
+        self.stdout.write(f'{rebuilt_count} reply path(s) rebuilt.')
+        if unreachable_count:
+            self.stdout.write(self.style.WARNING(
+                f'{unreachable_count} reply(s) are not reachable from a root, their addsigns form a cycle.'
+            ))
+        # the replies are updated without the signals, so invalidating all the cached responses.
+        bump_generations([ALL_SCOPE])
+        self.stdout.write(self.style.SUCCESS('Reply tree rebuilt.'))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from posts.caching import ALL_SCOPE, bump_generations
+from posts.counters import COUNTERS, M2M_COUNTERS
+
+
+class Command(BaseCommand):
+    help = 'Recounts the stored posts, comments, replies, adds and tag posts counters and fixes the drifted ones.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of counter objects that are checked in each batch.')
+
+    def handle(self, *args, **options):
+        for counter in COUNTERS + M2M_COUNTERS:
+            fixed_count = counter.reconcile(batch_size=options['batch_size'])
+            counter_label = f'{counter.counter_model._meta.label}.{counter.counter_name}'
+            self.stdout.write(f'{counter_label}: {fixed_count} drifted counter(s) fixed.')
+        # the fixed counters are updated without the signals, so invalidating all the cached responses.
+        bump_generations([ALL_SCOPE])
+        self.stdout.write(self.style.SUCCESS('Counters reconciled.'))
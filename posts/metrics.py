@@ -0,0 +1,242 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from bisect import bisect_left
+from django.conf import settings
+
+HEADER_FORMAT = '<4sII'
+HEADER_SIZE = 64
+MAGIC = b'BAMT'
+KEY_SIZE = 128
+# the upper bounds of the latency buckets in seconds, and of the response size buckets in bytes.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# the indexes of the values of a slot, the buckets have an additional +Inf one.
+REQUESTS = 0
+LATENCY_COUNTS = REQUESTS + 1
+LATENCY_SUM = LATENCY_COUNTS + len(LATENCY_BUCKETS) + 1
+QUERIES = LATENCY_SUM + 1
+SIZE_COUNTS = QUERIES + 1
+SIZE_SUM = SIZE_COUNTS + len(SIZE_BUCKETS) + 1
+CACHE_HITS = SIZE_SUM + 1
+CACHE_MISSES = CACHE_HITS + 1
+THROTTLED = CACHE_MISSES + 1
+SLOT_VALUES = THROTTLED + 1
+SLOT_SIZE = KEY_SIZE + SLOT_VALUES * 8
+
+ROUTE = 'route'
+THROTTLE = 'throttle'
+
+
+def get_metrics_settings():
+    metrics_settings = {
+        'ENABLED': False, 'DIRECTORY': os.path.join(tempfile.gettempdir(), 'blogapi-metrics'), 'MAX_KEYS': 512,
+    }
+    metrics_settings.update(getattr(settings, 'POSTS_METRICS', {}))
+    return metrics_settings
+
+
+class MetricsFile:
+    """
+        The mmap file of the metrics of a process, only the process writes it and the others read it. every key has
+        a slot of its encoded key and its float values, the slots are taken in order and never freed.
+    """
+    def __init__(self, path, max_keys):
+        self.path = path
+        self.max_keys = max_keys
+        size = HEADER_SIZE + max_keys * SLOT_SIZE
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            # the file of a reused pid keeps its slots.
+            if os.fstat(fd).st_size != size:
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+            self.mmap = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        struct.pack_into(HEADER_FORMAT, self.mmap, 0, MAGIC, max_keys, SLOT_VALUES)
+        self.values = memoryview(self.mmap).cast('d')
+        self.lock = threading.Lock()
+        self.slots = {key: index for index, key, _ in read_slots(self.mmap)}
+
+    def get_values_offset(self, key):
+        """
+            Returns the index of the first value of the key slot in the values of the file, or None if it is full.
+        """
+        index = self.slots.get(key)
+        if index is None:
+            if len(self.slots) >= self.max_keys:
+                return None
+            index = len(self.slots)
+            encoded_key = json.dumps(key).encode()[:KEY_SIZE]
+            start = HEADER_SIZE + index * SLOT_SIZE
+            self.mmap[start:start + KEY_SIZE] = encoded_key.ljust(KEY_SIZE, b'\0')
+            self.slots[key] = index
+        return (HEADER_SIZE + index * SLOT_SIZE + KEY_SIZE) // 8
+
+    def add(self, key, increments):
+        with self.lock:
+            offset = self.get_values_offset(key)
+            if offset is None:
+                return
+            for index, amount in increments:
+                self.values[offset + index] += amount
+
+
+def read_slots(data):
+    """
+        Yields the index, the key and the values of each used slot of the metrics file data.
+    """
+    if len(data) < HEADER_SIZE:
+        return
+    magic, max_keys, slot_values = struct.unpack_from(HEADER_FORMAT, data, 0)
+    if magic != MAGIC or slot_values != SLOT_VALUES:
+        return
+    for index in range(max_keys):
+        start = HEADER_SIZE + index * SLOT_SIZE
+        if start + SLOT_SIZE > len(data):
+            return
+        encoded_key = bytes(data[start:start + KEY_SIZE]).rstrip(b'\0')
+        if not encoded_key:
+            return
+        try:
+            key = tuple(json.loads(encoded_key))
+        except ValueError:
+            # the key is being written.
+            continue
+        yield index, key, struct.unpack_from(f'<{SLOT_VALUES}d', data, start + KEY_SIZE)
+
+
+metrics_files = {}
+metrics_files_lock = threading.Lock()
+
+
+def get_metrics_file(metrics_settings):
+    # by the pid, so the forked workers do not write the file of their master.
+    key = (os.getpid(), metrics_settings['DIRECTORY'])
+    metrics_file = metrics_files.get(key)
+    if metrics_file is None:
+        with metrics_files_lock:
+            metrics_file = metrics_files.get(key)
+            if metrics_file is None:
+                os.makedirs(metrics_settings['DIRECTORY'], exist_ok=True)
+                path = os.path.join(metrics_settings['DIRECTORY'], f'metrics-{key[0]}.db')
+                metrics_file = metrics_files[key] = MetricsFile(path, metrics_settings['MAX_KEYS'])
+    return metrics_file
+
+
+def get_url_name(request):
+    return (request.resolver_match.url_name if request.resolver_match else None) or 'none'
+
+
+def record_request(metrics_settings, url_name, seconds, queries_count, size):
+    increments = [
+        (REQUESTS, 1), (LATENCY_COUNTS + bisect_left(LATENCY_BUCKETS, seconds), 1), (LATENCY_SUM, seconds),
+        (QUERIES, queries_count), (SIZE_COUNTS + bisect_left(SIZE_BUCKETS, size), 1), (SIZE_SUM, size),
+    ]
+    get_metrics_file(metrics_settings).add((ROUTE, url_name), increments)
+
+
+def record_response_cache(request, hit):
+    metrics_settings = get_metrics_settings()
+    if metrics_settings['ENABLED']:
+        increments = [(CACHE_HITS if hit else CACHE_MISSES, 1)]
+        get_metrics_file(metrics_settings).add((ROUTE, get_url_name(request)), increments)
+
+
+def record_throttle_rejection(request, scope):
+    metrics_settings = get_metrics_settings()
+    if metrics_settings['ENABLED']:
+        get_metrics_file(metrics_settings).add((THROTTLE, get_url_name(request), scope), [(THROTTLED, 1)])
+
+
+def collect_metrics(directory):
+    """
+        Sums the values of each key over the metrics files of all the processes.
+    """
+    totals = {}
+    if not os.path.isdir(directory):
+        return totals
+    for name in sorted(os.listdir(directory)):
+        if not (name.startswith('metrics-') and name.endswith('.db')):
+            continue
+        try:
+            with open(os.path.join(directory, name), 'rb') as metrics_file:
+                data = metrics_file.read()
+        except FileNotFoundError:
+            continue
+        for _, key, values in read_slots(data):
+            key_totals = totals.setdefault(key, [0.0] * SLOT_VALUES)
+            for index, value in enumerate(values):
+                key_totals[index] += value
+    return totals
+
+
+def format_labels(**labels):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def format_histogram(name, labels, buckets, counts, total):
+    lines = []
+    cumulative_count = 0
+    for bound, count in zip([*buckets, '+Inf'], counts):
+        cumulative_count += count
+        lines.append(f'{name}_bucket{format_labels(**labels, le=bound)} {format_value(cumulative_count)}')
+    lines.append(f'{name}_sum{format_labels(**labels)} {format_value(total)}')
+    lines.append(f'{name}_count{format_labels(**labels)} {format_value(cumulative_count)}')
+    return lines
+
+
+def render_prometheus(totals):
+    """
+        Returns the metrics in the Prometheus text exposition format.
+    """
+    routes = sorted((key[1], values) for key, values in totals.items() if key[0] == ROUTE)
+    throttles = sorted((key[1:], values) for key, values in totals.items() if key[0] == THROTTLE)
+    families = [
+        ('blogapi_http_requests_total', 'counter', 'The requests of each url name.', [
+            f'blogapi_http_requests_total{format_labels(url_name=url_name)} {format_value(values[REQUESTS])}'
+            for url_name, values in routes
+        ]),
+        ('blogapi_http_request_duration_seconds', 'histogram', 'The latencies of the requests.', [
+            line for url_name, values in routes for line in format_histogram(
+                'blogapi_http_request_duration_seconds', {'url_name': url_name}, LATENCY_BUCKETS,
+                values[LATENCY_COUNTS:LATENCY_SUM], values[LATENCY_SUM],
+            )
+        ]),
+        ('blogapi_db_queries_total', 'counter', 'The SQL queries of the requests.', [
+            f'blogapi_db_queries_total{format_labels(url_name=url_name)} {format_value(values[QUERIES])}'
+            for url_name, values in routes
+        ]),
+        ('blogapi_http_response_size_bytes', 'histogram', 'The body sizes of the responses.', [
+            line for url_name, values in routes for line in format_histogram(
+                'blogapi_http_response_size_bytes', {'url_name': url_name}, SIZE_BUCKETS,
+                values[SIZE_COUNTS:SIZE_SUM], values[SIZE_SUM],
+            )
+        ]),
+        ('blogapi_response_cache_lookups_total', 'counter', 'The hits and misses of the response cache.', [
+            f'blogapi_response_cache_lookups_total{format_labels(url_name=url_name, result=result)} '
+            f'{format_value(values[index])}'
+            for url_name, values in routes for result, index in [('hit', CACHE_HITS), ('miss', CACHE_MISSES)]
+            if values[CACHE_HITS] or values[CACHE_MISSES]
+        ]),
+        ('blogapi_throttled_requests_total', 'counter', 'The requests rejected by the throttles.', [
+            f'blogapi_throttled_requests_total{format_labels(url_name=url_name, scope=scope)} '
+            f'{format_value(values[THROTTLED])}'
+            for (url_name, scope), values in throttles
+        ]),
+    ]
+    lines = []
+    for name, metric_type, description, samples in families:
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} {metric_type}', *samples]
+    return '\n'.join(lines) + '\n'
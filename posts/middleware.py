@@ -0,0 +1,301 @@
+import json
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+from whitenoise.middleware import WhiteNoiseMiddleware
+from .metrics import get_metrics_settings, get_url_name, record_request
+from .profiling import get_profiling_settings, get_profile_name, save_profile, start_profiler
+
+logger = logging.getLogger(__name__)
+
+
+def get_server_timing_settings():
+    server_timing_settings = {'ENABLED': False, 'HEADER': True, 'LOG': True}
+    server_timing_settings.update(getattr(settings, 'POSTS_SERVER_TIMING', {}))
+    return server_timing_settings
+
+
+def get_query_budgets():
+    return getattr(settings, 'POSTS_QUERY_BUDGETS', {})
+
+
+def add_execute_wrapper(wrapper):
+    connection.execute_wrappers.append(wrapper)
+
+
+def remove_execute_wrapper(wrapper):
+    connection.execute_wrappers.remove(wrapper)
+
+
+@asynccontextmanager
+async def async_execute_wrapper(wrapper):
+    """
+        The `connection.execute_wrapper` of the async requests, their queries run in the thread of their thread
+        sensitive sync calls, like the views, so the wrapper is added to the connection of that thread.
+    """
+    await sync_to_async(add_execute_wrapper)(wrapper)
+    try:
+        yield
+    finally:
+        await sync_to_async(remove_execute_wrapper)(wrapper)
+
+
+class AsyncCapableMiddleware:
+    """
+        Runs in the mode of the middleware chain, so the ASGI requests are not moved to a thread by the middleware.
+        the subclasses handle the sync requests by `__call__` and the async ones by `__acall__`.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+
+class RequestTiming:
+    """
+        The SQL queries count and the durations of the phases of a request, in seconds.
+    """
+    def __init__(self):
+        self.queries_count = 0
+        self.db_seconds = 0
+        self.start = time.perf_counter()
+        self.view_start = self.view_end = self.render_end = None
+        self.view_db_seconds = 0
+
+    def record_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - start
+            self.queries_count += 1
+
+    def start_view(self):
+        self.view_start = time.perf_counter()
+        self.view_db_seconds = self.db_seconds
+
+    def end_view(self):
+        self.view_end = time.perf_counter()
+        self.view_db_seconds = self.db_seconds - self.view_db_seconds
+
+    def end_render(self, response):
+        self.render_end = time.perf_counter()
+
+    def get_durations(self):
+        """
+            Returns the milliseconds of the database, the serialization, the render and the whole request. the
+            serialization is the time of the view out of the database, the views read the objects and serialize them.
+        """
+        end = time.perf_counter()
+        view_start = self.view_start or end
+        view_end = self.view_end or end
+        render_end = self.render_end or view_end
+        return {
+            'db': self.db_seconds * 1000,
+            'serialize': max(view_end - view_start - self.view_db_seconds, 0) * 1000,
+            'render': (render_end - view_end) * 1000,
+            'total': (end - self.start) * 1000,
+        }
+
+
+class ServerTimingMiddleware(AsyncCapableMiddleware):
+    """
+        Records the queries count, the database, serialization and render times of the requests by a
+        `connection.execute_wrapper`, and sends them in the `Server-Timing` header and a JSON log line. the requests
+        over the query budget of their url name are logged as warnings.
+    """
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if self.is_async:
+            # the hooks of an async chain are coroutines too, so they are not run in a thread.
+            self.process_view = self.aprocess_view
+            self.process_template_response = self.aprocess_template_response
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        server_timing_settings = get_server_timing_settings()
+        if not server_timing_settings['ENABLED']:
+            return self.get_response(request)
+        request.timing = timing = RequestTiming()
+        with connection.execute_wrapper(timing.record_query):
+            response = self.get_response(request)
+        return self.add_timing(request, response, timing, server_timing_settings)
+
+    async def __acall__(self, request):
+        server_timing_settings = get_server_timing_settings()
+        if not server_timing_settings['ENABLED']:
+            return await self.get_response(request)
+        request.timing = timing = RequestTiming()
+        async with async_execute_wrapper(timing.record_query):
+            response = await self.get_response(request)
+        return self.add_timing(request, response, timing, server_timing_settings)
+
+    def add_timing(self, request, response, timing, server_timing_settings):
+        durations = timing.get_durations()
+        if server_timing_settings['HEADER']:
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={durations["db"]:.2f};desc="{timing.queries_count} queries"',
+                *[f'{name};dur={durations[name]:.2f}' for name in ['serialize', 'render', 'total']],
+            ])
+        if server_timing_settings['LOG']:
+            self.log(request, response, timing, durations)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if hasattr(request, 'timing'):
+            request.timing.start_view()
+
+    def process_template_response(self, request, response):
+        # the DRF responses are rendered after the template response middlewares.
+        if hasattr(request, 'timing'):
+            request.timing.end_view()
+            response.add_post_render_callback(request.timing.end_render)
+        return response
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        return ServerTimingMiddleware.process_view(self, request, view_func, view_args, view_kwargs)
+
+    async def aprocess_template_response(self, request, response):
+        return ServerTimingMiddleware.process_template_response(self, request, response)
+
+    def log(self, request, response, timing, durations):
+        url_name = request.resolver_match.url_name if request.resolver_match else None
+        budget = get_query_budgets().get(url_name)
+        record = {
+            'method': request.method, 'path': request.path, 'url_name': url_name, 'status': response.status_code,
+            'queries': timing.queries_count, 'query_budget': budget,
+            **{f'{name}_ms': round(duration, 2) for name, duration in durations.items()},
+        }
+        if budget is not None and timing.queries_count > budget:
+            logger.warning(json.dumps(record))
+        else:
+            logger.info(json.dumps(record))
+
+
+class ProfilingMiddleware(AsyncCapableMiddleware):
+    """
+        Profiles a `SAMPLE_RATE` of the requests by cProfile and writes their profiles to the `DIRECTORY`, tagged by
+        the url name, the method and the API version. with a `THRESHOLD_MS`, every request is profiled and the ones
+        slower than it are kept too. only the last `MAX_FILES` profiles are kept.
+    """
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        profiling_settings = get_profiling_settings()
+        sampled = random.random() < profiling_settings['SAMPLE_RATE']
+        profiler = None
+        if self.should_profile(profiling_settings, sampled):
+            profiler = start_profiler()
+        if profiler is None:
+            return self.get_response(request)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        self.save(request, response, profiler, profiling_settings, sampled, start)
+        return response
+
+    async def __acall__(self, request):
+        profiling_settings = get_profiling_settings()
+        sampled = random.random() < profiling_settings['SAMPLE_RATE']
+        profiler = None
+        if self.should_profile(profiling_settings, sampled):
+            # cProfile profiles its thread, so it is started in the thread of the sync calls of the request.
+            profiler = await sync_to_async(start_profiler)()
+        if profiler is None:
+            return await self.get_response(request)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(profiler.disable)()
+        await sync_to_async(self.save)(request, response, profiler, profiling_settings, sampled, start)
+        return response
+
+    def should_profile(self, profiling_settings, sampled):
+        return profiling_settings['ENABLED'] and (sampled or profiling_settings['THRESHOLD_MS'] is not None)
+
+    def save(self, request, response, profiler, profiling_settings, sampled, start):
+        milliseconds = (time.perf_counter() - start) * 1000
+        if sampled or milliseconds >= profiling_settings['THRESHOLD_MS']:
+            url_name = request.resolver_match.url_name if request.resolver_match else None
+            # the version of the DRF request.
+            drf_request = getattr(response, 'renderer_context', {}).get('request')
+            name = get_profile_name(url_name, request.method, getattr(drf_request, 'version', None), milliseconds)
+            save_profile(profiler, profiling_settings['DIRECTORY'], name, profiling_settings['MAX_FILES'])
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware(AsyncCapableMiddleware):
+    """
+        Records the latency, the queries count and the response size of every request by its url name to the metrics
+        file of the process.
+    """
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics_settings = get_metrics_settings()
+        if not metrics_settings['ENABLED']:
+            return self.get_response(request)
+        count_query = QueryCounter()
+        start = time.perf_counter()
+        with connection.execute_wrapper(count_query):
+            response = self.get_response(request)
+        self.record(request, response, metrics_settings, start, count_query.count)
+        return response
+
+    async def __acall__(self, request):
+        metrics_settings = get_metrics_settings()
+        if not metrics_settings['ENABLED']:
+            return await self.get_response(request)
+        count_query = QueryCounter()
+        start = time.perf_counter()
+        async with async_execute_wrapper(count_query):
+            response = await self.get_response(request)
+        await sync_to_async(self.record)(request, response, metrics_settings, start, count_query.count)
+        return response
+
+    def record(self, request, response, metrics_settings, start, queries_count):
+        seconds = time.perf_counter() - start
+        # the size of the streaming responses is not known.
+        size = 0 if response.streaming else len(response.content)
+        record_request(metrics_settings, get_url_name(request), seconds, queries_count, size)
+
+
+class AsyncWhiteNoiseMiddleware(AsyncCapableMiddleware, WhiteNoiseMiddleware):
+    """
+        The `WhiteNoiseMiddleware` in the mode of the middleware chain, its static files lookup does not query the
+        database, so it runs in the event loop of the ASGI requests.
+    """
+    def __init__(self, get_response):
+        WhiteNoiseMiddleware.__init__(self, get_response)
+        AsyncCapableMiddleware.__init__(self, get_response)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        response = self.process_request(request)
+        if response is None:
+            response = await self.get_response(request)
+        return response
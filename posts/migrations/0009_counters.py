@@ -0,0 +1,50 @@
+# Generated by Django 4.0.7 on 2026-10-18 17:04
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+# (counted model, foreign key field name, counter model, counter name)
+COUNTERS = [
+    ('posts.Post', 'author', 'accounts.CustomUser', 'posts_count'),
+    ('posts.Comment', 'post', 'posts.Post', 'comments_count'),
+    ('posts.Comment', 'author', 'accounts.CustomUser', 'comments_count'),
+    ('posts.Reply', 'comment', 'posts.Comment', 'replies_count'),
+    ('posts.Reply', 'addsign', 'posts.Reply', 'adds_count'),
+]
+
+
+def populate_counters(apps, schema_editor):
+    for counted_label, field_name, counter_label, counter_name in COUNTERS:
+        counted_model = apps.get_model(counted_label)
+        counter_model = apps.get_model(counter_label)
+        counted_queryset = counted_model.objects.filter(**{field_name: OuterRef('pk')}).order_by()
+        counted_queryset = counted_queryset.values(field_name).annotate(count=Count('pk')).values('count')
+        counter_model.objects.update(**{counter_name: Coalesce(Subquery(counted_queryset), 0)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_customuser_counters'),
+        ('posts', '0008_alter_post_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='replies_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='reply',
+            name='adds_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,78 @@
+from django.db import migrations
+
+# the search index of this migration, so the later changes of the search backends do not change it.
+FTS5_TABLE = 'posts_post_fts'
+FTS5_COLUMN_WEIGHTS = '0.0, 10.0, 5.0, 2.0, 1.0'
+TSVECTOR_COLUMN = 'search_vector'
+TSVECTOR_INDEX = 'post_search_vector_index'
+
+
+def has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return ('ENABLE_FTS5',) in cursor.fetchall()
+
+
+def get_tables(apps):
+    Post = apps.get_model('posts', 'Post')
+    return {
+        'post': Post._meta.db_table, 'through': Post.tags.through._meta.db_table,
+        'tag': apps.get_model('posts', 'Tag')._meta.db_table,
+        'user': Post._meta.get_field('author').related_model._meta.db_table,
+    }
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    tables = get_tables(apps)
+    if connection.vendor == 'postgresql':
+        schema_editor.execute(f'ALTER TABLE {tables["post"]} ADD COLUMN {TSVECTOR_COLUMN} tsvector')
+        schema_editor.execute(f'CREATE INDEX {TSVECTOR_INDEX} ON {tables["post"]} USING gin ({TSVECTOR_COLUMN})')
+        tags_sql = (
+            f'(SELECT string_agg(tag.tag, \' \') FROM {tables["through"]} through '
+            f'INNER JOIN {tables["tag"]} tag ON tag.id = through.tag_id WHERE through.post_id = post.id)'
+        )
+        author_sql = f'(SELECT author.username FROM {tables["user"]} author WHERE author.id = post.author_id)'
+        documents = [('post.title', 'A'), (tags_sql, 'B'), (author_sql, 'C'), ('post.description', 'D')]
+        document_sql = ' || '.join(
+            f'setweight(to_tsvector(\'simple\', coalesce({document}, \'\')), \'{weight}\')'
+            for document, weight in documents
+        )
+        schema_editor.execute(f'UPDATE {tables["post"]} post SET {TSVECTOR_COLUMN} = {document_sql}')
+    elif connection.vendor == 'sqlite' and has_fts5(connection):
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {FTS5_TABLE} USING fts5('
+            f'post_id UNINDEXED, title, tags, author, description, tokenize = \'unicode61\')'
+        )
+        schema_editor.execute(
+            f'INSERT INTO {FTS5_TABLE} ({FTS5_TABLE}, rank) VALUES (\'rank\', \'bm25({FTS5_COLUMN_WEIGHTS})\')'
+        )
+        schema_editor.execute(
+            f'INSERT INTO {FTS5_TABLE} (post_id, title, tags, author, description) '
+            f'SELECT post.id, post.title, '
+            f'(SELECT group_concat(tag.tag, \' \') FROM {tables["through"]} through '
+            f'INNER JOIN {tables["tag"]} tag ON tag.id = through.tag_id WHERE through.post_id = post.id), '
+            f'author.username, post.description '
+            f'FROM {tables["post"]} post INNER JOIN {tables["user"]} author ON author.id = post.author_id'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        post_table = get_tables(apps)['post']
+        schema_editor.execute(f'DROP INDEX IF EXISTS {TSVECTOR_INDEX}')
+        schema_editor.execute(f'ALTER TABLE {post_table} DROP COLUMN IF EXISTS {TSVECTOR_COLUMN}')
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS5_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
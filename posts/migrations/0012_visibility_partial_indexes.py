@@ -0,0 +1,21 @@
+# Generated by Django 4.0.7 on 2026-10-18 17:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_post_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('status', 'p')), fields=['-created_at', '-id'], name='post_published_index'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('status', 'd')), fields=['author', '-created_at', '-id'], name='post_draft_author_index'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.0.7 on 2026-10-18 17:21
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_tag_posts_count(apps, schema_editor):
+    Tag = apps.get_model('posts', 'Tag')
+    Post = apps.get_model('posts', 'Post')
+    counted_queryset = Post.objects.filter(tags=OuterRef('pk'), status='p').order_by()
+    counted_queryset = counted_queryset.values('tags').annotate(count=Count('pk')).values('count')
+    Tag.objects.update(posts_count=Coalesce(Subquery(counted_queryset), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_visibility_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_tag_posts_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.0.7 on 2026-10-18 17:23
+
+from django.db import migrations, models
+from posts.management.commands.backfill_excerpts import backfill_excerpts
+
+# the excerpt fields of the models in this migration, so the later changes of the models do not change them.
+EXCERPT_FIELDS = {
+    'Post': [('short_description', 'description', 10)],
+    'Comment': [('short_comment', 'comment', 10)],
+    'Reply': [('short_reply', 'reply', 10)],
+}
+
+
+def populate_excerpts(apps, schema_editor):
+    for model_name, excerpt_fields in EXCERPT_FIELDS.items():
+        backfill_excerpts(apps.get_model('posts', model_name), excerpt_fields=excerpt_fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_tag_posts_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='short_comment',
+            field=models.CharField(blank=True, editable=False, max_length=154),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='short_description',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='reply',
+            name='short_reply',
+            field=models.CharField(blank=True, editable=False, max_length=154),
+        ),
+        migrations.RunPython(populate_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.0.7 on 2026-10-18 17:33
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_stored_excerpts'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='tag',
+            options={'ordering': ['tag']},
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.0.7 on 2026-10-18 17:50
+
+from django.db import migrations, models
+from posts.trees import rebuild_tree
+
+
+def populate_reply_tree(apps, schema_editor):
+    rebuild_tree(model=apps.get_model('posts', 'Reply'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_tag_ordering'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reply',
+            name='depth',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='reply',
+            name='descendants_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='reply',
+            name='path',
+            field=models.TextField(blank=True, db_index=True, editable=False),
+        ),
+        migrations.RunPython(populate_reply_tree, migrations.RunPython.noop),
+    ]
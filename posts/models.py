@@ -1,8 +1,11 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 import uuid
 # Create your models here.
 
+# the length of a reply pk in the materialized paths of the replies, its hex and a slash.
+TREE_PATH_SEGMENT_LENGTH = 33
+
 
 class LastSubmitted:
     order_by = None
@@ -12,7 +15,22 @@ class LastSubmitted:
         return self.order_by(str(self.creation_date_lookup_name)).last()
 
 
-class PostManager(models.Manager, LastSubmitted):
+class PostQuerySet(models.QuerySet):
+
+    def visible_to(self, user):
+        """
+            The published posts and the user drafts, or all the posts for the staff users, as a single predicate
+            that the partial indexes of the published posts and the drafts can serve.
+        """
+        if user.is_staff:
+            return self.all()
+        predicate = models.Q(status='p')
+        if user.is_authenticated:
+            predicate |= models.Q(status='d', author=user)
+        return self.filter(predicate)
+
+
+class PostManager(models.Manager.from_queryset(PostQuerySet), LastSubmitted):
     creation_date_lookup_name = 'created_at'
 
     def draft(self):
@@ -33,14 +51,52 @@ class ReplyManager(models.Manager, LastSubmitted):
     creation_date_lookup_name = 'replied_at'
 
 
+class AtomicSaveMixin:
+    # the counter columns of the related objects are updated by the post_save receivers,
+    # so they will be updated in the same transaction as the saving object.
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+
+class ExcerptMixin:
+    # (stored excerpt field name, source field name, maximum spaces of the excerpt)
+    excerpt_fields = ()
+
+    def update_excerpts(self):
+        """
+            Computes the stored excerpts, for the bulk operations that do not call the save.
+        """
+        for excerpt_name, source_name, maximum_spaces in self.excerpt_fields:
+            setattr(self, excerpt_name, formatted_text(getattr(self, source_name), maximum_spaces))
+
+    def save(self, *args, **kwargs):
+        deferred_fields = self.get_deferred_fields()
+        update_fields = kwargs.get('update_fields')
+        for excerpt_name, source_name, maximum_spaces in self.excerpt_fields:
+            # the source is not loaded, so it is not changed.
+            if source_name in deferred_fields:
+                continue
+            setattr(self, excerpt_name, formatted_text(getattr(self, source_name), maximum_spaces))
+            if update_fields is not None and source_name in update_fields:
+                kwargs['update_fields'] = update_fields = {*update_fields, excerpt_name}
+        super().save(*args, **kwargs)
+
+
 class Tag(models.Model):
     tag = models.SlugField(max_length=75, unique=True)
+    # the published posts count.
+    posts_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        # the same order of the tags for the prefetched and the compiled reads.
+        ordering = ['tag']
 
     def __str__(self):
         return self.tag
 
 
-class Post(models.Model):
+class Post(ExcerptMixin, AtomicSaveMixin, models.Model):
     STATUS_CHOICES = [
         ('p', 'Published'),
         ('d', 'Draft'),
@@ -50,17 +106,34 @@ class Post(models.Model):
     author = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name='posts')
     thumbnail = models.ImageField(upload_to='posts/thumbnails/', blank=True)
     description = models.TextField(blank=True)
+    short_description = models.TextField(blank=True, editable=False)
     tags = models.ManyToManyField(Tag, related_name='posts', blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     status = models.CharField(choices=STATUS_CHOICES, max_length=1, default='d')
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
     objects = PostManager()
+    excerpt_fields = [('short_description', 'description', 10)]
 
     class Meta:
         indexes = [
-            models.Index(fields=['id'], name='id_index')
+            models.Index(fields=['id'], name='id_index'),
+            # the keyset pagination ordering.
+            models.Index(fields=['-created_at', '-id'], name='post_created_id_index'),
+            # the visibility predicate parts.
+            models.Index(fields=['-created_at', '-id'], name='post_published_index',
+                         condition=models.Q(status='p')),
+            models.Index(fields=['author', '-created_at', '-id'], name='post_draft_author_index',
+                         condition=models.Q(status='d')),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # the loaded status, so the status changes can be found after saving.
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
     def __str__(self):
         return formatted_text(self.title)
 
@@ -71,14 +144,23 @@ class Post(models.Model):
         return True if self.status == 'p' else False
 
 
-class Comment(models.Model):
+class Comment(ExcerptMixin, AtomicSaveMixin, models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False, unique=True)
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comments')
     author = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name='comments')
     comment = models.CharField(max_length=150)
+    short_comment = models.CharField(max_length=154, blank=True, editable=False)
     commented_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    replies_count = models.PositiveIntegerField(default=0, editable=False)
     objects = CommentManager()
+    excerpt_fields = [('short_comment', 'comment', 10)]
+
+    class Meta:
+        indexes = [
+            # the keyset pagination ordering of the post comments.
+            models.Index(fields=['post', '-commented_at', '-id'], name='comment_post_date_id_index'),
+        ]
 
     def __str__(self):
         return formatted_text(self.comment)
@@ -87,18 +169,29 @@ class Comment(models.Model):
         return formatted_text(self.comment, 10)
 
 
-class Reply(models.Model):
+class Reply(ExcerptMixin, AtomicSaveMixin, models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False, unique=True)
     comment = models.ForeignKey(Comment, on_delete=models.CASCADE, related_name='replies')
     author = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name='replies')
     addsign = models.ForeignKey('self', on_delete=models.SET_NULL, related_name='adds', blank=True, null=True)
     reply = models.CharField(max_length=150)
+    short_reply = models.CharField(max_length=154, blank=True, editable=False)
     replied_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    adds_count = models.PositiveIntegerField(default=0, editable=False)
+    # the materialized path of the reply, the pks of its ancestors from the root and itself.
+    path = models.TextField(blank=True, db_index=True, editable=False)
+    depth = models.PositiveIntegerField(default=0, editable=False)
+    descendants_count = models.PositiveIntegerField(default=0, editable=False)
     objects = ReplyManager()
+    excerpt_fields = [('short_reply', 'reply', 10)]
 
     class Meta:
         verbose_name_plural = 'Replies'
+        indexes = [
+            # the keyset pagination ordering of the comment replies.
+            models.Index(fields=['comment', '-replied_at', '-id'], name='reply_comment_date_id_index'),
+        ]
 
     def __str__(self):
         return formatted_text(self.reply)
@@ -106,27 +199,37 @@ class Reply(models.Model):
     def make_short_reply(self):
         return formatted_text(self.reply, 10)
 
+    def save(self, *args, **kwargs):
+        if self._state.adding and not self.path:
+            self.update_tree_path()
+        super().save(*args, **kwargs)
 
-# Adds '...' to the long texts.
-def formatted_text(text, maximum_spaces=5):
-
-    iterable_text = iter(text)
-    count = 0
-    new_text = ''
+    def update_tree_path(self, addsign_path=None):
+        """
+            Computes the path and the depth of the reply from the path of its addsign, that is read from the addsign
+            if not given. the addsign of a reply does not change, except being set to null by its deletion.
+        """
+        if addsign_path is None:
+            addsign_path = self.addsign.path if self.addsign_id else ''
+        self.path = addsign_path + self.pk.hex + '/'
+        self.depth = len(self.path) // TREE_PATH_SEGMENT_LENGTH - 1
 
-    while count < maximum_spaces:
-        try:
-            text_char = next(iterable_text)
-        except StopIteration:
-            break
-        else:
-            new_text += text_char
+    def get_ancestor_pks(self):
+        # from the root to the addsign.
+        return [uuid.UUID(segment) for segment in self.path.split('/')[:-2]]
 
-        if text_char == ' ':
-            count += 1
 
-    if len(text) > len(new_text):
-        etc_text = new_text + ' ...'
-        return etc_text
+# Adds '...' to the long texts.
+def formatted_text(text, maximum_spaces=5):
+    # the text until the `maximum_spaces`th space, including the space itself.
+    end = -1
+    for _ in range(maximum_spaces):
+        end = text.find(' ', end + 1)
+        if end == -1:
+            return text
+    end += 1
+
+    if len(text) > end:
+        return text[:end] + ' ...'
 
     return text
@@ -1,56 +1,32 @@
 from rest_framework import serializers
 from .models import Post, Comment, Reply
+from .hyperlinks import TemplateHyperlinkedModelSerializer
 
 
-class PostsCountMixin:
-    def get_posts_count(self, obj):
-        return obj.posts.count()
-
-
-class CommentsCountMixin:
-    def get_comments_count(self, obj):
-        return obj.comments.count()
-
-
-class RepliesCountMixin:
-    def get_replies_count(self, obj):
-        return obj.replies.count()
-
-
-class AddsCountMixin:
-    def get_adds_count(self, obj):
-        return obj.adds.count()
-
-
-class PostNestedSerializer(serializers.HyperlinkedModelSerializer):
+class PostNestedSerializer(TemplateHyperlinkedModelSerializer):
     class Meta:
         model = Post
         fields = ['url', 'title']
 
 
-class CommentNestedSerializer(serializers.HyperlinkedModelSerializer, RepliesCountMixin):
+class CommentNestedSerializer(TemplateHyperlinkedModelSerializer):
     author = serializers.StringRelatedField()
-    short_comment = serializers.CharField(read_only=True, max_length=150, source='make_short_comment')
-    replies_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Comment
         fields = ['url', 'author', 'short_comment', 'replies_count']
 
 
-class ReplyNestedSerializer(serializers.HyperlinkedModelSerializer, AddsCountMixin):
+class ReplyNestedSerializer(TemplateHyperlinkedModelSerializer):
     author = serializers.StringRelatedField()
-    short_reply = serializers.CharField(source='make_short_reply')
-    adds_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Reply
         fields = ['url', 'author', 'short_reply', 'adds_count']
 
 
-class AddsignNestedSerializer(serializers.HyperlinkedModelSerializer):
+class AddsignNestedSerializer(TemplateHyperlinkedModelSerializer):
     author = serializers.StringRelatedField()
-    short_reply = serializers.CharField(source='make_short_reply')
 
     class Meta:
         model = Reply
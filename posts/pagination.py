@@ -1,4 +1,12 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+from collections import OrderedDict
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination, BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class CustomPageNumberPagination(PageNumberPagination):
@@ -6,6 +14,7 @@ class CustomPageNumberPagination(PageNumberPagination):
     page_query_param = 'page'
     page_size_query_param = 'page_size'
     max_page_size = 100
+    cursor_query_param = 'cursor'
 
     def get_page_size(self, request):
         if request.query_params.get('page_size') == 'max':
@@ -16,3 +25,136 @@ class CustomPageNumberPagination(PageNumberPagination):
             request.query_params._mutable = _mutable
 
         return super().get_page_size(request)
+
+    def get_cursor_pagination(self, request, view):
+        # the cursor mode is available for the views that declare their keyset ordering.
+        cursor_ordering = getattr(view, 'cursor_ordering', None)
+        if cursor_ordering and self.cursor_query_param in request.query_params:
+            return KeysetPagination(cursor_ordering, self.get_page_size(request), self.cursor_query_param)
+        return None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_pagination = self.get_cursor_pagination(request, view)
+        if self.cursor_pagination:
+            return self.cursor_pagination.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_pagination:
+            return self.cursor_pagination.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        if getattr(view, 'cursor_ordering', None):
+            parameters.append({
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value. Send it empty for the first page of the cursor mode.',
+                'schema': {'type': 'string'},
+            })
+        return parameters
+
+
+class KeysetPagination(BasePagination):
+    """
+        Seeks the pages on the ordering fields values of the page boundary object instead of using OFFSET,
+        so the deep pages are as fast as the first one. The last ordering field should be unique.
+    """
+    def __init__(self, ordering, page_size, cursor_query_param='cursor'):
+        descending = {field.startswith('-') for field in ordering}
+        assert len(descending) == 1, 'The keyset ordering fields should all have the same direction.'
+        self.ordering = ordering
+        self.field_names = [field.lstrip('-') for field in ordering]
+        self.descending = descending.pop()
+        self.page_size = page_size
+        self.cursor_query_param = cursor_query_param
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        position, reverse = self.decode_cursor(request, queryset.model)
+
+        if reverse:
+            queryset = queryset.order_by(*[self.flip_ordering(field) for field in self.ordering])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(self.get_seek_filter(position, reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        has_following_objects = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_following_objects
+        else:
+            self.has_next, self.has_previous = has_following_objects, position is not None
+
+        self.position, self.reverse = position, reverse
+        return self.page
+
+    @staticmethod
+    def flip_ordering(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    def get_seek_filter(self, position, reverse):
+        # the objects after the position in the ordering: (a, b) < (x, y) means a < x or (a = x and b < y).
+        lookup = 'lt' if self.descending != reverse else 'gt'
+        seek_filter = Q()
+        for index, field_name in enumerate(self.field_names):
+            condition = Q(**{f'{field_name}__{lookup}': position[index]})
+            for previous_index in range(index):
+                condition &= Q(**{self.field_names[previous_index]: position[previous_index]})
+            seek_filter |= condition
+        return seek_filter
+
+    def get_position(self, obj):
+        # the objects may be the `.values()` rows too.
+        if isinstance(obj, dict):
+            return [obj[field_name] for field_name in self.field_names]
+        return [getattr(obj, field_name) for field_name in self.field_names]
+
+    def encode_cursor(self, position, reverse):
+        cursor_data = {'position': [str(value) if value is not None else None for value in position]}
+        if reverse:
+            cursor_data['reverse'] = True
+        cursor = base64.urlsafe_b64encode(json.dumps(cursor_data).encode()).decode()
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request, model):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            cursor_data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            position = [
+                model._meta.get_field(field_name).to_python(value)
+                for field_name, value in zip(self.field_names, cursor_data['position'], strict=True)
+            ]
+            return position, bool(cursor_data.get('reverse', False))
+        except (TypeError, ValueError, KeyError, AttributeError, ValidationError):
+            raise NotFound('Invalid cursor')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.page:
+            return self.encode_cursor(self.get_position(self.page[-1]), reverse=False)
+        return self.encode_cursor(self.position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.page:
+            return self.encode_cursor(self.get_position(self.page[0]), reverse=True)
+        return self.encode_cursor(self.position, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
@@ -0,0 +1,87 @@
+import cProfile
+import os
+import pstats
+import re
+import time
+from collections import namedtuple
+from django.conf import settings
+
+PROFILE_SUFFIX = '.prof'
+PROFILE_NAME_PATTERN = re.compile(
+    r'^(?P<timestamp>\d+)-(?P<url_name>[\w-]+)-(?P<method>[A-Z]+)-v(?P<version>[\w.-]+)-(?P<ms>\d+)ms\.prof$'
+)
+
+
+def get_profiling_settings():
+    profiling_settings = {
+        'ENABLED': False, 'SAMPLE_RATE': 0, 'THRESHOLD_MS': None, 'DIRECTORY': settings.BASE_DIR / 'profiles',
+        'MAX_FILES': 500,
+    }
+    profiling_settings.update(getattr(settings, 'POSTS_PROFILING', {}))
+    return profiling_settings
+
+
+class ProfileInfo(namedtuple('ProfileInfo', ['path', 'timestamp', 'url_name', 'method', 'version', 'ms'])):
+
+    @classmethod
+    def from_path(cls, path):
+        match = PROFILE_NAME_PATTERN.match(os.path.basename(path))
+        if match is None:
+            return None
+        return cls(path, int(match['timestamp']), match['url_name'], match['method'], match['version'],
+                   int(match['ms']))
+
+
+def get_profile_name(url_name, method, version, milliseconds):
+    # the nanoseconds timestamp first, so the names are in the order of the profiles.
+    tags = [re.sub(r'[^\w.-]', '-', str(tag or 'none')) for tag in [url_name, version]]
+    return f'{time.time_ns()}-{tags[0]}-{method}-v{tags[1]}-{round(milliseconds)}ms{PROFILE_SUFFIX}'
+
+
+def list_profiles(directory):
+    if not os.path.isdir(directory):
+        return []
+    profiles = [ProfileInfo.from_path(os.path.join(directory, name)) for name in os.listdir(directory)]
+    return sorted([profile for profile in profiles if profile is not None], key=lambda profile: profile.timestamp)
+
+
+def save_profile(profiler, directory, name, max_files):
+    """
+        Writes the stats of the `profiler` to the `directory` and removes the oldest profiles over `max_files`.
+    """
+    os.makedirs(directory, exist_ok=True)
+    profiler.dump_stats(os.path.join(directory, name))
+    profiles = list_profiles(directory)
+    for profile in profiles[:max(len(profiles) - max_files, 0)]:
+        try:
+            os.remove(profile.path)
+        except FileNotFoundError:
+            # removed by another worker.
+            pass
+
+
+def start_profiler():
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # another profiler is active.
+        return None
+    return profiler
+
+
+HotFunction = namedtuple('HotFunction', ['function', 'calls', 'total_seconds', 'cumulative_seconds'])
+
+
+def aggregate_profiles(profiles, sort='tottime', limit=20):
+    """
+        Merges the stats of the profiles and returns the `limit` hot functions by their own (`tottime`) or
+        cumulative (`cumtime`) seconds across the samples.
+    """
+    stats = pstats.Stats(*[profile.path for profile in profiles])
+    sort_index = {'tottime': 2, 'cumtime': 3}[sort]
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][sort_index], reverse=True)[:limit]
+    return [
+        HotFunction(pstats.func_std_string(function), calls, total_seconds, cumulative_seconds)
+        for function, (_, calls, total_seconds, cumulative_seconds, _) in rows
+    ]
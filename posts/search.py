@@ -0,0 +1,223 @@
+import operator
+import re
+from abc import ABC, abstractmethod
+from functools import reduce
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from .models import Post
+
+# the searchable post document fields and the lookups of the field values.
+DOCUMENT_FIELDS = {
+    'title': 'title',
+    'tags': 'tags__tag',
+    'author': 'author__username',
+    'description': 'description',
+}
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def get_search_settings():
+    search_settings = {'BACKEND': None, 'ROUTE_FILTERSET': False}
+    search_settings.update(getattr(settings, 'POSTS_SEARCH', {}))
+    return search_settings
+
+
+def get_search_backend():
+    backend_path = get_search_settings()['BACKEND']
+    if backend_path:
+        return import_string(backend_path)()
+    return get_default_backend_class(connection)()
+
+
+def get_default_backend_class(db_connection):
+    if db_connection.vendor == 'postgresql':
+        return PostgreSQLSearchBackend
+    elif db_connection.vendor == 'sqlite' and SQLiteFTS5SearchBackend.is_available(db_connection):
+        return SQLiteFTS5SearchBackend
+    return IContainsSearchBackend
+
+
+def get_term_words(term):
+    return [word.lower() for word in WORD_PATTERN.findall(term)]
+
+
+class BaseSearchBackend(ABC):
+    """
+        Searches the posts by the document fields, each term should match as the prefix of the words. the index of
+        the default backend of the database is created by the migrations.
+    """
+    @abstractmethod
+    def search(self, queryset, terms, fields=None, ranked=True):
+        """
+            Filters the posts matching all the terms in the given document fields, and if `ranked` orders them by
+            their rank that is annotated as `search_rank`.
+        """
+
+    @staticmethod
+    def get_db_pks(post_pks):
+        return [Post._meta.pk.get_db_prep_value(pk, connection) for pk in post_pks]
+
+    def index_posts(self, post_pks):
+        pass
+
+    def remove_posts(self, post_pks):
+        pass
+
+
+class IContainsSearchBackend(BaseSearchBackend):
+    """
+        The fallback backend that works the same as the DRF's SearchFilter, without ranking.
+    """
+    def search(self, queryset, terms, fields=None, ranked=True):
+        lookups = [f'{DOCUMENT_FIELDS[field]}__icontains' for field in fields or DOCUMENT_FIELDS]
+        for term in terms:
+            queryset = queryset.filter(reduce(operator.or_, [Q(**{lookup: term}) for lookup in lookups]))
+        if any('__' in lookup[:-len('__icontains')] for lookup in lookups):
+            queryset = queryset.distinct()
+        return queryset
+
+
+class SQLiteFTS5SearchBackend(BaseSearchBackend):
+    """
+        Keeps the post documents in an FTS5 shadow table.
+    """
+    table_name = 'posts_post_fts'
+
+    # the FTS5 availability of the databases by their alias, checked once per process.
+    available_databases = {}
+
+    @classmethod
+    def is_available(cls, db_connection):
+        if db_connection.alias not in cls.available_databases:
+            with db_connection.cursor() as cursor:
+                cursor.execute('PRAGMA compile_options')
+                cls.available_databases[db_connection.alias] = ('ENABLE_FTS5',) in cursor.fetchall()
+        return cls.available_databases[db_connection.alias]
+
+    def get_match_query(self, terms, fields=None):
+        columns = ' '.join(fields or DOCUMENT_FIELDS)
+        phrases = []
+        for term in terms:
+            words = get_term_words(term)
+            if words:
+                phrases.append('{%s} : "%s" *' % (columns, ' '.join(words)))
+        return ' AND '.join(phrases)
+
+    def search(self, queryset, terms, fields=None, ranked=True):
+        match_query = self.get_match_query(terms, fields)
+        if not match_query:
+            return queryset
+        post_table = Post._meta.db_table
+        if not ranked:
+            return queryset.filter(pk__in=RawSQL(
+                f'SELECT post_id FROM {self.table_name} WHERE {self.table_name} MATCH %s', [match_query]
+            ))
+        return queryset.extra(
+            select={'search_rank': f'{self.table_name}.rank'},
+            tables=[self.table_name],
+            where=[f'{self.table_name}.post_id = {post_table}.id', f'{self.table_name} MATCH %s'],
+            params=[match_query],
+            order_by=['search_rank'],
+        )
+
+    def index_posts(self, post_pks):
+        post_pks = list(post_pks)
+        if not post_pks:
+            return
+        self.remove_posts(post_pks)
+        post_table = Post._meta.db_table
+        through_table = Post.tags.through._meta.db_table
+        tag_table = Post.tags.field.related_model._meta.db_table
+        user_table = get_user_model()._meta.db_table
+        pk_placeholders = ', '.join(['%s'] * len(post_pks))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {self.table_name} (post_id, title, tags, author, description) '
+                f'SELECT post.id, post.title, '
+                f'(SELECT group_concat(tag.tag, \' \') FROM {through_table} through '
+                f'INNER JOIN {tag_table} tag ON tag.id = through.tag_id WHERE through.post_id = post.id), '
+                f'author.username, post.description '
+                f'FROM {post_table} post INNER JOIN {user_table} author ON author.id = post.author_id '
+                f'WHERE post.id IN ({pk_placeholders})',
+                self.get_db_pks(post_pks)
+            )
+
+    def remove_posts(self, post_pks):
+        post_pks = list(post_pks)
+        if not post_pks:
+            return
+        pk_placeholders = ', '.join(['%s'] * len(post_pks))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table_name} WHERE post_id IN ({pk_placeholders})', self.get_db_pks(post_pks)
+            )
+
+
+class PostgreSQLSearchBackend(BaseSearchBackend):
+    """
+        Keeps the weighted post documents in a tsvector column of the posts table with a GIN index.
+    """
+    column_name = 'search_vector'
+    config = 'simple'
+    field_weights = {'title': 'A', 'tags': 'B', 'author': 'C', 'description': 'D'}
+
+    def get_tsquery(self, terms, fields=None):
+        weights = ''.join(self.field_weights[field] for field in fields) if fields else ''
+        phrases = []
+        for term in terms:
+            words = get_term_words(term)
+            if words:
+                # the last word of each term is a prefix.
+                words[-1] = f'{words[-1]}:*'
+                phrases.append(' <-> '.join(f'{word}{weights}' for word in words))
+        return ' & '.join(f'({phrase})' for phrase in phrases)
+
+    def search(self, queryset, terms, fields=None, ranked=True):
+        tsquery = self.get_tsquery(terms, fields)
+        if not tsquery:
+            return queryset
+        vector = f'{Post._meta.db_table}.{self.column_name}'
+        query = f'to_tsquery(\'{self.config}\', %s)'
+        if not ranked:
+            return queryset.extra(where=[f'{vector} @@ {query}'], params=[tsquery])
+        return queryset.extra(
+            select={'search_rank': f'ts_rank({vector}, {query})'},
+            select_params=[tsquery],
+            where=[f'{vector} @@ {query}'],
+            params=[tsquery],
+            order_by=['-search_rank'],
+        )
+
+    def get_document_sql(self, post_alias):
+        through_table = Post.tags.through._meta.db_table
+        tag_table = Post.tags.field.related_model._meta.db_table
+        user_table = get_user_model()._meta.db_table
+        tags_sql = (
+            f'(SELECT string_agg(tag.tag, \' \') FROM {through_table} through '
+            f'INNER JOIN {tag_table} tag ON tag.id = through.tag_id WHERE through.post_id = {post_alias}.id)'
+        )
+        author_sql = f'(SELECT author.username FROM {user_table} author WHERE author.id = {post_alias}.author_id)'
+        documents = {
+            'title': f'{post_alias}.title', 'tags': tags_sql, 'author': author_sql,
+            'description': f'{post_alias}.description',
+        }
+        return ' || '.join(
+            f'setweight(to_tsvector(\'{self.config}\', coalesce({documents[field]}, \'\')), \'{weight}\')'
+            for field, weight in self.field_weights.items()
+        )
+
+    def index_posts(self, post_pks):
+        post_pks = list(post_pks)
+        if not post_pks:
+            return
+        post_table = Post._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {post_table} SET {self.column_name} = {self.get_document_sql(post_table)} '
+                f'WHERE {post_table}.id = ANY(%s)',
+                [self.get_db_pks(post_pks)]
+            )
@@ -1,14 +1,14 @@
 from rest_framework import serializers
 from accounts.nested_serializers import CustomUserNestedSerializer
 from .models import Tag, Post, Comment, Reply
+from .bulk import PreloadedHyperlinkedRelatedField, PreloadedSlugRelatedField
+from .hyperlinks import TemplateHyperlinkedIdentityField, TemplateHyperlinkedModelSerializer, TemplateHyperlinkedPKField
 from . import nested_serializers
 
 
-class PostListSerializer(serializers.HyperlinkedModelSerializer, nested_serializers.CommentsCountMixin):
+class PostListSerializer(TemplateHyperlinkedModelSerializer):
     author = serializers.StringRelatedField()
-    short_description = serializers.CharField(read_only=True, source='make_short_description')
-    comments_count = serializers.SerializerMethodField()
-    tags = serializers.SlugRelatedField(slug_field='tag', queryset=Tag.objects.all(), many=True, required=False)
+    tags = PreloadedSlugRelatedField(slug_field='tag', queryset=Tag.objects.all(), many=True, required=False)
 
     class Meta:
         model = Post
@@ -22,7 +22,7 @@ class PostListSerializer(serializers.HyperlinkedModelSerializer, nested_serializ
         }
 
 
-class PostDetailSerializer(serializers.HyperlinkedModelSerializer):
+class PostDetailSerializer(TemplateHyperlinkedModelSerializer):
     author = CustomUserNestedSerializer(read_only=True)
     tags = serializers.SlugRelatedField(slug_field='tag', queryset=Tag.objects.all(), many=True, required=False)
     comments = nested_serializers.CommentNestedSerializer(many=True, read_only=True)
@@ -47,9 +47,8 @@ class DraftPostDetailSerializer(PostDetailSerializer):
         }
 
 
-class PostCommentListSerializer(serializers.HyperlinkedModelSerializer, nested_serializers.RepliesCountMixin):
+class PostCommentListSerializer(TemplateHyperlinkedModelSerializer):
     author = CustomUserNestedSerializer(read_only=True)
-    replies_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Comment
@@ -59,14 +58,23 @@ class PostCommentListSerializer(serializers.HyperlinkedModelSerializer, nested_s
 
 
 class TagSerializer(serializers.ModelSerializer):
-    posts = PostListSerializer(many=True, read_only=True)
+    url = TemplateHyperlinkedIdentityField(view_name='tag-detail', lookup_field='tag')
+    posts_url = TemplateHyperlinkedIdentityField(view_name='tag-post-list', lookup_field='tag')
 
     class Meta:
         model = Tag
-        fields = ['tag', 'posts']
+        fields = ['url', 'tag', 'posts_count', 'posts_url']
+
+
+class TagDetailSerializer(TagSerializer):
+    # the first page of the posts, the next pages are in the posts url.
+    posts = PostListSerializer(many=True, read_only=True, source='first_posts')
+
+    class Meta(TagSerializer.Meta):
+        fields = TagSerializer.Meta.fields + ['posts']
 
 
-class CommentDetailSerializer(serializers.HyperlinkedModelSerializer):
+class CommentDetailSerializer(TemplateHyperlinkedModelSerializer):
     post = nested_serializers.PostNestedSerializer(read_only=True)
     author = CustomUserNestedSerializer(read_only=True)
     replies = nested_serializers.ReplyNestedSerializer(read_only=True, many=True)
@@ -76,43 +84,56 @@ class CommentDetailSerializer(serializers.HyperlinkedModelSerializer):
         fields = ['url', 'post', 'author', 'comment', 'replies', 'commented_at', 'updated_at']
 
 
-class CommentReplyListSerializer(serializers.HyperlinkedModelSerializer, nested_serializers.AddsCountMixin):
+class CommentReplyListSerializer(TemplateHyperlinkedModelSerializer):
     author = CustomUserNestedSerializer(read_only=True)
+    addsign = PreloadedHyperlinkedRelatedField(
+        view_name='reply-detail', queryset=Reply.objects.all(), write_only=True, required=False, allow_null=True
+    )
     addsign_detail = nested_serializers.AddsignNestedSerializer(read_only=True, source='addsign')
-    adds_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Reply
         fields = [
-            'url', 'author', 'addsign', 'addsign_detail', 'reply', 'adds_count',
+            'url', 'author', 'addsign', 'addsign_detail', 'reply', 'adds_count', 'depth', 'descendants_count',
             'replied_at', 'updated_at',
         ]
-        extra_kwargs = {
-            'addsign': {'write_only': True},
-        }
 
 
-class ReplyDetailSerializer(serializers.HyperlinkedModelSerializer):
+class ReplyDetailSerializer(TemplateHyperlinkedModelSerializer):
     author = CustomUserNestedSerializer(read_only=True)
     addsign = nested_serializers.ReplyNestedSerializer(read_only=True)
     adds = nested_serializers.ReplyNestedSerializer(read_only=True, many=True)
+    # the jumps to the replies above, from the root to the addsign.
+    ancestors = TemplateHyperlinkedPKField(view_name='reply-detail', many=True, source='get_ancestor_pks')
 
     class Meta:
         model = Reply
         fields = [
-            'url', 'author', 'comment', 'addsign', 'reply', 'adds', 'replied_at', 'updated_at'
+            'url', 'author', 'comment', 'addsign', 'ancestors', 'reply', 'adds', 'depth', 'descendants_count',
+            'replied_at', 'updated_at'
         ]
         extra_kwargs = {
             'comment': {'read_only': True, }
         }
 
 
-class ReplyAddsListSerializer(serializers.HyperlinkedModelSerializer, nested_serializers.AddsCountMixin):
+class ReplyAddsListSerializer(TemplateHyperlinkedModelSerializer):
     author = CustomUserNestedSerializer(read_only=True)
-    adds_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Reply
         fields = [
             'url', 'author', 'reply', 'adds_count', 'replied_at', 'updated_at',
         ]
+
+
+class ReplyThreadSerializer(TemplateHyperlinkedModelSerializer):
+    author = CustomUserNestedSerializer(read_only=True)
+    # the thread of the reply, for the adds deeper than the depth of the request.
+    thread = TemplateHyperlinkedIdentityField(view_name='reply-thread')
+
+    class Meta:
+        model = Reply
+        fields = [
+            'url', 'thread', 'author', 'reply', 'adds_count', 'descendants_count', 'replied_at', 'updated_at',
+        ]
@@ -0,0 +1,254 @@
+from django.contrib.auth import get_user_model
+from collections import Counter
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver, Signal
+from .models import Tag, Post, Comment, Reply
+from .counters import M2M_COUNTERS, get_model_counters
+from .search import get_search_backend
+from .caching import bump_generations
+from .trees import remove_from_tree, set_bulk_created_paths, update_descendants_counts
+
+# sent after the bulk creation of the objects, that does not send the save signals, with the created `objs`.
+bulk_created = Signal()
+
+
+def update_counters(instance, delta):
+    for counter in get_model_counters(type(instance)):
+        field = instance._meta.get_field(counter.field_name)
+        counter.update(getattr(instance, field.attname), delta)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=Reply)
+def increase_counters(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        update_counters(instance, 1)
+
+
+# also receiving the cascade deleted objects, as the collector sends the signal for them too.
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=Reply)
+def decrease_counters(sender, instance, **kwargs):
+    update_counters(instance, -1)
+
+
+def update_counter_deltas(counter, deltas):
+    # updating the counter objects with the same delta together.
+    pks_by_delta = {}
+    for pk, delta in deltas.items():
+        pks_by_delta.setdefault(delta, []).append(pk)
+    for delta, pks in pks_by_delta.items():
+        counter.update_many(pks, delta)
+
+
+@receiver(bulk_created, sender=Post)
+@receiver(bulk_created, sender=Comment)
+@receiver(bulk_created, sender=Reply)
+def increase_counters_on_bulk_create(sender, objs, **kwargs):
+    for counter in get_model_counters(sender):
+        attname = sender._meta.get_field(counter.field_name).attname
+        deltas = Counter(getattr(obj, attname) for obj in objs if getattr(obj, attname) is not None)
+        update_counter_deltas(counter, deltas)
+
+
+# the materialized paths and the descendants counts of the replies.
+@receiver(post_save, sender=Reply)
+def increase_descendants_counts(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        update_descendants_counts(dict.fromkeys(instance.get_ancestor_pks(), 1))
+
+
+@receiver(post_delete, sender=Reply)
+def remove_reply_from_tree(sender, instance, **kwargs):
+    remove_from_tree(instance)
+
+
+@receiver(bulk_created, sender=Reply)
+def set_bulk_created_reply_paths(sender, objs, **kwargs):
+    set_bulk_created_paths(objs)
+
+
+# the published posts counts of the tags.
+TAG_POSTS_COUNTER = M2M_COUNTERS[0]
+
+
+def update_tag_posts_counts(tag_deltas):
+    update_counter_deltas(TAG_POSTS_COUNTER, tag_deltas)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def update_tag_posts_counts_on_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'post_add' and pk_set:
+        if not reverse:
+            if instance.status == 'p':
+                TAG_POSTS_COUNTER.update_many(pk_set, 1)
+        else:
+            TAG_POSTS_COUNTER.update(instance.pk, Post.objects.filter(pk__in=pk_set, status='p').count())
+    elif action in ('post_remove', 'post_clear'):
+        removed_relations = getattr(instance, '_removed_tag_relations', [])
+        tag_deltas = Counter(tag_pk for _, tag_pk, status in removed_relations if status == 'p')
+        update_tag_posts_counts({tag_pk: -count for tag_pk, count in tag_deltas.items()})
+
+
+@receiver(post_save, sender=Post)
+def update_tag_posts_counts_on_status_change(sender, instance, created, raw=False, **kwargs):
+    # the new posts have no tags yet, and the deferred status is not known.
+    loaded_status = getattr(instance, '_loaded_status', None)
+    instance._loaded_status = instance.status
+    if created or raw or loaded_status is None or (loaded_status == 'p') == (instance.status == 'p'):
+        return
+    tag_pks = Post.tags.through.objects.filter(post=instance).values_list('tag_id', flat=True)
+    TAG_POSTS_COUNTER.update_many(list(tag_pks), 1 if instance.status == 'p' else -1)
+
+
+@receiver(pre_delete, sender=Post)
+def update_tag_posts_counts_on_delete(sender, instance, **kwargs):
+    # the tag relations are deleted without the m2m_changed signal.
+    if getattr(instance, '_loaded_status', instance.status) == 'p':
+        tag_pks = Post.tags.through.objects.filter(post=instance).values_list('tag_id', flat=True)
+        TAG_POSTS_COUNTER.update_many(list(tag_pks), -1)
+
+
+@receiver(bulk_created, sender=Post)
+def update_tag_posts_counts_on_bulk_create(sender, objs, **kwargs):
+    # the tag relations of the bulk created posts are created before the signal.
+    published_pks = [obj.pk for obj in objs if obj.status == 'p']
+    if published_pks:
+        tag_pks = Post.tags.through.objects.filter(post__in=published_pks).values_list('tag_id', flat=True)
+        update_tag_posts_counts(Counter(tag_pks))
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, raw=False, **kwargs):
+    if not raw:
+        get_search_backend().index_posts([instance.pk])
+
+
+@receiver(bulk_created, sender=Post)
+def index_bulk_created_posts(sender, objs, **kwargs):
+    get_search_backend().index_posts([obj.pk for obj in objs])
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_index(sender, instance, **kwargs):
+    get_search_backend().remove_posts([instance.pk])
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def collect_removed_tag_relations(sender, instance, action, reverse, pk_set, **kwargs):
+    # the removed relations are not known after the removal, and the requested ones to remove might not exist.
+    if action not in ('pre_remove', 'pre_clear'):
+        return
+    relations = sender.objects.filter(**{'tag' if reverse else 'post': instance})
+    if action == 'pre_remove':
+        relations = relations.filter(**{'post__in' if reverse else 'tag__in': pk_set})
+    instance._removed_tag_relations = list(relations.values_list('post_id', 'tag_id', 'post__status'))
+
+
+def get_changed_tag_post_pks(instance, action, reverse, pk_set):
+    if not reverse:
+        return [instance.pk]
+    elif action == 'post_add':
+        return list(pk_set or [])
+    return [post_pk for post_pk, _, _ in getattr(instance, '_removed_tag_relations', [])]
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def index_post_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        get_search_backend().index_posts(get_changed_tag_post_pks(instance, action, reverse, pk_set))
+
+
+@receiver(post_save, sender=Tag)
+def index_tag_posts(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        get_search_backend().index_posts(instance.posts.values_list('pk', flat=True))
+
+
+def is_username_updated(created, update_fields):
+    return not created and (update_fields is None or 'username' in update_fields)
+
+
+@receiver(post_save, sender=get_user_model())
+def index_author_posts(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if not raw and is_username_updated(created, update_fields):
+        get_search_backend().index_posts(instance.posts.values_list('pk', flat=True))
+
+
+# the response cache generations.
+def bump_generations_on_commit(scopes):
+    """
+        Bumps the generations after the transaction is committed, so a concurrent request does not cache the old rows
+        by the new generations, and a rolled back change does not invalidate the responses.
+    """
+    scopes = list(scopes)
+    transaction.on_commit(lambda: bump_generations(scopes))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def bump_post_generations(sender, instance, **kwargs):
+    bump_generations_on_commit(['posts', f'post:{instance.pk}'])
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_comment_generations(sender, instance, **kwargs):
+    bump_generations_on_commit(['posts', f'post:{instance.post_id}'])
+
+
+@receiver(post_save, sender=Reply)
+@receiver(post_delete, sender=Reply)
+def bump_reply_generations(sender, instance, **kwargs):
+    if Reply.comment.is_cached(instance):
+        post_pk = instance.comment.post_id
+    else:
+        post_pk = Comment.objects.filter(pk=instance.comment_id).values_list('post_id', flat=True).first()
+    # the comment of the cascade deleted replies has bumped the generations itself.
+    if post_pk is not None:
+        bump_generations_on_commit([f'post:{post_pk}'])
+
+
+@receiver(bulk_created, sender=Post)
+def bump_bulk_created_post_generations(sender, objs, **kwargs):
+    bump_generations_on_commit(['posts'])
+
+
+@receiver(bulk_created, sender=Comment)
+def bump_bulk_created_comment_generations(sender, objs, **kwargs):
+    bump_generations_on_commit(['posts'] + [f'post:{post_pk}' for post_pk in {obj.post_id for obj in objs}])
+
+
+@receiver(bulk_created, sender=Reply)
+def bump_bulk_created_reply_generations(sender, objs, **kwargs):
+    comment_pks = {obj.comment_id for obj in objs}
+    post_pks = Comment.objects.filter(pk__in=comment_pks).values_list('post_id', flat=True).distinct()
+    bump_generations_on_commit([f'post:{post_pk}' for post_pk in post_pks])
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def bump_post_tags_generations(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        post_pks = get_changed_tag_post_pks(instance, action, reverse, pk_set)
+        bump_generations_on_commit(['posts'] + [f'post:{pk}' for pk in post_pks])
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def bump_tag_generations(sender, instance, **kwargs):
+    bump_generations_on_commit(['posts', 'tags'])
+
+
+@receiver(post_save, sender=get_user_model())
+def bump_saved_user_generations(sender, instance, created, update_fields=None, **kwargs):
+    # the users are shown by their usernames, so the other updates, like the last login, do not matter.
+    if is_username_updated(created, update_fields):
+        bump_generations_on_commit(['posts', 'users'])
+
+
+@receiver(post_delete, sender=get_user_model())
+def bump_deleted_user_generations(sender, instance, **kwargs):
+    bump_generations_on_commit(['posts', 'users'])
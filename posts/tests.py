@@ -1,10 +1,47 @@
+import asyncio
+import json
+import tempfile
+import uuid
+from urllib.parse import quote
+from decimal import Decimal
+from io import StringIO
+from operator import attrgetter
+from types import SimpleNamespace
+from unittest import mock, skipUnless
+from asgiref.sync import async_to_sync
 from django.contrib.auth import get_user_model
-from rest_framework.test import APITestCase, override_settings
+from django.core.handlers.asgi import ASGIHandler
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import call_command, CommandError
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse as django_reverse, set_script_prefix
+from django.urls.converters import UUIDConverter
+from django.utils.translation import gettext_lazy
+from rest_framework.request import Request
+from rest_framework.serializers import HyperlinkedIdentityField, Serializer
+from rest_framework.test import APIRequestFactory, APITestCase, force_authenticate, override_settings
 from rest_framework.reverse import reverse
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.authtoken.models import Token
 from django_project.settings import REST_FRAMEWORK
-from .models import Tag, Post, Comment, Reply
-from .views import PostListCreateView, PostDetailUpdateDeleteView
+from accounts import urls as accounts_urls
+from accounts.serializers import CustomUserDetailSerializer, UserPostListSerializer
+from accounts.throttling import CustomAnonRateThrottle
+from .caching import response_cache_stats
+from .compiled_serializers import get_compiled_plan
+from .hyperlinks import URL_SAFE_CHARACTERS, TemplateHyperlinkedIdentityField, get_url_template
+from .loadtest import SeedVolumes, seed_content, summarize, compare_results
+from .middleware import get_query_budgets
+from .metrics import MetricsFile, ROUTE, REQUESTS, QUERIES
+from .profiling import list_profiles
+from .models import Tag, Post, Comment, Reply, formatted_text
+from .renderers import ORJSONRenderer, orjson, msgpack
+from .search import BaseSearchBackend
+from .views import PostListCreateView, PostDetailUpdateDeleteView, PostCommentListView, TagDetailView
+from . import serializers, urls as posts_urls
 # Create your tests here.
 
 NOT_CONTAINS_TEXT = 'Hi there I should not be here!'
@@ -43,8 +80,15 @@ class TagTests(APITestCase):
         cls.post = Post.objects.create(
             title='A test post',
             author=cls.user,
+            status='p',
         )
         cls.post.tags.add(cls.tag)
+        # the drafts should not be shown in the tag posts.
+        cls.draft_post = Post.objects.create(
+            title=NOT_CONTAINS_TEXT,
+            author=cls.user,
+        )
+        cls.draft_post.tags.add(cls.tag)
 
     def test_tag_model(self):
         self.assertEqual(Tag.objects.count(), 1)
@@ -500,3 +544,1806 @@ class CustomPageNumberPaginationTests(APITestCase):
         response = self.client.get(self.path, data)
         self.assertContains(response, self.posts[0])
         self.assertContains(response, self.posts[19])
+
+
+class CountersTests(APITestCase):
+
+    # so that the anonymous throttling history does not affect other tests.
+    def tearDown(self):
+        super().tearDown()
+        cache.clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='testuser',
+            password='testpass123',
+        )
+        cls.post = Post.objects.create(
+            title='A test post',
+            author=cls.user,
+            status='p',
+        )
+        for i in range(3):
+            Comment.objects.create(post=cls.post, author=cls.user, comment=f'A test comment{i}')
+        cls.path = reverse('post-list')
+
+    def count_comment_table_queries(self, path, data=None):
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(path, data)
+        return len([query for query in context.captured_queries if '"posts_comment"' in query['sql']])
+
+    def test_counters_on_create_and_delete(self):
+        self.post.refresh_from_db()
+        self.user.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 3)
+        self.assertEqual(self.user.posts_count, 1)
+        self.assertEqual(self.user.comments_count, 3)
+        comment = self.post.comments.first()
+        reply = Reply.objects.create(comment=comment, author=self.user, reply='A test reply')
+        Reply.objects.create(comment=comment, author=self.user, addsign=reply, reply='An addsign test reply')
+        comment.refresh_from_db()
+        reply.refresh_from_db()
+        self.assertEqual(comment.replies_count, 2)
+        self.assertEqual(reply.adds_count, 1)
+        comment.delete()
+        self.post.refresh_from_db()
+        self.user.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 2)
+        self.assertEqual(self.user.comments_count, 2)
+        # cascade deleting
+        self.post.delete()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.posts_count, 0)
+        self.assertEqual(self.user.comments_count, 0)
+
+    def test_reconcile_counters_command(self):
+        Post.objects.update(comments_count=10)
+        get_user_model().objects.update(posts_count=0, comments_count=7)
+        call_command('reconcile_counters', batch_size=1, stdout=StringIO())
+        self.post.refresh_from_db()
+        self.user.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 3)
+        self.assertEqual(self.user.posts_count, 1)
+        self.assertEqual(self.user.comments_count, 3)
+
+    def test_list_view_comments_count(self):
+        response = self.client.get(self.path)
+        self.assertEqual(response.data['results'][0]['comments_count'], 3)
+
+    def test_list_view_does_not_query_the_comments(self):
+        for i in range(10):
+            Post.objects.create(title=f'Test post{i}', author=self.user, status='p')
+        self.assertEqual(self.count_comment_table_queries(self.path, {'page_size': 'max'}), 0)
+
+    def test_detail_view_nested_counts_do_not_depend_on_comments_count(self):
+        path = reverse('post-detail', kwargs={'pk': self.post.pk})
+        few_comments_queries = self.count_comment_table_queries(path)
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(10):
+                Comment.objects.create(post=self.post, author=self.user, comment=f'Another test comment{i}')
+        many_comments_queries = self.count_comment_table_queries(path)
+        self.assertEqual(few_comments_queries, many_comments_queries)
+
+
+class EagerLoadingTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser(
+            username='testuser',
+            password='testpass123',
+        )
+        cls.tag = Tag.objects.create(tag='A-test-tag')
+        cls.post = Post.objects.create(title='A test post', author=cls.user, status='p')
+        cls.post.tags.add(cls.tag)
+        cls.comment = Comment.objects.create(post=cls.post, author=cls.user, comment='A test comment')
+        cls.reply = Reply.objects.create(comment=cls.comment, author=cls.user, reply='A test reply')
+        cls.add_rows()
+
+    @classmethod
+    def add_rows(cls, count=1):
+        for i in range(count):
+            author = get_user_model().objects.create_user(username=f'{get_user_model().objects.count()}testuser')
+            post = Post.objects.create(title='Another test post', author=author, status='p')
+            post.tags.add(cls.tag, Tag.objects.create(tag=f'{Tag.objects.count()}-test-tag'))
+            Post.objects.create(title='Another test post', author=cls.user, status='p').tags.add(cls.tag)
+            Comment.objects.create(post=cls.post, author=author, comment='Another test comment')
+            Comment.objects.create(post=post, author=cls.user, comment='Another test comment')
+            Reply.objects.create(comment=cls.comment, author=author, addsign=cls.reply, reply='Another test reply')
+            Reply.objects.create(comment=cls.comment, author=cls.user, addsign=cls.reply, reply='Another test reply')
+
+    def get_paths(self):
+        slug_kwargs = {'slug': self.user.slug}
+        return [
+            reverse('post-list'),
+            reverse('post-detail', kwargs={'pk': self.post.pk}),
+            reverse('tag-detail', kwargs={'tag': self.tag.tag}),
+            reverse('tag-post-list', kwargs={'tag': self.tag.tag}),
+            reverse('post-comment-list', kwargs={'pk': self.post.pk}),
+            reverse('post-tag-list', kwargs={'pk': self.post.pk}),
+            reverse('comment-detail', kwargs={'pk': self.comment.pk}),
+            reverse('comment-reply-list', kwargs={'pk': self.comment.pk}),
+            reverse('reply-detail', kwargs={'pk': self.reply.pk}),
+            reverse('reply-adds-list', kwargs={'pk': self.reply.pk}),
+            reverse('user-list'),
+            reverse('user-detail', kwargs=slug_kwargs),
+            reverse('user-post-list', kwargs=slug_kwargs),
+            reverse('user-comment-list', kwargs=slug_kwargs),
+            reverse('user-reply-list', kwargs=slug_kwargs),
+        ]
+
+    def count_queries(self, path, **extra):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(path, {'page_size': 'max'}, **extra)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries)
+
+    def test_query_count_does_not_depend_on_rows_count(self):
+        self.client.force_login(self.user)
+        few_rows_query_counts = {path: self.count_queries(path) for path in self.get_paths()}
+        self.add_rows(count=5)
+        for path in self.get_paths():
+            with self.subTest(path=path):
+                self.assertEqual(self.count_queries(path), few_rows_query_counts[path])
+        self.client.logout()
+
+    def test_user_detail_query_count_does_not_depend_on_rows_count_in_versions(self):
+        self.client.force_login(self.user)
+        path = reverse('user-detail', kwargs={'slug': self.user.slug})
+        for version in REST_FRAMEWORK['ALLOWED_VERSIONS']:
+            accept = f'application/json; version={version}'
+            few_rows_query_count = self.count_queries(path, HTTP_ACCEPT=accept)
+            self.add_rows(count=2)
+            with self.subTest(version=version):
+                self.assertEqual(self.count_queries(path, HTTP_ACCEPT=accept), few_rows_query_count)
+        self.client.logout()
+
+    def test_eager_loading_plan(self):
+        view = PostDetailUpdateDeleteView()
+        self.assertEqual(view.get_eager_loading_plan().describe(), {
+            'select_related': ['author', 'comments__author'],
+            'prefetch_related': ['comments', 'tags'],
+            'deferred': ['short_description'],
+        })
+
+    def test_list_plan_defers_the_descriptions(self):
+        self.assertEqual(PostListCreateView().get_eager_loading_plan().deferred, ['description'])
+
+
+class KeysetPaginationTests(APITestCase):
+
+    # so that the anonymous throttling history does not affect other tests.
+    def tearDown(self):
+        super().tearDown()
+        cache.clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='testuser',
+            password='testpass123',
+        )
+        for i in range(25):
+            Post.objects.create(title=f'Test post{i}', author=cls.user, status='p')
+        # the posts with the same creation date should be paginated by their ids.
+        Post.objects.filter(title__in=['Test post10', 'Test post11', 'Test post12']).update(
+            created_at=Post.objects.get(title='Test post10').created_at
+        )
+        cls.post = Post.objects.get(title='Test post0')
+        for i in range(5):
+            Comment.objects.create(post=cls.post, author=cls.user, comment=f'A test comment{i}')
+        cls.path = reverse('post-list')
+        cls.expected_titles = list(Post.objects.order_by('-created_at', '-id').values_list('title', flat=True))
+
+    def get_all_pages(self, path, data):
+        results = []
+        response = self.client.get(path, data)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            results += response.data['results']
+            if not response.data['next']:
+                return response, results
+            response = self.client.get(response.data['next'])
+
+    def test_cursor_pagination_walks_all_objects_in_order(self):
+        _, results = self.get_all_pages(self.path, {'cursor': '', 'page_size': 10})
+        self.assertEqual([post['title'] for post in results], self.expected_titles)
+
+    def test_cursor_pagination_previous_page(self):
+        first_response = self.client.get(self.path, {'cursor': '', 'page_size': 10})
+        self.assertIsNone(first_response.data['previous'])
+        second_response = self.client.get(first_response.data['next'])
+        self.assertEqual([post['title'] for post in second_response.data['results']], self.expected_titles[10:20])
+        previous_response = self.client.get(second_response.data['previous'])
+        self.assertEqual(previous_response.data['results'], first_response.data['results'])
+
+    def test_cursor_pagination_max_page_size(self):
+        response = self.client.get(self.path, {'cursor': '', 'page_size': 'max'})
+        self.assertEqual(len(response.data['results']), 25)
+        self.assertIsNone(response.data['next'])
+
+    def test_cursor_pagination_nested_list(self):
+        path = reverse('post-comment-list', kwargs={'pk': self.post.pk})
+        _, results = self.get_all_pages(path, {'cursor': '', 'page_size': 2})
+        expected_comments = self.post.comments.order_by('-commented_at', '-id').values_list('comment', flat=True)
+        self.assertEqual([comment['comment'] for comment in results], list(expected_comments))
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.path, {'cursor': 'invalid'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class SearchTests(APITestCase):
+
+    # so that the anonymous throttling history does not affect other tests.
+    def tearDown(self):
+        super().tearDown()
+        cache.clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='testuser',
+            password='testpass123',
+        )
+        cls.other_user = get_user_model().objects.create_user(
+            username='otheruser',
+            password='testpass123',
+        )
+        cls.tag = Tag.objects.create(tag='python-tips')
+        cls.title_post = Post.objects.create(title='Django search', description='Nothing here', author=cls.user,
+                                             status='p')
+        cls.description_post = Post.objects.create(title='A post', description='About django search too',
+                                                   author=cls.user, status='p')
+        cls.tag_post = Post.objects.create(title='Tagged post', author=cls.other_user, status='p')
+        cls.tag_post.tags.add(cls.tag)
+        cls.path = reverse('post-list')
+
+    # the generations are bumped on commit, so the data of the test case does not invalidate the other tests responses.
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def search(self, search, path=None):
+        response = self.client.get(path or self.path, {'search': search})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [post['title'] for post in response.data['results']]
+
+    def test_search_orders_by_rank(self):
+        self.assertEqual(self.search('django search'), [self.title_post.title, self.description_post.title])
+
+    def test_search_word_prefixes(self):
+        self.assertEqual(self.search('djan'), [self.title_post.title, self.description_post.title])
+        self.assertEqual(self.search('ango'), [])
+
+    def test_search_tags_and_authors(self):
+        self.assertEqual(self.search('python-tips'), [self.tag_post.title])
+        self.assertEqual(self.search('otheruser'), [self.tag_post.title])
+        self.assertEqual(self.search('testuser django'), [self.title_post.title, self.description_post.title])
+
+    def test_search_index_is_updated(self):
+        # the cached responses are invalidated on commit.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.title_post.title = 'Renamed post'
+            self.title_post.save()
+        self.assertEqual(self.search('renamed'), [self.title_post.title])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tag_post.tags.remove(self.tag)
+        self.assertEqual(self.search('python'), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tag.posts.add(self.description_post)
+        self.assertEqual(self.search('python'), [self.description_post.title])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tag.posts.clear()
+        self.assertEqual(self.search('python'), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_user.username = 'newname'
+            self.other_user.save()
+        self.assertEqual(self.search('newname'), [self.tag_post.title])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.title_post.delete()
+        self.assertEqual(self.search('renamed'), [])
+
+    def test_user_post_list_search_fields(self):
+        path = reverse('user-post-list', kwargs={'slug': self.user.slug})
+        self.assertEqual(self.search('django', path), [self.title_post.title, self.description_post.title])
+        self.assertEqual(self.search('testuser', path), [])
+
+    # the routing setting changes the responses of the same urls.
+    @override_settings(POSTS_RESPONSE_CACHE={'ENABLED': False})
+    def test_filterset_routing(self):
+        data = {'title__icontains': 'search'}
+        with override_settings(POSTS_SEARCH={'ROUTE_FILTERSET': True}):
+            response = self.client.get(self.path, data)
+        self.assertEqual([post['title'] for post in response.data['results']], [self.title_post.title])
+        # the routed filter matches the word prefixes only.
+        with override_settings(POSTS_SEARCH={'ROUTE_FILTERSET': True}):
+            response = self.client.get(self.path, {'title__icontains': 'earch'})
+        self.assertEqual(response.data['results'], [])
+        response = self.client.get(self.path, {'title__icontains': 'earch'})
+        self.assertEqual([post['title'] for post in response.data['results']], [self.title_post.title])
+
+    @override_settings(POSTS_SEARCH={'BACKEND': 'posts.search.IContainsSearchBackend'})
+    def test_icontains_backend(self):
+        self.assertEqual(set(self.search('django search')), {self.title_post.title, self.description_post.title})
+        self.assertEqual(set(self.search('ango')), {self.title_post.title, self.description_post.title})
+
+    def test_backends_implement_search(self):
+        with self.assertRaises(TypeError):
+            BaseSearchBackend()
+
+
+class PostVisibilityTests(APITestCase):
+
+    # so that the anonymous throttling history does not affect other tests.
+    def tearDown(self):
+        super().tearDown()
+        cache.clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='testuser',
+            password='testpass123',
+        )
+        cls.other_user = get_user_model().objects.create_user(
+            username='otheruser',
+            password='testpass123',
+        )
+        cls.superuser = get_user_model().objects.create_superuser(
+            username='testsuperuser',
+            password='testpass123',
+        )
+        cls.tag = Tag.objects.create(tag='A-test-tag')
+        cls.published_post = Post.objects.create(title='A published post', author=cls.user, status='p')
+        cls.draft_post = Post.objects.create(title='A draft post', author=cls.user, status='d')
+        cls.other_draft_post = Post.objects.create(title='Other draft post', author=cls.other_user, status='d')
+        for post in [cls.published_post, cls.draft_post, cls.other_draft_post]:
+            post.tags.add(cls.tag)
+
+    # the generations are bumped on commit, so the data of the test case does not invalidate the other tests responses.
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def get_titles(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        posts = response.data['results'] if 'results' in response.data else response.data['posts']
+        return {post['title'] for post in posts}
+
+    def test_visible_to(self):
+        self.assertEqual(set(Post.objects.visible_to(AnonymousUser())), {self.published_post})
+        self.assertEqual(set(Post.objects.visible_to(self.user)), {self.published_post, self.draft_post})
+        self.assertEqual(set(Post.objects.visible_to(self.superuser)), set(Post.objects.all()))
+
+    def test_visible_to_is_a_single_predicate(self):
+        with CaptureQueriesContext(connection) as context:
+            list(Post.objects.visible_to(self.user))
+        self.assertEqual(len(context.captured_queries), 1)
+        sql = context.captured_queries[0]['sql']
+        self.assertEqual(sql.count('SELECT'), 1)
+        self.assertEqual(sql.count('WHERE'), 1)
+
+    def test_post_list(self):
+        self.assertEqual(self.get_titles(reverse('post-list')), {self.published_post.title})
+        self.client.force_login(self.user)
+        self.assertEqual(self.get_titles(reverse('post-list')), {self.published_post.title, self.draft_post.title})
+
+    def test_user_post_list(self):
+        path = reverse('user-post-list', kwargs={'slug': self.user.slug})
+        self.assertEqual(self.get_titles(path), {self.published_post.title})
+        self.client.force_login(self.user)
+        self.assertEqual(self.get_titles(path), {self.published_post.title, self.draft_post.title})
+
+    def test_tag_detail(self):
+        path = reverse('tag-detail', kwargs={'tag': self.tag.tag})
+        self.assertEqual(self.get_titles(path), {self.published_post.title})
+        self.client.force_login(self.other_user)
+        self.assertEqual(self.get_titles(path), {self.published_post.title, self.other_draft_post.title})
+
+
+class RequestMemoizationTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='testuser',
+            password='testpass123',
+        )
+        cls.post = Post.objects.create(title='A test post', author=cls.user)
+        cls.comment = Comment.objects.create(post=cls.post, author=cls.user, comment='A test comment')
+        cls.reply = Reply.objects.create(comment=cls.comment, author=cls.user, reply='A test reply')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def request(self, method, path, data=None):
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(path, data)
+        self.assertLess(response.status_code, 300)
+        return [query['sql'] for query in context.captured_queries]
+
+    @staticmethod
+    def get_fetches(queries, model):
+        table = model._meta.db_table
+        return [sql for sql in queries if sql.startswith(f'SELECT "{table}"."id"') and f'"{table}"."id" =' in sql]
+
+    def test_detail_fetches_the_object_once(self):
+        path = reverse('post-detail', kwargs={'pk': self.post.pk})
+        # the conditional GET validators, the post, its comments and its tags.
+        with self.assertNumQueries(4):
+            queries = self.request('get', path)
+        self.assertEqual(len(self.get_fetches(queries, Post)), 1)
+        queries = self.request('put', path, {'title': 'An updated post', 'description': 'Description'})
+        self.assertEqual(len(self.get_fetches(queries, Post)), 1)
+
+    def test_nested_create_fetches_the_parent_once(self):
+        # the addsign, the savepoint, the insert, the two counter updates, the descendants count update of the
+        # ancestors and the savepoint release.
+        with self.assertNumQueries(7):
+            queries = self.request('post', reverse('reply-adds-list', kwargs={'pk': self.reply.pk}),
+                                   {'reply': 'A test add'})
+        self.assertEqual(len(self.get_fetches(queries, Reply)), 1)
+        self.assertEqual(self.get_fetches(queries, Comment), [])
+        with self.assertNumQueries(5):
+            queries = self.request('post', reverse('comment-reply-list', kwargs={'pk': self.comment.pk}),
+                                   {'reply': 'Another test reply'})
+        self.assertEqual(len(self.get_fetches(queries, Comment)), 1)
+
+    def test_self_user_is_not_fetched(self):
+        for method, data in [('get', None), ('post', {'title': 'Another test post'})]:
+            queries = self.request(method, reverse('user-post-list', kwargs={'slug': self.user.slug}), data)
+            self.assertFalse(any(sql.startswith('SELECT "accounts_customuser"') for sql in queries))
+
+
+class ResponseCacheTests(APITestCase):
+
+    # so that the anonymous throttling history and the cached responses do not affect other tests.
+    def tearDown(self):
+        super().tearDown()
+        cache.clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='testuser',
+            password='testpass123',
+        )
+        cls.tag = Tag.objects.create(tag='A-test-tag')
+        cls.post = Post.objects.create(title='A test post', author=cls.user, status='p')
+        cls.other_post = Post.objects.create(title='Another test post', author=cls.user, status='p')
+        cls.comment = Comment.objects.create(post=cls.post, author=cls.user, comment='A test comment')
+
+    def setUp(self):
+        response_cache_stats.reset()
+
+    def assertCache(self, path, expected, **extra):
+        response = self.client.get(path, **extra)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Cache'], expected)
+        return response
+
+    def test_anonymous_responses_are_cached(self):
+        for path in [
+            reverse('post-list'), reverse('post-detail', kwargs={'pk': self.post.pk}),
+            reverse('tag-detail', kwargs={'tag': self.tag.tag}),
+            reverse('post-comment-list', kwargs={'pk': self.post.pk}),
+            reverse('post-tag-list', kwargs={'pk': self.post.pk}),
+        ]:
+            first_response = self.assertCache(path, 'MISS')
+            with self.assertNumQueries(0):
+                response = self.assertCache(path, 'HIT')
+            self.assertEqual(response.content, first_response.content)
+            self.assertEqual(response['Content-Type'], first_response['Content-Type'])
+        self.assertEqual(response_cache_stats.as_dict(), {'hits': 5, 'misses': 5})
+
+    @override_settings(ALLOWED_HOSTS=['a.example.com', 'b.example.com'])
+    def test_responses_are_cached_by_the_host(self):
+        path = reverse('post-detail', kwargs={'pk': self.post.pk})
+        self.assertCache(path, 'MISS', HTTP_HOST='a.example.com')
+        response = self.assertCache(path, 'MISS', HTTP_HOST='b.example.com')
+        self.assertIn(b'http://b.example.com/', response.content)
+        self.assertNotIn(b'a.example.com', response.content)
+        self.assertCache(path, 'HIT', HTTP_HOST='a.example.com')
+        self.assertCache(path, 'MISS', HTTP_HOST='a.example.com', **{'wsgi.url_scheme': 'https'})
+
+    def test_cache_key_parts(self):
+        path = reverse('post-list')
+        self.assertCache(path, 'MISS')
+        self.assertCache(path, 'MISS', data={'page_size': 1})
+        self.assertCache(path, 'MISS', HTTP_ACCEPT='application/json; version=1.0')
+        self.assertCache(path, 'HIT', HTTP_ACCEPT='application/json; version=1.0')
+        # the browsable API and the authenticated requests are not cached.
+        response = self.client.get(path, HTTP_ACCEPT='text/html')
+        self.assertNotIn('X-Cache', response)
+        self.client.force_authenticate(self.user)
+        self.assertNotIn('X-Cache', self.client.get(path))
+
+    def test_generations_are_bumped(self):
+        list_path = reverse('post-list')
+        detail_path = reverse('post-detail', kwargs={'pk': self.post.pk})
+        other_detail_path = reverse('post-detail', kwargs={'pk': self.other_post.pk})
+        comments_path = reverse('post-comment-list', kwargs={'pk': self.post.pk})
+        paths = [list_path, detail_path, other_detail_path, comments_path]
+        for path in paths:
+            self.assertCache(path, 'MISS')
+
+        # the generations are bumped when the changes are committed.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.title = 'An updated post'
+            self.post.save()
+        self.assertContains(self.assertCache(detail_path, 'MISS'), self.post.title)
+        self.assertContains(self.assertCache(list_path, 'MISS'), self.post.title)
+        self.assertCache(other_detail_path, 'HIT')
+        self.assertCache(comments_path, 'MISS')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Reply.objects.create(comment=self.comment, author=self.user, reply='A test reply')
+        self.assertCache(comments_path, 'MISS')
+        self.assertCache(list_path, 'HIT')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.tags.add(self.tag)
+        self.assertContains(self.assertCache(detail_path, 'MISS'), self.tag.tag)
+        self.assertCache(other_detail_path, 'HIT')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.username = 'renameduser'
+            self.user.save()
+        self.assertContains(self.assertCache(other_detail_path, 'MISS'), self.user.username)
+
+    def test_generations_are_not_bumped_before_the_commit(self):
+        path = reverse('post-detail', kwargs={'pk': self.post.pk})
+        self.assertCache(path, 'MISS')
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.post.title = 'An updated post'
+            self.post.save()
+            self.assertCache(path, 'HIT')
+        # the cached responses are served until the change is committed, and kept if it is rolled back.
+        self.assertCache(path, 'HIT')
+        for callback in callbacks:
+            callback()
+        self.assertContains(self.assertCache(path, 'MISS'), self.post.title)
+
+    def test_file_based_cache(self):
+        path = reverse('post-list')
+        with tempfile.TemporaryDirectory() as cache_dir:
+            file_based_cache = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': cache_dir}
+            with override_settings(CACHES={'default': file_based_cache}):
+                self.assertCache(path, 'MISS')
+                self.assertCache(path, 'HIT')
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.other_post.delete()
+                self.assertCache(path, 'MISS')
+
+
+class ConditionalGetTests(APITestCase):
+
+    # so that the anonymous throttling history and the cached responses do not affect other tests.
+    def tearDown(self):
+        super().tearDown()
+        cache.clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='testuser',
+            password='testpass123',
+        )
+        cls.tag = Tag.objects.create(tag='A-test-tag')
+        cls.post = Post.objects.create(title='A test post', author=cls.user, status='p')
+        cls.comment = Comment.objects.create(post=cls.post, author=cls.user, comment='A test comment')
+        cls.other_comment = Comment.objects.create(post=cls.post, author=cls.user, comment='Another test comment')
+        cls.reply = Reply.objects.create(comment=cls.comment, author=cls.user, reply='A test reply')
+        cls.other_user = get_user_model().objects.create_user(username='otheruser', password='testpass123')
+
+    def setUp(self):
+        # the authenticated responses are not cached.
+        self.client.force_authenticate(self.user)
+
+    def get_etag(self, path, **extra):
+        response = self.client.get(path, **extra)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        return response['ETag']
+
+    def assertNotModified(self, path, etag, num_queries=1):
+        # only the validators are computed, and the parent object of the lists is fetched.
+        with self.assertNumQueries(num_queries):
+            response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+    def test_detail_views(self):
+        for path in [
+            reverse('post-detail', kwargs={'pk': self.post.pk}),
+            reverse('comment-detail', kwargs={'pk': self.comment.pk}),
+            reverse('reply-detail', kwargs={'pk': self.reply.pk}),
+        ]:
+            self.assertNotModified(path, self.get_etag(path))
+
+    def test_list_views(self):
+        for path in [
+            reverse('post-comment-list', kwargs={'pk': self.post.pk}),
+            reverse('comment-reply-list', kwargs={'pk': self.comment.pk}),
+            reverse('reply-adds-list', kwargs={'pk': self.reply.pk}),
+        ]:
+            self.assertNotModified(path, self.get_etag(path), num_queries=2)
+
+    def test_if_modified_since(self):
+        path = reverse('post-detail', kwargs={'pk': self.post.pk})
+        response = self.client.get(path)
+        self.assertIn('Last-Modified', response)
+        response = self.client.get(path, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_validators_change(self):
+        path = reverse('post-detail', kwargs={'pk': self.post.pk})
+        comments_path = reverse('post-comment-list', kwargs={'pk': self.post.pk})
+        etags = {self.get_etag(path), self.get_etag(comments_path)}
+        self.post.tags.add(self.tag)
+        etags.add(self.get_etag(path))
+        Reply.objects.create(comment=self.comment, author=self.user, reply='Another test reply')
+        etags.add(self.get_etag(path))
+        etags.add(self.get_etag(comments_path))
+        self.other_comment.delete()
+        etags.add(self.get_etag(comments_path))
+        etags.add(self.get_etag(path, HTTP_ACCEPT='application/json; version=1.0'))
+        self.assertEqual(len(etags), 7)
+
+    def test_renames_change_the_validators(self):
+        path = reverse('post-detail', kwargs={'pk': self.post.pk})
+        self.post.tags.add(self.tag)
+        etag = self.get_etag(path)
+        # the tags and the usernames are in the representation, but they do not update the post.
+        Tag.objects.filter(pk=self.tag.pk).update(tag='A-renamed-tag')
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('A-renamed-tag', response.data['tags'])
+        etag = response['ETag']
+        get_user_model().objects.filter(pk=self.user.pk).update(username='renameduser')
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['author']['username'], 'renameduser')
+        self.assertNotModified(path, response['ETag'])
+
+    # the lists show the profile links of the authors by their slugs too, the nested authors are only named.
+    renames = ({'username': 'renameduser'}, {'slug': 'renamedslug'})
+
+    def assertRenamesChangeValidators(self, path, num_queries=1, renames=({'username': 'renameduser'}, )):
+        # the other user is the author of the shown objects, that are not updated by the renames.
+        for fields in renames:
+            etag = self.get_etag(path)
+            get_user_model().objects.filter(pk=self.other_user.pk).update(**fields)
+            response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(response['ETag'], etag)
+            self.assertIn(list(fields.values())[0].encode(), response.content)
+            self.assertNotModified(path, response['ETag'], num_queries=num_queries)
+
+    def test_renames_change_the_comment_detail_validators(self):
+        Reply.objects.create(comment=self.comment, author=self.other_user, reply='Another test reply')
+        self.assertRenamesChangeValidators(reverse('comment-detail', kwargs={'pk': self.comment.pk}))
+
+    def test_renames_change_the_post_comment_list_validators(self):
+        Comment.objects.create(post=self.post, author=self.other_user, comment='Another test comment')
+        self.assertRenamesChangeValidators(
+            reverse('post-comment-list', kwargs={'pk': self.post.pk}), num_queries=2, renames=self.renames
+        )
+
+    def test_renames_change_the_comment_reply_list_validators(self):
+        Reply.objects.create(comment=self.comment, author=self.other_user, reply='Another test reply')
+        self.assertRenamesChangeValidators(
+            reverse('comment-reply-list', kwargs={'pk': self.comment.pk}), num_queries=2, renames=self.renames
+        )
+
+    def test_renames_change_the_reply_detail_validators(self):
+        Reply.objects.create(comment=self.comment, author=self.other_user, addsign=self.reply, reply='An add')
+        self.assertRenamesChangeValidators(reverse('reply-detail', kwargs={'pk': self.reply.pk}))
+
+    def test_renames_change_the_reply_adds_list_validators(self):
+        Reply.objects.create(comment=self.comment, author=self.other_user, addsign=self.reply, reply='An add')
+        self.assertRenamesChangeValidators(
+            reverse('reply-adds-list', kwargs={'pk': self.reply.pk}), num_queries=2, renames=self.renames
+        )
+
+    def test_cached_response_validators(self):
+        self.client.force_authenticate(None)
+        path = reverse('post-detail', kwargs={'pk': self.post.pk})
+        etag = self.get_etag(path)
+        with self.assertNumQueries(0):
+            response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+
+class TagPostsTests(APITestCase):
+
+    # so that the anonymous throttling history and the cached responses do not affect other tests.
+    def tearDown(self):
+        super().tearDown()
+        cache.clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='testuser',
+            password='testpass123',
+        )
+        cls.tag = Tag.objects.create(tag='A-test-tag')
+        cls.other_tag = Tag.objects.create(tag='Another-test-tag')
+        cls.posts = [Post.objects.create(title=f'Test post{i}', author=cls.user, status='p') for i in range(3)]
+        cls.draft_post = Post.objects.create(title='A draft post', author=cls.user)
+
+    def assertPostsCount(self, tag, expected):
+        tag.refresh_from_db()
+        self.assertEqual(tag.posts_count, expected)
+
+    def test_posts_count_on_tags_change(self):
+        self.posts[0].tags.add(self.tag, self.other_tag)
+        self.draft_post.tags.add(self.tag)
+        self.assertPostsCount(self.tag, 1)
+        self.assertPostsCount(self.other_tag, 1)
+        # adding the existing relations again.
+        self.tag.posts.add(self.posts[0], self.posts[1], self.draft_post)
+        self.assertPostsCount(self.tag, 2)
+        # removing the not existing relations.
+        self.other_tag.posts.remove(self.posts[2], self.draft_post)
+        self.assertPostsCount(self.other_tag, 1)
+        self.posts[0].tags.remove(self.tag)
+        self.assertPostsCount(self.tag, 1)
+        self.posts[0].tags.clear()
+        self.assertPostsCount(self.other_tag, 0)
+        self.tag.posts.set([self.posts[2], self.draft_post])
+        self.assertPostsCount(self.tag, 1)
+        self.tag.posts.clear()
+        self.assertPostsCount(self.tag, 0)
+
+    def test_posts_count_on_status_change_and_delete(self):
+        self.tag.posts.add(self.posts[0], self.draft_post)
+        self.draft_post.status = 'p'
+        self.draft_post.save()
+        self.assertPostsCount(self.tag, 2)
+        self.draft_post.title = 'A published post'
+        self.draft_post.save()
+        self.assertPostsCount(self.tag, 2)
+        post = Post.objects.get(pk=self.posts[0].pk)
+        post.status = 'd'
+        post.save()
+        self.assertPostsCount(self.tag, 1)
+        self.draft_post.delete()
+        self.assertPostsCount(self.tag, 0)
+        self.posts[1].tags.add(self.tag)
+        self.user.delete()
+        self.assertPostsCount(self.tag, 0)
+
+    def test_reconcile_posts_count(self):
+        self.tag.posts.add(*self.posts)
+        Tag.objects.update(posts_count=10)
+        call_command('reconcile_counters', stdout=StringIO())
+        self.assertPostsCount(self.tag, 3)
+        self.assertPostsCount(self.other_tag, 0)
+
+    def test_tag_detail_is_bounded(self):
+        self.tag.posts.add(*self.posts, self.draft_post)
+        response = self.client.get(reverse('tag-detail', kwargs={'tag': self.tag.tag}), {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['posts_count'], 3)
+        self.assertEqual([post['title'] for post in response.data['posts']], ['Test post2', 'Test post1'])
+        self.assertTrue(response.data['posts_url'].endswith(reverse('tag-post-list', kwargs={'tag': self.tag.tag})))
+
+    def test_tag_post_list(self):
+        self.tag.posts.add(*self.posts, self.draft_post)
+        path = reverse('tag-post-list', kwargs={'tag': self.tag.tag})
+        response = self.client.get(path, {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual([post['title'] for post in response.data['results']], ['Test post2', 'Test post1'])
+        response = self.client.get(response.data['next'])
+        self.assertEqual([post['title'] for post in response.data['results']], ['Test post0'])
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(path).data['count'], 4)
+        response = self.client.get(reverse('tag-post-list', kwargs={'tag': 'not-found-tag'}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ExcerptTests(APITestCase):
+
+    # so that the anonymous throttling history and the cached responses do not affect other tests.
+    def tearDown(self):
+        super().tearDown()
+        cache.clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='testuser',
+            password='testpass123',
+        )
+        cls.description = 'one two three four five six seven eight nine ten eleven twelve'
+        cls.post = Post.objects.create(
+            title='A test post', author=cls.user, description=cls.description, status='p'
+        )
+
+    def test_formatted_text(self):
+        self.assertEqual(formatted_text('one two three', 5), 'one two three')
+        self.assertEqual(formatted_text('one two three', 2), 'one two  ...')
+        self.assertEqual(formatted_text('one two ', 2), 'one two ')
+        self.assertEqual(formatted_text('a-long-text-without-spaces', 1), 'a-long-text-without-spaces')
+        self.assertEqual(formatted_text('', 5), '')
+
+    def test_excerpts_are_stored_on_save(self):
+        self.assertEqual(self.post.short_description, formatted_text(self.description, 10))
+        comment = Comment.objects.create(post=self.post, author=self.user, comment=self.description)
+        self.assertEqual(comment.short_comment, formatted_text(self.description, 10))
+        reply = Reply.objects.create(comment=comment, author=self.user, reply='A short reply')
+        self.assertEqual(reply.short_reply, 'A short reply')
+
+    def test_update_fields_include_the_excerpts(self):
+        self.post.description = 'A new description'
+        self.post.save(update_fields=['description'])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.short_description, 'A new description')
+        # the excerpt of a deferred source is left as is.
+        post = Post.objects.defer('description').get(pk=self.post.pk)
+        post.title = 'A new title'
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.short_description, 'A new description')
+
+    def test_backfill_excerpts(self):
+        Post.objects.update(short_description='')
+        call_command('backfill_excerpts', '--batch-size', '1', stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.short_description, formatted_text(self.description, 10))
+
+    def test_post_list_does_not_load_the_descriptions(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('post-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['short_description'], formatted_text(self.description, 10))
+        post_table = Post._meta.db_table
+        self.assertFalse(any(
+            f'"{post_table}"."description"' in query['sql'] for query in context.captured_queries
+        ))
+
+
+@skipUnless(orjson, 'The orjson package is not installed.')
+class ORJSONRendererTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='testuser',
+            password='testpass123',
+        )
+        cls.post = Post.objects.create(title='A test post', author=cls.user, status='p')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_same_as_json_renderer(self):
+        data = {
+            'id': self.post.pk, 'created_at': self.post.created_at, 'lazy': gettext_lazy('A lazy string'),
+            'text': 'A line separator', 'number': Decimal('1.5'), 1: 'A number key',
+        }
+        rendered = ORJSONRenderer().render(data, 'application/json')
+        self.assertEqual(json.loads(rendered), json.loads(JSONRenderer().render(data, 'application/json')))
+        self.assertIn(b'\\u2028', rendered)
+        # the indented JSON is rendered by the JSONRenderer.
+        self.assertEqual(
+            ORJSONRenderer().render(data, 'application/json; indent=4'),
+            JSONRenderer().render(data, 'application/json; indent=4')
+        )
+
+    def test_versioned_media_type(self):
+        response = self.client.get(reverse('post-list'), HTTP_ACCEPT='application/json; version=1.0')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
+        self.assertEqual(response.renderer_context['request'].version, '1.0')
+        self.assertEqual(json.loads(response.content)['results'][0]['title'], self.post.title)
+
+    def test_parser(self):
+        response = self.client.post(
+            reverse('post-list'), data=json.dumps({'title': 'A new post'}), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.post(reverse('post-list'), data='{"title": ', content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@skipUnless(msgpack, 'The msgpack package is not installed.')
+class MessagePackRendererTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='testuser',
+            password='testpass123',
+        )
+        cls.post = Post.objects.create(title='A test post', author=cls.user, status='p')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_versioned_media_type(self):
+        response = self.client.get(reverse('post-list'), HTTP_ACCEPT='application/msgpack; version=1.0')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(response.renderer_context['request'].version, '1.0')
+        self.assertEqual(msgpack.unpackb(response.content)['results'][0]['title'], self.post.title)
+
+    def test_parser(self):
+        response = self.client.post(
+            reverse('post-list'), data=msgpack.packb({'title': 'A new post'}), content_type='application/msgpack'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.post(reverse('post-list'), data=b'\xc1', content_type='application/msgpack')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class CompiledReadTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='testuser',
+            password='testpass123',
+        )
+        cls.other_user = get_user_model().objects.create_user(
+            username='otheruser',
+            password='testpass123',
+        )
+        cls.tags = [Tag.objects.create(tag=tag) for tag in ['b-test-tag', 'c-test-tag', 'a-test-tag']]
+        cls.post = Post.objects.create(
+            title='A test post', author=cls.user, description='A test post description', status='p'
+        )
+        cls.post.tags.add(*cls.tags)
+        cls.other_post = Post.objects.create(title='Another test post', author=cls.other_user, status='p')
+        cls.other_post.tags.add(cls.tags[1])
+        cls.draft_post = Post.objects.create(title='A draft post', author=cls.user, thumbnail='posts/thumbnails/a.png')
+        cls.comment = Comment.objects.create(post=cls.post, author=cls.other_user, comment='A test comment')
+        cls.reply = Reply.objects.create(comment=cls.comment, author=cls.user, reply='A test reply')
+        Reply.objects.create(comment=cls.comment, author=cls.other_user, addsign=cls.reply, reply='A test add')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def assertSameAsSerializer(self, path, data=None):
+        response = self.client.get(path, data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with override_settings(POSTS_COMPILED_READ={'ENABLED': False}):
+            serializer_response = self.client.get(path, data)
+        self.assertEqual(response.content, serializer_response.content)
+        return response
+
+    def test_compiled_plans(self):
+        for serializer_class in [
+            serializers.PostListSerializer, serializers.PostCommentListSerializer,
+            serializers.CommentReplyListSerializer, UserPostListSerializer,
+        ]:
+            self.assertIsNotNone(get_compiled_plan(serializer_class))
+        # the method fields may read anything.
+        self.assertIsNone(get_compiled_plan(CustomUserDetailSerializer))
+
+    def test_post_list(self):
+        response = self.assertSameAsSerializer(reverse('post-list'))
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(response.data['results'][-1]['tags'], ['a-test-tag', 'b-test-tag', 'c-test-tag'])
+        self.assertSameAsSerializer(reverse('post-list'), {'search': 'test', 'ordering': 'author'})
+        self.assertSameAsSerializer(reverse('post-list'), {'status': 'd'})
+        response = self.assertSameAsSerializer(reverse('post-list'), {'cursor': '', 'page_size': 1})
+        self.assertSameAsSerializer(response.data['next'])
+        self.assertSameAsSerializer(reverse('tag-post-list', kwargs={'tag': self.tags[1].tag}))
+
+    def test_user_post_list(self):
+        self.assertSameAsSerializer(reverse('user-post-list', kwargs={'slug': self.user.slug}))
+        self.assertSameAsSerializer(reverse('user-post-list', kwargs={'slug': self.other_user.slug}))
+
+    def test_comment_and_reply_lists(self):
+        self.assertSameAsSerializer(reverse('post-comment-list', kwargs={'pk': self.post.pk}))
+        response = self.assertSameAsSerializer(reverse('comment-reply-list', kwargs={'pk': self.comment.pk}))
+        self.assertEqual([reply['addsign_detail'] is None for reply in response.data['results']], [False, True])
+
+    def test_writes_use_the_serializer(self):
+        response = self.client.post(reverse('post-list'), data={'title': 'A new post', 'tags': ['a-test-tag']})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['tags'], ['a-test-tag'])
+
+
+class URLTemplateTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='testuser',
+            password='testpass123',
+        )
+        cls.post = Post.objects.create(title='A test post', author=cls.user, status='p')
+
+    def test_same_as_reverse(self):
+        for script_prefix in ['/a prefix/', '/']:
+            # the script prefix of the deployments under a subpath, that is set per request.
+            set_script_prefix(script_prefix)
+            for url_pattern in posts_urls.urlpatterns + accounts_urls.urlpatterns:
+                converters = getattr(url_pattern.pattern, 'converters', {})
+                kwargs = {
+                    name: uuid.uuid4() if isinstance(converters.get(name), UUIDConverter) else 'a-test-slug'
+                    for name in converters or url_pattern.pattern.regex.groupindex
+                }
+                template = get_url_template(url_pattern.name, tuple(kwargs))
+                self.assertEqual(
+                    template.format(kwargs, quote(script_prefix, safe=URL_SAFE_CHARACTERS)),
+                    django_reverse(url_pattern.name, kwargs=kwargs)
+                )
+
+    def test_same_as_hyperlinked_identity_field(self):
+        # the `format` query parameter is kept by the DRF's reverse.
+        for query in [{}, {'format': 'json'}]:
+            request = Request(APIRequestFactory().get(reverse('post-list'), query))
+            for obj, field_kwargs in [
+                (self.post, {'view_name': 'post-detail'}),
+                (self.user, {'view_name': 'user-detail', 'lookup_field': 'slug'}),
+            ]:
+                field = HyperlinkedIdentityField(**field_kwargs)
+                template_field = TemplateHyperlinkedIdentityField(**field_kwargs)
+                for bound_field in [field, template_field]:
+                    bound_field.bind('url', Serializer(context={'request': request}))
+                self.assertEqual(template_field.to_representation(obj), field.to_representation(obj))
+        # unsaved objects have no url.
+        self.assertIsNone(template_field.to_representation(get_user_model()(slug='unsaved')))
+
+
+class BulkCreateTests(APITestCase):
+
+    # so that the throttling history and the cached responses do not affect other tests.
+    def tearDown(self):
+        super().tearDown()
+        cache.clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='testuser',
+            password='testpass123',
+        )
+        cls.tag = Tag.objects.create(tag='a-test-tag')
+        cls.other_tag = Tag.objects.create(tag='another-test-tag')
+        cls.post = Post.objects.create(title='A test post', author=cls.user, status='p')
+        cls.comment = Comment.objects.create(post=cls.post, author=cls.user, comment='A test comment')
+        cls.reply = Reply.objects.create(comment=cls.comment, author=cls.user, reply='A test reply')
+        cls.path = reverse('post-bulk-create')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def make_posts(self, count):
+        return [
+            {'title': f'Bulk post{i}', 'description': f'The bulk description{i}', 'tags': [self.tag.tag]}
+            for i in range(count)
+        ]
+
+    def count_queries(self, data):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(self.path, data=data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return len(context.captured_queries)
+
+    def test_bulk_create_posts(self):
+        data = self.make_posts(3)
+        data[0]['tags'] = [self.tag.tag, self.other_tag.tag, self.tag.tag]
+        response = self.client.post(self.path, data=data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([post['title'] for post in response.data], ['Bulk post0', 'Bulk post1', 'Bulk post2'])
+        self.assertEqual(response.data[0]['tags'], [self.tag.tag, self.other_tag.tag])
+        posts = Post.objects.filter(title__startswith='Bulk post')
+        self.assertEqual(posts.count(), 3)
+        self.assertTrue(all(post.author == self.user and post.status == 'd' for post in posts))
+        self.assertEqual(posts.get(title='Bulk post1').short_description, 'The bulk description1')
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.posts_count, 4)
+        # the bulk created posts are drafts, then their tags count them when they are published.
+        self.tag.refresh_from_db()
+        self.assertEqual(self.tag.posts_count, 0)
+        post = posts.get(title='Bulk post0')
+        post.status = 'p'
+        post.save()
+        self.tag.refresh_from_db()
+        self.assertEqual(self.tag.posts_count, 1)
+        # the bulk created posts are indexed.
+        response = self.client.get(reverse('post-list'), {'search': 'bulk description2'})
+        self.assertEqual([post['title'] for post in response.data['results']], ['Bulk post2'])
+
+    def test_queries_count_does_not_depend_on_items_count(self):
+        self.assertEqual(self.count_queries(self.make_posts(2)), self.count_queries(self.make_posts(10)))
+
+    def test_invalid_items_errors(self):
+        data = self.make_posts(3)
+        data[1]['tags'] = ['not-a-tag']
+        del data[2]['title']
+        response = self.client.post(self.path, data=data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('tags', response.data[1])
+        self.assertIn('title', response.data[2])
+        self.assertFalse(Post.objects.filter(title__startswith='Bulk post').exists())
+        for data in [[], {'title': 'Not a list'}]:
+            response = self.client.post(self.path, data=data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_max_items(self):
+        # the items over the user throttling rate can not be charged.
+        response = self.client.post(self.path, data=self.make_posts(51), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Post.objects.filter(title__startswith='Bulk post').exists())
+        # the rejected request is charged too.
+        cache.clear()
+        response = self.client.post(self.path, data=self.make_posts(50), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_bulk_create_comments_and_replies(self):
+        path = reverse('post-comment-bulk-create', kwargs={'pk': self.post.pk})
+        data = [{'comment': f'A bulk comment{i}'} for i in range(3)]
+        response = self.client.post(path, data=data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 4)
+        self.assertEqual(self.post.comments.filter(comment__startswith='A bulk comment').count(), 3)
+
+        path = reverse('comment-reply-bulk-create', kwargs={'pk': self.comment.pk})
+        addsign = reverse('reply-detail', kwargs={'pk': self.reply.pk})
+        data = [{'reply': 'A bulk reply'}, {'reply': 'A bulk addsign reply', 'addsign': addsign}]
+        response = self.client.post(path, data=data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.comment.refresh_from_db()
+        self.reply.refresh_from_db()
+        self.assertEqual(self.comment.replies_count, 3)
+        self.assertEqual(self.reply.adds_count, 1)
+        # the list views show the bulk created objects.
+        response = self.client.get(reverse('comment-reply-list', kwargs={'pk': self.comment.pk}))
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_addsigns_queries_count_does_not_depend_on_items_count(self):
+        self.path = reverse('comment-reply-bulk-create', kwargs={'pk': self.comment.pk})
+        addsigns = [
+            reverse('reply-detail', kwargs={'pk': Reply.objects.create(comment=self.comment, author=self.user).pk})
+            for i in range(10)
+        ]
+        self.assertEqual(
+            self.count_queries([{'reply': 'A bulk reply', 'addsign': addsign} for addsign in addsigns[:2]]),
+            self.count_queries([{'reply': 'A bulk reply', 'addsign': addsign} for addsign in addsigns]),
+        )
+        data = [{'reply': 'A bulk reply', 'addsign': addsign} for addsign in [*addsigns[:2], 'not-a-url']]
+        data[1]['addsign'] = reverse('reply-detail', kwargs={'pk': uuid.uuid4()})
+        response = self.client.post(self.path, data=data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('addsign', response.data[1])
+        self.assertIn('addsign', response.data[2])
+
+    def test_bulk_create_is_only_for_authenticated_posts(self):
+        self.assertEqual(self.client.get(self.path).status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+        self.client.logout()
+        response = self.client.post(self.path, data=self.make_posts(1), format='json')
+        self.assertIn(response.status_code, [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN])
+
+    def test_throttle_cost_is_the_items_count(self):
+        response = self.client.post(self.path, data=self.make_posts(40), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.post(self.path, data=self.make_posts(20), format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        response = self.client.post(self.path, data=self.make_posts(10), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+
+class ContentTransferTests(APITestCase):
+
+    # so that the anonymous throttling history and the cached responses do not affect other tests.
+    def tearDown(self):
+        super().tearDown()
+        cache.clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='testuser',
+            password='testpass123',
+        )
+        cls.other_user = get_user_model().objects.create_user(
+            username='otheruser',
+            password='testpass123',
+        )
+        cls.tags = [Tag.objects.create(tag=f'test-tag{i}') for i in range(2)]
+        cls.post = Post.objects.create(title='A transferred post', description='Its description', author=cls.user,
+                                       status='p')
+        cls.post.tags.add(*cls.tags)
+        Post.objects.create(title='A transferred draft', author=cls.other_user)
+        comment = Comment.objects.create(post=cls.post, author=cls.other_user, comment='A test comment')
+        reply = Reply.objects.create(comment=comment, author=cls.user, reply='A test reply')
+        add = Reply.objects.create(comment=comment, author=cls.other_user, addsign=reply, reply='An add')
+        Reply.objects.create(comment=comment, author=cls.user, addsign=add, reply='An add of the add')
+
+    def get_snapshot(self):
+        snapshot = {}
+        for model in [get_user_model(), Tag, Post, Comment, Reply]:
+            attnames = [field.attname for field in model._meta.concrete_fields]
+            snapshot[model] = sorted(model.objects.values_list(*attnames), key=str)
+        snapshot['tags'] = sorted(Post.tags.through.objects.values_list('post_id', 'tag_id'), key=str)
+        return snapshot
+
+    def export(self, **options):
+        output = StringIO()
+        call_command('export_content', stdout=output, stderr=StringIO(), **options)
+        return output.getvalue().splitlines()
+
+    def import_lines(self, lines, **options):
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', encoding='utf-8') as input_file:
+            input_file.write('\n'.join(lines) + '\n')
+            input_file.flush()
+            output = StringIO()
+            call_command('import_content', input_file.name, stdout=output, **options)
+        return output.getvalue()
+
+    def delete_content(self):
+        get_user_model().objects.all().delete()
+        Tag.objects.all().delete()
+
+    def test_export_and_import_round_trip(self):
+        snapshot = self.get_snapshot()
+        lines = self.export()
+        self.assertEqual(len(lines), 2 + 2 + 2 + 1 + 3)
+        self.assertEqual(lines, self.export(chunk_size=1))
+        self.delete_content()
+        report = self.import_lines(lines, batch_size=2)
+        self.assertIn('posts.reply: 3 object(s)', report)
+        self.assertEqual(self.get_snapshot(), snapshot)
+        # the imported posts are searchable.
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('post-list'), {'search': 'transferred'})
+        self.assertEqual([post['title'] for post in response.data['results']], [self.post.title])
+
+    def test_adds_before_their_addsigns(self):
+        snapshot = self.get_snapshot()
+        lines = self.export()
+        self.delete_content()
+        # the replies of the dependency chain in the reverse order.
+        self.import_lines(lines[:-3] + lines[-3:][::-1], batch_size=1)
+        self.assertEqual(self.get_snapshot(), snapshot)
+
+    def test_invalid_records_import_nothing(self):
+        lines = self.export()
+        self.delete_content()
+        for invalid_lines in [
+            lines + ['{"model": "auth.group", "fields": {}}'],
+            lines + ['not a record'],
+            # the posts before their authors.
+            lines[2:6] + lines[:2] + lines[6:],
+        ]:
+            with self.assertRaises(CommandError):
+                self.import_lines(invalid_lines)
+            self.assertFalse(get_user_model().objects.exists())
+            self.assertFalse(Post.objects.exists())
+        self.import_lines(lines)
+        # importing the existing objects again.
+        with self.assertRaises(CommandError):
+            self.import_lines(lines)
+        self.assertEqual(Post.objects.count(), 2)
+
+
+class ThreadTests(APITestCase):
+
+    # so that the anonymous throttling history does not affect other tests.
+    def tearDown(self):
+        super().tearDown()
+        cache.clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='testuser',
+            password='testpass123',
+        )
+        post = Post.objects.create(title='A test post', author=cls.user, status='p')
+        cls.comment = Comment.objects.create(post=post, author=cls.user, comment='A test comment')
+        cls.root = cls.create_reply('root')
+        cls.chain = [cls.root]
+        for i in range(3):
+            cls.chain.append(cls.create_reply(f'chain{i}', cls.chain[-1]))
+        cls.sibling = cls.create_reply('sibling', cls.root)
+        cls.other_root = cls.create_reply('other root')
+        cls.path = reverse('comment-thread', kwargs={'pk': cls.comment.pk})
+
+    @classmethod
+    def create_reply(cls, text, addsign=None):
+        return Reply.objects.create(comment=cls.comment, author=cls.user, addsign=addsign, reply=text)
+
+    def get_tree(self, path, data=None):
+        response = self.client.get(path, data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        def get_node_tree(node):
+            return node['reply'], [get_node_tree(add) for add in node['adds']]
+        return [get_node_tree(node) for node in response.data['results']]
+
+    def count_queries(self, path, data=None):
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(path, data)
+        return len(context.captured_queries)
+
+    def test_comment_thread(self):
+        chain_tree = ('chain2', [])
+        for text in ['chain1', 'chain0']:
+            chain_tree = (text, [chain_tree])
+        self.assertEqual(self.get_tree(self.path), [('root', [chain_tree, ('sibling', [])]), ('other root', [])])
+        response = self.client.get(self.path)
+        root = response.data['results'][0]
+        self.assertEqual(root['adds_count'], 2)
+        thread_path = reverse('reply-thread', kwargs={'pk': self.root.pk}, request=response.wsgi_request)
+        self.assertEqual(root['thread'], thread_path)
+
+    def test_reply_thread(self):
+        path = reverse('reply-thread', kwargs={'pk': self.chain[1].pk})
+        self.assertEqual(self.get_tree(path), [('chain1', [('chain2', [])])])
+
+    def test_depth_limit(self):
+        self.assertEqual(self.get_tree(self.path, {'depth': 1}), [
+            ('root', [('chain0', []), ('sibling', [])]), ('other root', []),
+        ])
+        self.assertEqual(self.get_tree(self.path, {'depth': 0}), [('root', []), ('other root', [])])
+        with override_settings(POSTS_THREAD={'MAX_DEPTH': 2}):
+            self.assertEqual(self.get_tree(self.path, {'depth': 10}), self.get_tree(self.path, {'depth': 2}))
+        self.assertEqual(self.client.get(self.path, {'depth': 'deep'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_roots_pagination(self):
+        response = self.client.get(self.path, {'page_size': 1})
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(len(response.data['results'][0]['adds']), 2)
+        response = self.client.get(response.data['next'])
+        self.assertEqual([root['reply'] for root in response.data['results']], ['other root'])
+
+    def test_queries_count_does_not_depend_on_the_tree(self):
+        queries_count = self.count_queries(self.path)
+        for i in range(5):
+            self.create_reply(f'another chain{i}', self.chain[-1])
+            self.create_reply(f'another sibling{i}', self.sibling)
+            self.chain.append(self.create_reply(f'deeper{i}', self.chain[-1]))
+        self.assertEqual(self.count_queries(self.path), queries_count)
+
+
+class ReplyTreeTests(APITestCase):
+
+    # so that the throttling history and the cached responses do not affect other tests.
+    def tearDown(self):
+        super().tearDown()
+        cache.clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='testuser',
+            password='testpass123',
+        )
+        cls.other_user = get_user_model().objects.create_user(
+            username='otheruser',
+            password='testpass123',
+        )
+        post = Post.objects.create(title='A test post', author=cls.user, status='p')
+        cls.comment = Comment.objects.create(post=post, author=cls.user, comment='A test comment')
+        cls.root = cls.create_reply('root')
+        cls.chain = [cls.root]
+        for i, author in enumerate([cls.other_user, cls.user, cls.other_user]):
+            cls.chain.append(cls.create_reply(f'chain{i}', cls.chain[-1], author))
+        cls.sibling = cls.create_reply('sibling', cls.root)
+
+    @classmethod
+    def create_reply(cls, text, addsign=None, author=None):
+        return Reply.objects.create(comment=cls.comment, author=author or cls.user, addsign=addsign, reply=text)
+
+    def get_tree(self):
+        return {
+            reply: (path, depth, descendants_count) for reply, path, depth, descendants_count
+            in Reply.objects.values_list('reply', 'path', 'depth', 'descendants_count')
+        }
+
+    def get_path(self, *replies):
+        return ''.join(reply.pk.hex + '/' for reply in replies)
+
+    def test_paths_and_counts_on_create(self):
+        tree = self.get_tree()
+        self.assertEqual(tree['root'], (self.get_path(self.root), 0, 4))
+        self.assertEqual(tree['chain0'], (self.get_path(*self.chain[:2]), 1, 2))
+        self.assertEqual(tree['chain2'], (self.get_path(*self.chain), 3, 0))
+        self.assertEqual(tree['sibling'], (self.get_path(self.root, self.sibling), 1, 0))
+        self.assertEqual(self.chain[-1].get_ancestor_pks(), [reply.pk for reply in self.chain[:-1]])
+
+    def test_delete_reroots_the_adds(self):
+        self.chain[1].delete()
+        tree = self.get_tree()
+        self.assertEqual(tree['root'], (self.get_path(self.root), 0, 1))
+        self.assertEqual(tree['chain1'], (self.get_path(self.chain[2]), 0, 1))
+        self.assertEqual(tree['chain2'], (self.get_path(*self.chain[2:]), 1, 0))
+
+    def test_cascade_delete_of_the_ancestors(self):
+        # the replies of the other user in the chain are deleted, with their adds that are not.
+        self.other_user.delete()
+        tree = self.get_tree()
+        self.assertEqual(tree['root'], (self.get_path(self.root), 0, 1))
+        self.assertEqual(tree['chain1'], (self.get_path(self.chain[2]), 0, 0))
+
+    def test_bulk_create_paths_and_counts(self):
+        self.client.force_login(self.user)
+        addsign = reverse('reply-detail', kwargs={'pk': self.chain[1].pk})
+        data = [{'reply': 'A bulk add', 'addsign': addsign}, {'reply': 'A bulk root'}]
+        response = self.client.post(reverse('comment-reply-bulk-create', kwargs={'pk': self.comment.pk}),
+                                    data=data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        tree = self.get_tree()
+        add = Reply.objects.get(reply='A bulk add')
+        self.assertEqual(tree['A bulk add'], (self.get_path(*self.chain[:2], add), 2, 0))
+        self.assertEqual(tree['root'][2], 5)
+        self.assertEqual(tree['chain0'][2], 3)
+        self.assertEqual(tree['A bulk root'][1:], (0, 0))
+
+    def test_rebuild_reply_tree_command(self):
+        tree = self.get_tree()
+        Reply.objects.update(path='', depth=0, descendants_count=0)
+        call_command('rebuild_reply_tree', batch_size=2, stdout=StringIO())
+        self.assertEqual(self.get_tree(), tree)
+
+    def test_serializers_read_the_tree(self):
+        path = reverse('reply-detail', kwargs={'pk': self.chain[-1].pk})
+        response = self.client.get(path)
+        self.assertEqual(response.data['depth'], 3)
+        self.assertEqual(response.data['ancestors'], [
+            reverse('reply-detail', kwargs={'pk': reply.pk}, request=response.wsgi_request)
+            for reply in self.chain[:-1]
+        ])
+        with CaptureQueriesContext(connection) as root_context:
+            response = self.client.get(reverse('reply-detail', kwargs={'pk': self.root.pk}))
+        self.assertEqual(response.data['descendants_count'], 4)
+        self.assertEqual(response.data['ancestors'], [])
+        # the ancestors and the descendants count do not query.
+        with CaptureQueriesContext(connection) as deep_context:
+            self.client.get(path)
+        self.assertEqual(len(deep_context.captured_queries), len(root_context.captured_queries))
+        response = self.client.get(reverse('comment-reply-list', kwargs={'pk': self.comment.pk}))
+        counts = {reply['reply']: reply['descendants_count'] for reply in response.data['results']}
+        self.assertEqual(counts['root'], 4)
+        self.assertEqual(counts['chain1'], 1)
+
+
+class AsyncReadTests(APITestCase):
+
+    # so that the throttling history and the cached responses do not affect other tests.
+    def tearDown(self):
+        super().tearDown()
+        cache.clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='testuser',
+            password='testpass123',
+        )
+        cls.tag = Tag.objects.create(tag='test-tag')
+        cls.post = Post.objects.create(title='A test post', author=cls.user, status='p')
+        cls.post.tags.add(cls.tag)
+        Comment.objects.create(post=cls.post, author=cls.user, comment='A test comment')
+        cls.factory = APIRequestFactory(SERVER_NAME='localhost')
+
+    def get_read_views(self):
+        return [
+            (PostListCreateView, reverse('post-list'), {}),
+            (PostDetailUpdateDeleteView, reverse('post-detail', kwargs={'pk': self.post.pk}), {'pk': self.post.pk}),
+            (PostCommentListView, reverse('post-comment-list', kwargs={'pk': self.post.pk}), {'pk': self.post.pk}),
+            (TagDetailView, reverse('tag-detail', kwargs={'tag': self.tag.tag}), {'tag': self.tag.tag}),
+        ]
+
+    def test_disabled_async_reads(self):
+        for view_class, _, _ in self.get_read_views():
+            self.assertFalse(asyncio.iscoroutinefunction(view_class.as_view()))
+
+    def test_async_reads(self):
+        for view_class, path, kwargs in self.get_read_views():
+            sync_response = view_class.as_view()(self.factory.get(path), **kwargs).render()
+            cache.clear()
+            with override_settings(POSTS_ASYNC_READ={'ENABLED': True, 'MAX_CONCURRENCY': 2}):
+                view = view_class.as_view()
+            self.assertTrue(asyncio.iscoroutinefunction(view))
+            response = async_to_sync(view)(self.factory.get(path), **kwargs).render()
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.content, sync_response.content)
+
+    @override_settings(POSTS_ASYNC_READ={'ENABLED': True})
+    def test_async_write(self):
+        request = self.factory.post(reverse('post-list'), {'title': 'An async post', 'status': 'p'}, format='json')
+        force_authenticate(request, self.user)
+        response = async_to_sync(PostListCreateView.as_view())(request).render()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Post.objects.filter(title='An async post', author=self.user).exists())
+
+
+class LoadTestTests(APITestCase):
+
+    def test_seed_content(self):
+        counts = seed_content(SeedVolumes(
+            users=3, tags=2, posts=10, tags_per_post=2, comments_per_post=2, reply_chains_per_comment=1, reply_depth=3
+        ))
+        # a post of every 10 is a draft, that is not commented.
+        self.assertEqual(counts, {'users': 3, 'tags': 2, 'posts': 10, 'comments': 18, 'replies': 54})
+        self.assertEqual(Post.objects.published().count(), 9)
+        self.assertEqual(set(Post.objects.published().values_list('comments_count', flat=True)), {2})
+        self.assertEqual(set(Tag.objects.values_list('posts_count', flat=True)), {9})
+        leaf = Reply.objects.get(comment=Comment.objects.first(), depth=2)
+        chain = [leaf.addsign.addsign, leaf.addsign, leaf]
+        self.assertEqual(leaf.get_ancestor_pks(), [reply.pk for reply in chain[:2]])
+        self.assertEqual([reply.descendants_count for reply in chain], [2, 1, 0])
+        self.assertEqual([reply.adds_count for reply in chain], [1, 1, 0])
+
+    def test_summarize_and_compare(self):
+        records = [('post-list', duration, 200) for duration in range(1, 101)] + [('post-create', 50, 400)]
+        results = summarize(records, 2, {'post-list': [4] * 100, 'post-create': [3]})
+        self.assertEqual(results['endpoints']['post-list']['requests'], 100)
+        self.assertEqual(results['endpoints']['post-list']['requests_per_second'], 50)
+        self.assertEqual(results['endpoints']['post-list']['p95_ms'], 95.05)
+        self.assertEqual(results['endpoints']['post-list']['mean_queries'], 4)
+        self.assertEqual(results['endpoints']['post-create']['errors'], 1)
+        self.assertEqual(results['total']['requests'], 101)
+        faster_records = [('post-list', duration / 2, 200) for duration in range(1, 101)]
+        lines = list(compare_results(results, summarize(faster_records, 1, {})))
+        self.assertEqual(lines[0], 'post-list: requests/s +100.0%, p95 -50.0%, p99 -50.0%')
+
+
+class QueryBudgetTestMixin:
+    """
+        Checks that the queries of the `budget_routes` are in the budgets of their url names on the seeded data of
+        each volumes, so an N+1 query fails the tests. the routes are `(url name, url kwargs)` pairs, the kwargs
+        values are the attribute paths of their seeded objects, like `'post.pk'`.
+    """
+    budget_routes = ()
+    volumes = [
+        SeedVolumes(users=3, tags=2, posts=5, tags_per_post=1, comments_per_post=2, reply_chains_per_comment=1,
+                    reply_depth=2),
+        SeedVolumes(users=10, tags=5, posts=40, tags_per_post=3, comments_per_post=6, reply_chains_per_comment=2,
+                    reply_depth=6),
+    ]
+
+    def get_seeded_objects(self, user):
+        post = Post.objects.published().filter(comments__isnull=False).first()
+        comment = post.comments.first()
+        return SimpleNamespace(
+            user=user, post=post, comment=comment, reply=comment.replies.filter(depth=0).first(), tag=post.tags.first()
+        )
+
+    def test_query_budgets(self):
+        if not self.budget_routes:
+            self.skipTest('no budget routes.')
+        budgets = get_query_budgets()
+        for volumes in self.volumes:
+            with transaction.atomic():
+                seed_content(volumes)
+                user = get_user_model().objects.get(username='loaduser0')
+                user.is_staff = True
+                user.save()
+                self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=user).key}')
+                objects = self.get_seeded_objects(user)
+                for url_name, kwargs_paths in self.budget_routes:
+                    kwargs = {name: attrgetter(path)(objects) for name, path in kwargs_paths.items()}
+                    with self.subTest(posts=volumes.posts, url_name=url_name):
+                        # the response is not served by the cache.
+                        cache.clear()
+                        with CaptureQueriesContext(connection) as context:
+                            response = self.client.get(reverse(url_name, kwargs=kwargs))
+                        self.assertEqual(response.status_code, status.HTTP_200_OK)
+                        queries = '\n'.join(query['sql'] for query in context.captured_queries)
+                        self.assertLessEqual(len(context), budgets[url_name], f'{url_name} queries:\n{queries}')
+                transaction.set_rollback(True)
+
+
+class QueryBudgetTests(QueryBudgetTestMixin, APITestCase):
+
+    # so that the throttling history does not affect other tests.
+    def tearDown(self):
+        super().tearDown()
+        cache.clear()
+
+    budget_routes = (
+        ('post-list', {}),
+        ('post-detail', {'pk': 'post.pk'}),
+        ('tag-detail', {'tag': 'tag.tag'}),
+        ('tag-post-list', {'tag': 'tag.tag'}),
+        ('post-comment-list', {'pk': 'post.pk'}),
+        ('post-tag-list', {'pk': 'post.pk'}),
+        ('comment-detail', {'pk': 'comment.pk'}),
+        ('comment-reply-list', {'pk': 'comment.pk'}),
+        ('comment-thread', {'pk': 'comment.pk'}),
+        ('reply-detail', {'pk': 'reply.pk'}),
+        ('reply-adds-list', {'pk': 'reply.pk'}),
+        ('reply-thread', {'pk': 'reply.pk'}),
+    )
+
+
+class ServerTimingTests(APITestCase):
+
+    # so that the throttling history and the cached responses do not affect other tests.
+    def tearDown(self):
+        super().tearDown()
+        cache.clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='testuser',
+            password='testpass123',
+        )
+        Post.objects.create(title='A test post', author=cls.user, status='p')
+
+    def test_disabled_server_timing(self):
+        response = self.client.get(reverse('post-list'))
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(POSTS_SERVER_TIMING={'ENABLED': True})
+    def test_server_timing(self):
+        with self.assertLogs('posts.middleware', 'INFO') as logs, CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('post-list'))
+        metrics = [metric.split(';')[0] for metric in response['Server-Timing'].split(', ')]
+        self.assertEqual(metrics, ['db', 'serialize', 'render', 'total'])
+        self.assertIn(f'desc="{len(context)} queries"', response['Server-Timing'])
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(logs.records[0].levelname, 'INFO')
+        self.assertEqual(record['url_name'], 'post-list')
+        self.assertEqual(record['queries'], len(context))
+        self.assertEqual(record['query_budget'], get_query_budgets()['post-list'])
+        self.assertGreater(record['total_ms'], 0)
+
+    @override_settings(POSTS_SERVER_TIMING={'ENABLED': True, 'HEADER': False}, POSTS_QUERY_BUDGETS={'post-list': 0})
+    def test_over_budget_warning(self):
+        with self.assertLogs('posts.middleware', 'INFO') as logs:
+            response = self.client.get(reverse('post-list'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(logs.records[0].levelname, 'WARNING')
+        self.assertEqual(json.loads(logs.records[0].getMessage())['query_budget'], 0)
+
+    @override_settings(DEBUG=True)
+    def test_asgi_middlewares_not_adapted(self):
+        # the adapted middlewares are logged in debug mode.
+        with self.assertNoLogs('django.request', 'DEBUG'):
+            ASGIHandler()
+
+    @override_settings(POSTS_SERVER_TIMING={'ENABLED': True})
+    async def test_async_server_timing(self):
+        with self.assertLogs('posts.middleware', 'INFO') as logs:
+            response = await self.async_client.get(reverse('post-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Server-Timing', response)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['url_name'], 'post-list')
+        self.assertGreater(record['queries'], 0)
+
+
+class ProfilingTests(APITestCase):
+
+    # so that the throttling history and the cached responses do not affect other tests.
+    def tearDown(self):
+        super().tearDown()
+        cache.clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='testuser',
+            password='testpass123',
+        )
+        cls.post = Post.objects.create(title='A test post', author=cls.user, status='p')
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def profiling_settings(self, **kwargs):
+        return override_settings(POSTS_PROFILING={'ENABLED': True, 'DIRECTORY': self.directory, **kwargs})
+
+    def test_sampled_profiles(self):
+        with self.profiling_settings(SAMPLE_RATE=1):
+            path = reverse('post-detail', kwargs={'pk': self.post.pk})
+            self.client.get(path, HTTP_ACCEPT='application/json; version=1.0')
+        profile = list_profiles(self.directory)[0]
+        self.assertEqual((profile.url_name, profile.method, profile.version), ('post-detail', 'GET', '1.0'))
+        with self.profiling_settings(SAMPLE_RATE=0):
+            self.client.get(reverse('post-list'))
+        self.assertEqual(len(list_profiles(self.directory)), 1)
+
+    def test_threshold_profiles(self):
+        with self.profiling_settings(SAMPLE_RATE=0, THRESHOLD_MS=60000):
+            self.client.get(reverse('post-list'))
+        self.assertEqual(list_profiles(self.directory), [])
+        with self.profiling_settings(SAMPLE_RATE=0, THRESHOLD_MS=0):
+            self.client.get(reverse('post-list'))
+        self.assertEqual([profile.url_name for profile in list_profiles(self.directory)], ['post-list'])
+
+    def test_rotation_and_aggregation(self):
+        with self.profiling_settings(SAMPLE_RATE=1, MAX_FILES=2):
+            for _ in range(3):
+                self.client.get(reverse('post-list'))
+            self.client.post(reverse('post-list'), {'title': 'A new post'})
+        profiles = list_profiles(self.directory)
+        self.assertEqual([profile.method for profile in profiles], ['GET', 'POST'])
+        output = StringIO()
+        call_command('aggregate_profiles', directory=self.directory, method='get', top=5, stdout=output)
+        lines = output.getvalue().splitlines()
+        self.assertIn('1 profile(s)', lines[0])
+        self.assertEqual(len(lines), 6)
+        with self.assertRaises(CommandError):
+            call_command('aggregate_profiles', directory=self.directory, url_name='post-detail', stdout=output)
+
+
+class MetricsTests(APITestCase):
+
+    # so that the throttling history and the cached responses do not affect other tests.
+    def tearDown(self):
+        super().tearDown()
+        cache.clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='testuser',
+            password='testpass123',
+        )
+        cls.admin = get_user_model().objects.create_superuser(
+            username='testadmin',
+            password='testpass123',
+        )
+        Post.objects.create(title='A test post', author=cls.user, status='p')
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        metrics_settings = override_settings(POSTS_METRICS={'ENABLED': True, 'DIRECTORY': self.directory})
+        metrics_settings.enable()
+        self.addCleanup(metrics_settings.disable)
+
+    def get_metrics(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(reverse('metrics'), HTTP_ACCEPT='text/plain; version=0.0.4')
+        self.client.force_authenticate(None)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/plain; charset=utf-8')
+        return response.content.decode().splitlines()
+
+    def test_request_metrics(self):
+        for _ in range(2):
+            self.client.get(reverse('post-list'))
+        lines = self.get_metrics()
+        self.assertIn('blogapi_http_requests_total{url_name="post-list"} 2', lines)
+        self.assertIn('blogapi_http_request_duration_seconds_bucket{url_name="post-list",le="+Inf"} 2', lines)
+        self.assertIn('blogapi_http_request_duration_seconds_count{url_name="post-list"} 2', lines)
+        self.assertIn('blogapi_response_cache_lookups_total{url_name="post-list",result="miss"} 1', lines)
+        self.assertIn('blogapi_response_cache_lookups_total{url_name="post-list",result="hit"} 1', lines)
+        queries_line = next(line for line in lines if line.startswith('blogapi_db_queries_total{url_name="post-list"}'))
+        self.assertGreater(int(queries_line.split()[-1]), 0)
+        size_line = next(line for line in lines if line.startswith('blogapi_http_response_size_bytes_sum'))
+        self.assertGreater(int(size_line.split()[-1]), 0)
+
+    def test_throttle_rejections(self):
+        with mock.patch.object(CustomAnonRateThrottle, 'rate', '1/min', create=True):
+            responses = [self.client.get(reverse('post-list')) for _ in range(2)]
+        self.assertEqual(responses[1].status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('blogapi_throttled_requests_total{url_name="post-list",scope="anon"} 1', self.get_metrics())
+
+    def test_aggregated_processes(self):
+        self.client.get(reverse('post-list'))
+        # the metrics file of another worker process.
+        MetricsFile(f'{self.directory}/metrics-1.db', 16).add((ROUTE, 'post-list'), [(REQUESTS, 3), (QUERIES, 6)])
+        self.assertIn('blogapi_http_requests_total{url_name="post-list"} 4', self.get_metrics())
+
+    def test_admin_only(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_403_FORBIDDEN)
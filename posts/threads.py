@@ -0,0 +1,91 @@
+from django.conf import settings
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from .models import Reply
+
+
+def get_thread_settings():
+    thread_settings = {'DEFAULT_DEPTH': 5, 'MAX_DEPTH': 20}
+    thread_settings.update(getattr(settings, 'POSTS_THREAD', {}))
+    return thread_settings
+
+
+def get_descendants_sql(root_pks, depth):
+    """
+        Returns the recursive query of the pks of the adds under the `root_pks`, down to `depth` levels, and its
+        params. the standard `WITH RECURSIVE` works on both the PostgreSQL and the SQLite.
+    """
+    quote_name = connection.ops.quote_name
+    table = quote_name(Reply._meta.db_table)
+    pk_column = quote_name(Reply._meta.pk.column)
+    addsign_column = quote_name(Reply._meta.get_field('addsign').column)
+    pk_placeholders = ', '.join(['%s'] * len(root_pks))
+    sql = (
+        f'WITH RECURSIVE thread (id, depth) AS ('
+        f'SELECT reply.{pk_column}, 1 FROM {table} reply WHERE reply.{addsign_column} IN ({pk_placeholders}) '
+        f'UNION ALL '
+        f'SELECT reply.{pk_column}, thread.depth + 1 FROM {table} reply '
+        f'INNER JOIN thread ON reply.{addsign_column} = thread.id WHERE thread.depth < %s'
+        f') SELECT id FROM thread'
+    )
+    # the depth limit also ends the recursion of a corrupted cycle of the addsigns.
+    params = [Reply._meta.pk.get_db_prep_value(pk, connection) for pk in root_pks] + [depth]
+    return sql, params
+
+
+def get_descendants_queryset(root_pks, depth, queryset=None):
+    queryset = Reply.objects.all() if queryset is None else queryset
+    if not root_pks or depth < 1:
+        return queryset.none()
+    return queryset.filter(pk__in=RawSQL(*get_descendants_sql(root_pks, depth))).order_by('replied_at', 'id')
+
+
+def assemble_thread(roots, descendants, data_by_pk):
+    """
+        Nests the representations of the `data_by_pk` as the `adds` of their addsigns and returns the roots ones,
+        the descendants are in their replied order so the adds are too.
+    """
+    adds_by_addsign = {obj.pk: [] for obj in [*roots, *descendants]}
+    for obj in descendants:
+        adds_by_addsign[obj.addsign_id].append(data_by_pk[obj.pk])
+    for pk, adds in adds_by_addsign.items():
+        data_by_pk[pk]['adds'] = adds
+    return [data_by_pk[obj.pk] for obj in roots]
+
+
+class ThreadMixin:
+    """
+        Lists the roots of the view queryset with their adds trees down to the `depth` query parameter levels. the
+        adds of all the roots of the page are fetched by one recursive query, instead of a request for each level.
+    """
+    depth_query_param = 'depth'
+
+    def get_depth(self):
+        thread_settings = get_thread_settings()
+        depth = self.request.query_params.get(self.depth_query_param, thread_settings['DEFAULT_DEPTH'])
+        try:
+            depth = int(depth)
+        except (TypeError, ValueError):
+            raise ValidationError({self.depth_query_param: 'A valid integer is required.'})
+        return max(0, min(depth, thread_settings['MAX_DEPTH']))
+
+    def get_descendants(self, roots, depth):
+        queryset = get_descendants_queryset([obj.pk for obj in roots], depth)
+        if hasattr(self, 'get_eager_loading_plan'):
+            queryset = self.get_eager_loading_plan().apply(queryset, self.get_prefetch_queryset)
+        return list(queryset)
+
+    def list(self, request, *args, **kwargs):
+        depth = self.get_depth()
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        roots = list(page if page is not None else queryset)
+        descendants = self.get_descendants(roots, depth)
+        objs = [*roots, *descendants]
+        data_by_pk = {obj.pk: data for obj, data in zip(objs, self.get_serializer(objs, many=True).data)}
+        data = assemble_thread(roots, descendants, data_by_pk)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
@@ -0,0 +1,108 @@
+from collections import Counter
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, StrIndex, Substr
+from .models import Reply, TREE_PATH_SEGMENT_LENGTH
+
+
+def get_path_segment(pk):
+    return pk.hex + '/'
+
+
+def update_descendants_counts(deltas):
+    """
+        Adds the deltas of the `{pk: delta}` dict to the descendants counts, the replies with the same delta
+        together.
+    """
+    pks_by_delta = {}
+    for pk, delta in deltas.items():
+        pks_by_delta.setdefault(delta, []).append(pk)
+    for delta, pks in pks_by_delta.items():
+        Reply.objects.filter(pk__in=pks).update(descendants_count=F('descendants_count') + delta)
+
+
+def descendants_count_subquery(model=Reply):
+    # the replies under a reply are the ones that their paths start with its path, all in the same comment.
+    descendants = model.objects.filter(comment=OuterRef('comment'), path__startswith=OuterRef('path'))
+    descendants = descendants.order_by().values('comment').annotate(count=Count('pk'))
+    return Coalesce(Subquery(descendants.values('count')), 1) - 1
+
+
+def recount_descendants(pks, model=Reply):
+    return model.objects.filter(pk__in=pks).exclude(path='').update(descendants_count=descendants_count_subquery(model))
+
+
+def set_bulk_created_paths(objs):
+    """
+        Sets the paths and the depths of the bulk created replies from the paths of their addsigns, and adds them to
+        the descendants counts of their ancestors.
+    """
+    addsign_pks = {obj.addsign_id for obj in objs if obj.addsign_id is not None}
+    addsign_paths = dict(Reply.objects.filter(pk__in=addsign_pks).values_list('pk', 'path')) if addsign_pks else {}
+    ancestor_deltas = Counter()
+    for obj in objs:
+        obj.update_tree_path(addsign_paths.get(obj.addsign_id, ''))
+        ancestor_deltas.update(obj.get_ancestor_pks())
+    Reply.objects.bulk_update(objs, ['path', 'depth'], batch_size=1000)
+    update_descendants_counts(ancestor_deltas)
+
+
+def reroot_descendants(reply):
+    """
+        Makes the adds of the deleted `reply`, that their addsigns are set to null, the roots of their trees by
+        removing the path of the reply and its ancestors from the paths of its descendants.
+    """
+    segment = get_path_segment(reply.pk)
+    # not by the stored path of the deleted reply, as it may be changed by the deletion of its ancestors.
+    removed_length = StrIndex('path', Value(segment)) - 1 + len(segment)
+    Reply.objects.filter(comment_id=reply.comment_id, path__contains=segment).update(
+        path=Substr('path', removed_length + 1),
+        depth=F('depth') - removed_length / TREE_PATH_SEGMENT_LENGTH,
+    )
+
+
+def remove_from_tree(reply):
+    reroot_descendants(reply)
+    # the ancestors that are deleted too, by the same cascade, are not updated.
+    recount_descendants(reply.get_ancestor_pks())
+
+
+def set_queryset_paths(queryset, batch_size=1000):
+    # the replies of the queryset leave it when their paths are set.
+    set_count = 0
+    while True:
+        batch = list(queryset.values_list('pk', 'addsign__path')[:batch_size])
+        if not batch:
+            return set_count
+        objs = []
+        for pk, addsign_path in batch:
+            obj = queryset.model(pk=pk)
+            # by the method of the current model, so the historical replies of the migrations get the same paths.
+            Reply.update_tree_path(obj, addsign_path or '')
+            objs.append(obj)
+        queryset.model.objects.bulk_update(objs, ['path', 'depth'])
+        set_count += len(objs)
+
+
+def rebuild_tree(batch_size=1000, model=Reply):
+    """
+        Computes the paths, the depths and the descendants counts of all the replies from their addsigns in
+        batches of `batch_size`, from the roots down, and returns the counts of the rebuilt replies and the ones
+        that are not reachable from a root. the `model` is the historical reply model in the migrations.
+    """
+    with transaction.atomic():
+        model.objects.exclude(path='').update(path='')
+        rebuilt_count = set_queryset_paths(model.objects.filter(path='', addsign__isnull=True), batch_size)
+        # the replies that their addsigns have their paths, down to the leaves.
+        rebuilt_count += set_queryset_paths(model.objects.filter(path='', addsign__path__gt=''), batch_size)
+
+        last_pk = None
+        queryset = model.objects.exclude(path='').order_by('pk')
+        while True:
+            batch_queryset = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            pks = list(batch_queryset.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            last_pk = pks[-1]
+            recount_descendants(pks, model)
+        return rebuilt_count, model.objects.filter(path='').count()
@@ -1,17 +1,24 @@
 from django.urls import path
-from .views import TagDetailView, PostListCreateView, PostDetailUpdateDeleteView, PostCommentListView, PostTagListView,\
-    CommentReplyListView, CommentDetailView, ReplyDetailView, ReplyAddsListView
+from .views import TagDetailView, TagPostListView, PostListCreateView, PostDetailUpdateDeleteView, PostCommentListView,\
+    PostTagListView, CommentReplyListView, CommentDetailView, ReplyDetailView, ReplyAddsListView, PostBulkCreateView,\
+    PostCommentBulkCreateView, CommentReplyBulkCreateView, ReplyThreadView, CommentThreadView
 
 
 urlpatterns = [
     path('', PostListCreateView.as_view(), name='post-list'),
+    path('bulk/', PostBulkCreateView.as_view(), name='post-bulk-create'),
     path('<uuid:pk>/', PostDetailUpdateDeleteView.as_view(), name='post-detail'),
     path('tags/<slug:tag>/', TagDetailView.as_view(), name='tag-detail'),
+    path('tags/<slug:tag>/posts/', TagPostListView.as_view(), name='tag-post-list'),
     path('<uuid:pk>/comments/', PostCommentListView.as_view(), name='post-comment-list'),
+    path('<uuid:pk>/comments/bulk/', PostCommentBulkCreateView.as_view(), name='post-comment-bulk-create'),
     path('<uuid:pk>/tags/', PostTagListView.as_view(), name='post-tag-list'),
     path('comments/<uuid:pk>/', CommentDetailView.as_view(), name='comment-detail'),
     path('comments/<uuid:pk>/replies/', CommentReplyListView.as_view(), name='comment-reply-list'),
+    path('comments/<uuid:pk>/replies/bulk/', CommentReplyBulkCreateView.as_view(), name='comment-reply-bulk-create'),
+    path('comments/<uuid:pk>/thread/', CommentThreadView.as_view(), name='comment-thread'),
     path('comments/replies/<uuid:pk>/', ReplyDetailView.as_view(), name='reply-detail'),
     path('comments/replies/<uuid:pk>/adds/', ReplyAddsListView.as_view(), name='reply-adds-list'),
+    path('comments/replies/<uuid:pk>/thread/', ReplyThreadView.as_view(), name='reply-thread'),
 ]
 
@@ -1,28 +1,65 @@
 from rest_framework.generics import ListAPIView, ListCreateAPIView, RetrieveAPIView, RetrieveUpdateDestroyAPIView
-from rest_framework.filters import SearchFilter, OrderingFilter
-from rest_framework.permissions import AllowAny
+from rest_framework.filters import OrderingFilter
+from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import Tag, Post, Comment, Reply
 from .permissions import IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly
-from .base_views import ReverseRelationListCreateView, get_from_kwargs, make_post_queryset_for_user
-from .filters import PostFilterSet, CommentFilterSet, ReplyFilterSet
+from .base_views import (
+    CompiledReadMixin, ConditionalGetMixin, EagerLoadingMixin, MemoizedObjectMixin, ResponseCacheMixin,
+    ReverseRelationListCreateView, get_from_kwargs, make_post_queryset_for_user, memoize_for_request
+)
+from .async_views import AsyncReadMixin
+from .bulk import BulkCreateMixin
+from .eager_loading import get_serializer_plan
+from .filters import PostSearchFilter, PostFilterSet, CommentFilterSet, ReplyFilterSet
+from .metrics import collect_metrics, get_metrics_settings, render_prometheus
+from .renderers import PrometheusTextRenderer
+from .threads import ThreadMixin
 from . import serializers
 # Create your views here.
 
 
-class TagDetailView(RetrieveAPIView):
+class TagDetailView(AsyncReadMixin, ResponseCacheMixin, MemoizedObjectMixin, RetrieveAPIView):
+    response_cache_scopes = ('posts', )
     lookup_field = 'tag'
     queryset = Tag.objects.all()
-    serializer_class = serializers.TagSerializer
+    serializer_class = serializers.TagDetailSerializer
     permission_classes = [AllowAny, ]
 
+    def retrieve(self, request, *args, **kwargs):
+        tag = self.get_object()
+        posts_queryset = get_serializer_plan(serializers.PostListSerializer).apply(get_tag_posts(request, tag))
+        tag.first_posts = list(posts_queryset[:self.paginator.get_page_size(request)])
+        serializer = self.get_serializer(tag)
+        return Response(serializer.data)
+
+
+class TagPostListView(ResponseCacheMixin, CompiledReadMixin, EagerLoadingMixin, ListAPIView):
+    response_cache_scopes = ('posts', )
+    serializer_class = serializers.PostListSerializer
+    permission_classes = [AllowAny, ]
+    filter_backends = [OrderingFilter, ]
+    ordering_fields = ['author', 'created_at', 'updated_at']
+    cursor_ordering = ('-created_at', '-id')
+
+    def get_queryset(self):
+        tag_slug = self.kwargs['tag']
+        tag = memoize_for_request(self.request, ('tag', tag_slug), lambda: get_object_or_404(Tag, tag=tag_slug))
+        return get_tag_posts(self.request, tag)
+
 
-class PostListCreateView(ListCreateAPIView):
+class PostListCreateView(AsyncReadMixin, ResponseCacheMixin, CompiledReadMixin, EagerLoadingMixin,
+                         ListCreateAPIView):
+    response_cache_scopes = ('posts', )
     serializer_class = serializers.PostListSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, ]
-    filter_backends = [SearchFilter, OrderingFilter, DjangoFilterBackend]
+    filter_backends = [PostSearchFilter, OrderingFilter, DjangoFilterBackend]
     search_fields = ['title', 'description', 'author__username', 'tags__tag']
     ordering_fields = ['author', 'created_at', 'updated_at']
+    cursor_ordering = ('-created_at', '-id')
     filterset_class = PostFilterSet
 
     def get_queryset(self):
@@ -32,7 +69,21 @@ class PostListCreateView(ListCreateAPIView):
         serializer.save(author=self.request.user)
 
 
-class PostDetailUpdateDeleteView(RetrieveUpdateDestroyAPIView):
+class PostBulkCreateView(BulkCreateMixin, PostListCreateView):
+    http_method_names = ['post', 'options']
+
+
+def get_tag_posts(request, tag):
+    return make_post_queryset_for_user(request).filter(tags=tag).order_by('-created_at', '-id')
+
+
+class PostDetailUpdateDeleteView(AsyncReadMixin, ResponseCacheMixin, ConditionalGetMixin, MemoizedObjectMixin,
+                                 EagerLoadingMixin, RetrieveUpdateDestroyAPIView):
+    response_cache_scopes = ('post:{pk}', 'tags', 'users')
+    validator_updated_fields = ('updated_at', 'comments__updated_at')
+    validator_counted_fields = ('comments', 'tags')
+    validator_summed_fields = ('comments__replies_count', 'tags__id')
+    validator_text_fields = ('author__username', 'author__slug', 'tags__tag', 'comments__author__username')
     permission_classes = [IsAuthorOrReadOnly, ]
 
     def get_serializer_class(self):
@@ -41,17 +92,26 @@ class PostDetailUpdateDeleteView(RetrieveUpdateDestroyAPIView):
         else:
             return serializers.DraftPostDetailSerializer
 
+    def get_eager_loading_serializer_class(self):
+        # the draft serializer has the same fields, and the object is not retrieved yet.
+        return serializers.PostDetailSerializer
+
     def get_queryset(self):
         return make_post_queryset_for_user(self.request)
 
 
-class PostCommentListView(ReverseRelationListCreateView):
+class PostCommentListView(AsyncReadMixin, ResponseCacheMixin, ConditionalGetMixin, CompiledReadMixin,
+                          ReverseRelationListCreateView):
+    response_cache_scopes = ('post:{pk}', 'users')
+    validator_summed_fields = ('replies_count', )
+    validator_text_fields = ('author__username', 'author__slug')
     parent_klass = Post.objects.published()
     reverse_model_class = Comment
     serializer_class = serializers.PostCommentListSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, ]
     filter_backends = [OrderingFilter, DjangoFilterBackend]
     ordering_fields = ['author', 'commented_at', 'updated_at']
+    cursor_ordering = ('-commented_at', '-id')
     filterset_class = CommentFilterSet
 
     def get_perform_create_kwargs(self):
@@ -62,28 +122,42 @@ class PostCommentListView(ReverseRelationListCreateView):
         return queryset.order_by('-commented_at')
 
 
-class PostTagListView(ListAPIView):
+class PostCommentBulkCreateView(BulkCreateMixin, PostCommentListView):
+    http_method_names = ['post', 'options']
+
+
+class PostTagListView(ResponseCacheMixin, EagerLoadingMixin, ListAPIView):
+    # the posts_count of the tags changes with the posts.
+    response_cache_scopes = ('posts', )
     serializer_class = serializers.TagSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, ]
 
     def get_queryset(self):
-        post = get_from_kwargs(self.kwargs, Post)
+        post = get_from_kwargs(self.kwargs, Post, self.request)
         return post.tags.order_by('tag')
 
 
-class CommentDetailView(RetrieveUpdateDestroyAPIView):
+class CommentDetailView(ConditionalGetMixin, MemoizedObjectMixin, EagerLoadingMixin, RetrieveUpdateDestroyAPIView):
+    validator_updated_fields = ('updated_at', 'post__updated_at', 'replies__updated_at')
+    validator_counted_fields = ('replies', )
+    validator_summed_fields = ('replies__adds_count', )
+    validator_text_fields = ('author__username', 'author__slug', 'replies__author__username')
     queryset = Comment.objects.all()
     serializer_class = serializers.CommentDetailSerializer
     permission_classes = [IsAuthorOrReadOnly, ]
 
 
-class CommentReplyListView(ReverseRelationListCreateView):
+class CommentReplyListView(ConditionalGetMixin, CompiledReadMixin, ReverseRelationListCreateView):
+    validator_updated_fields = ('updated_at', 'addsign__updated_at')
+    validator_summed_fields = ('adds_count', )
+    validator_text_fields = ('author__username', 'author__slug', 'addsign__author__username')
     parent_klass = Comment
     reverse_field_related_name = 'replies'
     serializer_class = serializers.CommentReplyListSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, ]
     filter_backends = [OrderingFilter, DjangoFilterBackend]
     ordering_fields = ['author', 'replied_at', 'updated_at']
+    cursor_ordering = ('-replied_at', '-id')
     filterset_class = ReplyFilterSet
 
     def get_perform_create_kwargs(self):
@@ -94,14 +168,27 @@ class CommentReplyListView(ReverseRelationListCreateView):
         return queryset.order_by('-replied_at')
 
 
-class ReplyDetailView(RetrieveUpdateDestroyAPIView):
+class CommentReplyBulkCreateView(BulkCreateMixin, CommentReplyListView):
+    http_method_names = ['post', 'options']
+
+
+class ReplyDetailView(ConditionalGetMixin, MemoizedObjectMixin, EagerLoadingMixin, RetrieveUpdateDestroyAPIView):
+    validator_updated_fields = ('updated_at', 'addsign__updated_at', 'adds__updated_at')
+    validator_counted_fields = ('adds', )
+    validator_summed_fields = ('addsign__adds_count', 'adds__adds_count')
+    validator_text_fields = (
+        'author__username', 'author__slug', 'addsign__author__username', 'adds__author__username'
+    )
     queryset = Reply.objects.all()
     serializer_class = serializers.ReplyDetailSerializer
     permission_classes = [IsAuthorOrReadOnly, ]
 
 
-class ReplyAddsListView(ReverseRelationListCreateView):
-    parent_klass = Reply
+class ReplyAddsListView(ConditionalGetMixin, ReverseRelationListCreateView):
+    validator_summed_fields = ('adds_count', )
+    validator_text_fields = ('author__username', 'author__slug')
+    # the comment of the addsign is the comment of the adds too.
+    parent_klass = Reply.objects.select_related('comment')
     reverse_field_related_name = 'adds'
     serializer_class = serializers.ReplyAddsListSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, ]
@@ -110,11 +197,46 @@ class ReplyAddsListView(ReverseRelationListCreateView):
     filterset_class = ReplyFilterSet
 
     def get_perform_create_kwargs(self):
+        addsign = self.get_object()
         kwargs = {
-            'author': self.request.user, 'comment': self.get_object().comment,
-            'addsign': self.get_object()
+            'author': self.request.user, 'comment': addsign.comment,
+            'addsign': addsign
         }
         return kwargs
 
     def order_queryset(self, queryset):
         return queryset.order_by('-replied_at')
+
+
+class ReplyThreadView(ThreadMixin, EagerLoadingMixin, ListAPIView):
+    # the adds of the reply are the roots of its thread.
+    serializer_class = serializers.ReplyThreadSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly, ]
+
+    def get_queryset(self):
+        reply = get_from_kwargs(self.kwargs, Reply, self.request)
+        return reply.adds.order_by('replied_at', 'id')
+
+
+class CommentThreadView(ThreadMixin, EagerLoadingMixin, ListAPIView):
+    # the replies of the comment that are not adds are the roots of its thread.
+    serializer_class = serializers.ReplyThreadSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly, ]
+
+    def get_queryset(self):
+        comment = get_from_kwargs(self.kwargs, Comment, self.request)
+        return comment.replies.filter(addsign=None).order_by('replied_at', 'id')
+
+
+class MetricsView(APIView):
+    """
+        The metrics of all the worker processes in the Prometheus text format, for the admins.
+    """
+    permission_classes = [IsAdminUser, ]
+    renderer_classes = [PrometheusTextRenderer, ]
+    # the scrapers accept the `text/plain; version=0.0.4`, that is not an API version.
+    versioning_class = None
+    schema = None
+
+    def get(self, request, *args, **kwargs):
+        return Response(render_prometheus(collect_metrics(get_metrics_settings()['DIRECTORY'])))